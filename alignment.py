@@ -0,0 +1,149 @@
+"""
+전사-화자 정렬
+- 화자 분리 턴을 시작 시간 순으로 훑는 스윕 방식으로 "가장 많이 겹치는 화자" 결정
+- O((N+M) log M) : N = Whisper 세그먼트(또는 단어) 수, M = 화자 턴 수
+- 턴이 서로 거의 겹치지 않는 일반적인 경우에는 같은 규칙을 NumPy 배열 연산으로 계산
+- Whisper 단어 타임스탬프가 있으면 단어 단위로도 화자 지정
+- 병합 결과는 열 단위 저장소(SegmentStore)로 반환
+"""
+
+import heapq
+
+import numpy as np
+
+from segment_store import SegmentStore
+
+UNKNOWN_SPEAKER = "Speaker_Unknown"
+
+
+def assign_turns(intervals, diar_segments):
+    """각 (start, end) 구간과 가장 많이 겹치는 화자 턴의 인덱스 목록 반환 (없으면 None)
+
+    경계가 맞닿은 턴(겹침 0)도 후보에 포함하고, 겹침이 같으면 diar_segments 에서
+    먼저 나온 턴을 고른다 (기존 구현과 동일한 규칙).
+    """
+    turn_order = sorted(range(len(diar_segments)), key=lambda i: diar_segments[i]["start"])
+    query_order = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+    assigned = [None] * len(intervals)
+
+    active = []  # (턴 끝 시간, 턴 인덱스) 최소 힙
+    next_turn = 0
+    for qi in query_order:
+        start, end = intervals[qi]
+
+        # 구간 끝 이전에 시작한 턴을 활성 집합에 추가
+        while next_turn < len(turn_order) and diar_segments[turn_order[next_turn]]["start"] <= end:
+            t = turn_order[next_turn]
+            heapq.heappush(active, (diar_segments[t]["end"], t))
+            next_turn += 1
+
+        # 구간 시작 전에 끝난 턴은 이후 구간과도 겹칠 수 없으므로 제거
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+
+        best = None
+        best_overlap = None
+        for _, t in active:
+            d = diar_segments[t]
+            if d["start"] > end:
+                # 이전 구간 때문에 들어온, 이 구간보다 늦게 시작하는 턴
+                continue
+            overlap = min(d["end"], end) - max(d["start"], start)
+            if best is None or overlap > best_overlap or (overlap == best_overlap and t < best):
+                best = t
+                best_overlap = overlap
+        assigned[qi] = best
+    return assigned
+
+
+# 배열 연산으로 비교할 (구간, 턴) 쌍이 구간+턴 수의 이 배수를 넘으면 스윕 방식 사용
+MAX_CANDIDATE_FACTOR = 8
+
+
+def assign_turns_array(starts, ends, diar_segments):
+    """assign_turns 와 같은 규칙을 배열 연산으로 계산 (턴 인덱스 배열, 없으면 -1)
+
+    시작 순으로 정렬한 턴의 끝 시간 누적 최대값으로 구간마다 후보 턴 범위를 정한다.
+    아주 긴 턴이 있어 후보가 너무 많아지면 assign_turns (스윕) 로 계산한다.
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    n = len(starts)
+    if n == 0 or not diar_segments:
+        return np.full(n, -1, dtype=np.intp)
+    turn_start = np.array([d["start"] for d in diar_segments], dtype=np.float64)
+    turn_end = np.array([d["end"] for d in diar_segments], dtype=np.float64)
+    order = np.argsort(turn_start, kind="stable")
+    sorted_start = turn_start[order]
+    reach = np.maximum.accumulate(turn_end[order])
+
+    # 후보: 구간 끝 이전에 시작했고 (hi), 누적 최대 끝이 구간 시작 이후인 (lo) 턴
+    hi = np.searchsorted(sorted_start, ends, side="right")
+    lo = np.minimum(np.searchsorted(reach, starts, side="left"), hi)
+    counts = hi - lo
+    total = int(counts.sum())
+    if total > MAX_CANDIDATE_FACTOR * (n + len(diar_segments)):
+        assigned = assign_turns(list(zip(starts.tolist(), ends.tolist())), diar_segments)
+        return np.array([-1 if t is None else t for t in assigned], dtype=np.intp)
+
+    query = np.repeat(np.arange(n), counts)
+    turn = order[np.repeat(lo, counts) + (np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts))]
+    valid = turn_end[turn] >= starts[query]
+    query, turn = query[valid], turn[valid]
+    overlap = np.minimum(turn_end[turn], ends[query]) - np.maximum(turn_start[turn], starts[query])
+
+    # 구간마다 겹침이 가장 크고, 같으면 diar_segments 에서 먼저 나온 턴
+    ranked = np.lexsort((turn, -overlap, query))
+    query, turn = query[ranked], turn[ranked]
+    first = np.ones(len(query), dtype=bool)
+    first[1:] = query[1:] != query[:-1]
+    assigned = np.full(n, -1, dtype=np.intp)
+    assigned[query[first]] = turn[first]
+    return assigned
+
+
+def _speaker_of(diar_segments, index, default=UNKNOWN_SPEAKER):
+    return default if index < 0 else diar_segments[index]["speaker"]
+
+
+def merge_transcription_and_diarization(whisper_segments, diar_segments):
+    """전사 결과와 화자 분리 결과를 병합 (SegmentStore 반환)"""
+    seg_turns = assign_turns_array([seg["start"] for seg in whisper_segments],
+                                   [seg["end"] for seg in whisper_segments], diar_segments)
+    speakers = [_speaker_of(diar_segments, turn) for turn in seg_turns.tolist()]
+
+    # 단어 타임스탬프가 있으면 모든 단어를 한 번에 처리
+    word_refs = [(si, word) for si, seg in enumerate(whisper_segments) for word in seg.get("words") or ()]
+    word_turns = assign_turns_array([w["start"] for _, w in word_refs], [w["end"] for _, w in word_refs],
+                                    diar_segments)
+    extras = {}
+    for (si, word), turn in zip(word_refs, word_turns.tolist()):
+        # 겹치는 턴이 없는 단어는 세그먼트의 화자를 따름
+        speaker = _speaker_of(diar_segments, turn, speakers[si])
+        extras.setdefault(si, {"words": []})["words"].append(dict(word, speaker=speaker))
+
+    return SegmentStore.from_columns([seg["start"] for seg in whisper_segments],
+                                     [seg["end"] for seg in whisper_segments], speakers,
+                                     [seg["text"].strip() for seg in whisper_segments], extras)
+
+
+def merge_transcription_and_diarization_reference(whisper_segments, diar_segments):
+    """전사 결과와 화자 분리 결과를 병합 (O(N·M) 기준 구현, 동등성 검증용)"""
+    merged = []
+    for seg in whisper_segments:
+        # 가장 많이 겹치는 화자 찾기
+        speaker = UNKNOWN_SPEAKER
+        overlaps = [d for d in diar_segments
+                    if not (d["end"] < seg["start"] or d["start"] > seg["end"])]
+        if overlaps:
+            best_overlap = max(overlaps,
+                               key=lambda d: min(d["end"], seg["end"]) - max(d["start"], seg["start"]))
+            speaker = best_overlap["speaker"]
+
+        merged.append({
+            "speaker": speaker,
+            "start": seg["start"],
+            "end": seg["end"],
+            "text": seg["text"].strip()
+        })
+    return merged
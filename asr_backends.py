@@ -0,0 +1,136 @@
+"""
+ASR 엔진
+- whisper: OpenAI Whisper 기준 엔진 (기본값)
+- whisper-int8: Whisper 의 Linear 층을 int8 동적 양자화한 CPU 엔진
+- faster-whisper: CTranslate2 기반 int8 엔진 (faster-whisper 설치 시)
+모든 엔진은 Whisper 와 같은 세그먼트 딕셔너리 형식을 반환한다.
+torch / whisper 는 모델을 로드할 때 가져오므로 엔진 목록 조회는 가볍다.
+"""
+
+import importlib.util
+
+from model_cache import get_model_cache, load_whisper_model, preload_whisper_model
+
+DEFAULT_BACKEND = "whisper"
+
+
+class WhisperBackend:
+    """OpenAI Whisper 기준 엔진"""
+    name = "whisper"
+    dtype = "fp32"
+
+    def key(self, model_size, device):
+        return (model_size, device, self.dtype)
+
+    def load(self, model_size, device):
+        return load_whisper_model(model_size, device, self.dtype)
+
+    def preload(self, model_size, device):
+        return preload_whisper_model(model_size, device, self.dtype)
+
+    def transcribe(self, model, samples, word_timestamps=False, initial_prompt=None, verbose=None):
+        return model.transcribe(samples, fp16=False, verbose=verbose,
+                                word_timestamps=word_timestamps, initial_prompt=initial_prompt)
+
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """Linear 층을 int8 동적 양자화한 Whisper (CPU 전용)"""
+    name = "whisper-int8"
+    dtype = "int8"
+
+    def _load(self, model_size, device):
+        if device != "cpu":
+            raise ValueError("whisper-int8 엔진은 CPU 에서만 사용할 수 있습니다.")
+        import torch
+        import whisper
+        model = whisper.load_model(model_size, device="cpu")
+        # whisper.model.Linear 는 입력 dtype 으로 가중치를 바꾸는 서브클래스라 양자화 대상에서
+        # 빠지므로, CPU fp32 추론에서는 동작이 같은 nn.Linear 로 바꾼 뒤 양자화
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear):
+                module.__class__ = torch.nn.Linear
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def load(self, model_size, device):
+        return get_model_cache().get(self.key(model_size, device), lambda: self._load(model_size, device))
+
+    def preload(self, model_size, device):
+        return get_model_cache().preload(self.key(model_size, device), lambda: self._load(model_size, device))
+
+
+class FasterWhisperBackend:
+    """CTranslate2 기반 faster-whisper 엔진 (int8)"""
+    name = "faster-whisper"
+    dtype = "int8"
+
+    # openai-whisper 의 "large" 는 large-v3
+    MODEL_NAMES = {"large": "large-v3"}
+
+    def key(self, model_size, device):
+        return (f"faster-whisper/{model_size}", device, self.dtype)
+
+    def _load(self, model_size, device):
+        import torch
+        from faster_whisper import WhisperModel
+        compute_type = "int8" if device == "cpu" else "int8_float16"
+        return WhisperModel(self.MODEL_NAMES.get(model_size, model_size), device=device,
+                            compute_type=compute_type, cpu_threads=torch.get_num_threads())
+
+    def load(self, model_size, device):
+        return get_model_cache().get(self.key(model_size, device), lambda: self._load(model_size, device))
+
+    def preload(self, model_size, device):
+        return get_model_cache().preload(self.key(model_size, device), lambda: self._load(model_size, device))
+
+    def transcribe(self, model, samples, word_timestamps=False, initial_prompt=None, verbose=None):
+        # 기준 엔진과 같은 탐욕적 디코딩 + 온도 폴백
+        segments, info = model.transcribe(samples, beam_size=1, word_timestamps=word_timestamps,
+                                          initial_prompt=initial_prompt)
+        result_segments = []
+        for i, seg in enumerate(segments):
+            item = {
+                "id": i,
+                "seek": seg.seek,
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text,
+                "tokens": list(seg.tokens),
+                "temperature": seg.temperature,
+                "avg_logprob": seg.avg_logprob,
+                "compression_ratio": seg.compression_ratio,
+                "no_speech_prob": seg.no_speech_prob,
+            }
+            if word_timestamps:
+                item["words"] = [{"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                                 for w in seg.words or ()]
+            if verbose:
+                print(f"[{seg.start:.2f} --> {seg.end:.2f}] {seg.text}")
+            result_segments.append(item)
+        return {
+            "text": "".join(seg["text"] for seg in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+        }
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (WhisperBackend(), QuantizedWhisperBackend(), FasterWhisperBackend())
+}
+
+
+def get_backend(name=None):
+    """이름으로 ASR 엔진 조회"""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 ASR 엔진입니다: {name}")
+    return BACKENDS[name]
+
+
+def available_backends():
+    """현재 환경에서 사용할 수 있는 엔진 이름 목록"""
+    names = [WhisperBackend.name, QuantizedWhisperBackend.name]
+    # 설치 여부만 확인 (가져오면 CTranslate2 까지 로드되어 느림)
+    if importlib.util.find_spec("faster_whisper") is not None:
+        names.append(FasterWhisperBackend.name)
+    return names
@@ -0,0 +1,159 @@
+"""
+오디오 디코딩
+- ffmpeg 로 파일을 한 번만 디코딩하여 16kHz 모노 float32 배열 생성
+- Whisper 와 pyannote 가 같은 버퍼를 복사 없이 공유
+- 긴 오디오는 임시 파일에 메모리 매핑
+"""
+
+import os
+import tempfile
+import subprocess
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# 이 길이(초)를 넘는 오디오는 메모리 대신 임시 파일에 매핑
+DEFAULT_MMAP_THRESHOLD_SEC = float(os.environ.get("AUDIO_TRANSCRIBER_MMAP_THRESHOLD_SEC", "1800"))
+
+_BYTES_PER_SAMPLE = np.dtype(np.float32).itemsize
+_READ_BLOCK = 1 << 20
+
+
+class DecodedAudio:
+    """디코딩된 PCM 버퍼 (memmap 인 경우 close() 시 임시 파일 삭제)"""
+
+    def __init__(self, samples, sample_rate=SAMPLE_RATE, path=None, mmap_path=None):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.path = path
+        self.mmap_path = mmap_path
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def is_memmap(self):
+        return self.mmap_path is not None
+
+    def as_pyannote_input(self):
+        """pyannote 파이프라인용 인메모리 waveform 딕셔너리 (버퍼 공유)"""
+        import torch
+        waveform = torch.from_numpy(self.samples).unsqueeze(0)
+        return {"waveform": waveform, "sample_rate": self.sample_rate}
+
+    def close(self):
+        if self.mmap_path is None:
+            return
+        mmap = getattr(self.samples, "_mmap", None)
+        self.samples = np.zeros(0, dtype=np.float32)
+        if mmap is not None:
+            try:
+                mmap.close()
+            except BufferError:
+                # 다른 스레드(예: 취소 후 마무리 중인 화자 분리)가 아직 버퍼를 참조하면
+                # 참조가 모두 사라질 때 해제됨
+                pass
+        try:
+            os.remove(self.mmap_path)
+        except OSError:
+            pass
+        self.mmap_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def allocate_audio(n_samples, sample_rate=SAMPLE_RATE, path=None, use_mmap=False):
+    """빈 float32 버퍼를 가진 DecodedAudio 생성 (use_mmap 이면 임시 파일에 매핑)"""
+    if not use_mmap or n_samples == 0:
+        return DecodedAudio(np.zeros(n_samples, dtype=np.float32), sample_rate, path=path)
+    fd, mmap_path = tempfile.mkstemp(prefix="audio_transcriber_", suffix=".f32")
+    os.close(fd)
+    samples = np.memmap(mmap_path, dtype=np.float32, mode="w+", shape=(n_samples,))
+    return DecodedAudio(samples, sample_rate, path=path, mmap_path=mmap_path)
+
+
+def _ffmpeg_command(file_path, sample_rate):
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", file_path,
+        "-f", "f32le", "-ac", "1", "-acodec", "pcm_f32le", "-ar", str(sample_rate),
+        "-loglevel", "error", "-",
+    ]
+
+
+def probe_duration(file_path):
+    """ffprobe 로 오디오 길이(초) 조회 (실패 시 None)"""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        file_path,
+    ]
+    try:
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        return float(output.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def decode_audio(file_path, sample_rate=SAMPLE_RATE, mmap_threshold_sec=DEFAULT_MMAP_THRESHOLD_SEC):
+    """파일을 16kHz 모노 float32 로 한 번 디코딩
+
+    임계값보다 짧으면 메모리 버퍼, 길면 임시 파일 memmap 을 사용한다.
+    """
+    threshold_bytes = int(mmap_threshold_sec * sample_rate) * _BYTES_PER_SAMPLE
+    process = subprocess.Popen(_ffmpeg_command(file_path, sample_rate),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    buffer = bytearray()
+    spill = None
+    spill_path = None
+    written = 0
+    try:
+        while True:
+            block = process.stdout.read(_READ_BLOCK)
+            if not block:
+                break
+            if spill is None and written + len(block) > threshold_bytes:
+                # 임계값 초과: 지금까지의 데이터를 임시 파일로 옮기고 이후는 파일에 기록
+                fd, spill_path = tempfile.mkstemp(prefix="audio_transcriber_", suffix=".f32")
+                spill = os.fdopen(fd, "wb")
+                spill.write(buffer)
+                buffer = None
+            if spill is not None:
+                spill.write(block)
+            else:
+                buffer += block
+            written += len(block)
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise RuntimeError(f"오디오 디코딩 실패: {stderr.decode(errors='ignore').strip()}")
+    except BaseException:
+        process.kill()
+        if spill is not None:
+            spill.close()
+            os.remove(spill_path)
+        raise
+    finally:
+        process.stdout.close()
+        process.stderr.close()
+
+    # 4바이트 단위가 아닌 꼬리 바이트는 버림
+    n_samples = written // _BYTES_PER_SAMPLE
+    if spill is None:
+        # bytearray 위의 뷰이므로 추가 복사 없이 쓰기 가능한 배열이 됨
+        samples = np.frombuffer(buffer, dtype=np.float32, count=n_samples)
+        return DecodedAudio(samples, sample_rate, path=file_path)
+
+    spill.close()
+    if n_samples == 0:
+        os.remove(spill_path)
+        return DecodedAudio(np.zeros(0, dtype=np.float32), sample_rate, path=file_path)
+    samples = np.memmap(spill_path, dtype=np.float32, mode="r+", shape=(n_samples,))
+    return DecodedAudio(samples, sample_rate, path=file_path, mmap_path=spill_path)
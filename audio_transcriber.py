@@ -3,127 +3,368 @@
 음성파일 전사 프로그램 (GUI 버전)
 - Whisper + pyannote-audio를 사용한 전사 및 화자 분리
 - GUI 인터페이스로 쉬운 사용
-- txt, csv, json 형식으로 결과 저장
+- txt, csv, json, srt, vtt 형식으로 결과 저장 (전사하며 바로 저장 가능)
+- 마이크/스트림 실시간 전사
+- 결과는 보이는 행만 그리는 표로 표시 (긴 회의도 멈추지 않음, 화자별 보기, 클릭한 위치 재생)
+- 완료된 결과를 검색 보관함에 기록하고 '검색' 탭에서 구절/화자/기간으로 찾기
+- torch / whisper / pyannote 는 창을 띄운 뒤 백그라운드에서 가져와 시작 시간 단축
 """
 
+import time
+# 콜드 스타트 측정 기준 (psutil 이 없으면 이 모듈을 가져오기 시작한 시각)
+IMPORT_STARTED = time.perf_counter()
+
 import sys
 import os
-import csv
 import json
+import multiprocessing
 import tempfile
 import subprocess
 import threading
-from datetime import timedelta
+from contextlib import closing
 from pathlib import Path
+from concurrent.futures import as_completed
 
 from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QPushButton, QLabel, QFileDialog, QComboBox,
                              QProgressBar, QTextEdit, QGroupBox, QGridLayout,
-                             QCheckBox, QSpinBox, QMessageBox, QTabWidget)
-from PySide6.QtCore import Qt, QThread, Signal, QTimer
+                             QCheckBox, QSpinBox, QMessageBox, QTabWidget, QLineEdit,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QDateEdit)
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QDate
 from PySide6.QtGui import QFont, QIcon
 
-import whisper
-from pyannote.audio import Pipeline
-import torch
+# 무거운 모듈(torch, whisper, pyannote 와 이를 쓰는 pipeline, worker_pool, batched_asr)은
+# 여기서 가져오지 않고 ModelWarmupWorker 와 각 작업에서 필요할 때 가져옴
+from exporters import EXPORT_FORMATS, StreamingExporter, save_segments
+from asr_backends import DEFAULT_BACKEND, available_backends, get_backend
+from cascade import CASCADE_DRAFT_MODELS, DEFAULT_DRAFT_MODEL, describe_cascade
+from model_cache import preload_diarization_pipeline
+from profiling import Profiler, process_uptime_sec, save_profile
+from checkpoint import TranscriptionCancelled
+from live import FileReplaySource, LatencyStats, LiveTranscriber, open_source
+from job_server import DEFAULT_HOST, DEFAULT_PORT, JobClient
+from result_cache import get_result_cache
+from segment_store import SegmentStore
+from speaker_index import get_speaker_index
+from transcript_archive import DEFAULT_SEARCH_LIMIT, get_archive
+from transcript_view import TranscriptView, format_time
+
+# 콜드 스타트 측정용 환경 변수 (benchmark.py --startup 에서 사용)
+# - STARTUP_LOG: 시작 단계별 시각을 기록할 JSON 경로
+# - STARTUP_AUDIO: 창이 뜨자마자 전사할 파일 (끝나면 종료)
+STARTUP_LOG_ENV = "AUDIO_TRANSCRIBER_STARTUP_LOG"
+STARTUP_AUDIO_ENV = "AUDIO_TRANSCRIBER_STARTUP_AUDIO"
+STARTUP_MODEL_ENV = "AUDIO_TRANSCRIBER_STARTUP_MODEL"
+
+class ModelWarmupWorker(QThread):
+    """창이 뜬 뒤 torch / whisper / pyannote 와 전사 모듈을 백그라운드에서 가져오는 워커 스레드"""
+    ready = Signal(dict)
+    failed = Signal(str)
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            import torch
+            import whisper  # noqa: F401
+            import pyannote.audio  # noqa: F401
+            import pipeline  # noqa: F401
+            import worker_pool  # noqa: F401
+            import batched_asr  # noqa: F401
+            self.ready.emit({"import_sec": time.perf_counter() - started,
+                             "cuda": torch.cuda.is_available()})
+        except Exception as e:
+            self.failed.emit(str(e))
 
 class TranscriptionWorker(QThread):
     """백그라운드에서 전사 작업을 수행하는 워커 스레드"""
     progress_updated = Signal(int, str)
-    finished = Signal(str, list)
+    segment_ready = Signal(dict)
+    cache_status = Signal(dict)
+    vad_status = Signal(dict)
+    cascade_status = Signal(dict)
+    profile_ready = Signal(dict)
+    # 결과(SegmentStore 또는 목록)는 object 로 넘겨 스레드 간 전달 시 목록으로 변환/복사하지 않음
+    finished = Signal(str, object)
+    cancelled = Signal(str)
     error_occurred = Signal(str)
 
-    def __init__(self, audio_file, model_size, device, hf_token, use_diarization):
+    def __init__(self, audio_file, model_size, device, hf_token, use_diarization, word_timestamps=False,
+                 streaming=False, use_cache=True, checkpointing=False, backend=DEFAULT_BACKEND, vad=False,
+                 auto_save=None, diarization_window_sec=None, speaker_index=False, parallel_workers=0,
+                 cascade_model=None, archive=False):
         super().__init__()
         self.audio_file = audio_file
         self.model_size = model_size
         self.device = device
         self.hf_token = hf_token
         self.use_diarization = use_diarization
+        self.word_timestamps = word_timestamps
+        self.streaming = streaming
+        self.use_cache = use_cache
+        self.checkpointing = checkpointing
+        self.backend = backend
+        self.vad = vad
+        # (출력 폴더, 형식 목록): 전사하며 바로 저장
+        self.auto_save = auto_save
+        self.diarization_window_sec = diarization_window_sec
+        # 등록된 화자 이름으로 표시 (화자 색인 사용)
+        self.speaker_index = speaker_index
+        # 1 이상이면 파일을 청크로 나눠 이 수만큼의 프로세스가 동시에 전사
+        self.parallel_workers = parallel_workers
+        # 먼저 전체를 전사할 작은 모델 (신뢰도가 낮은 구간만 model_size 로 다시 전사)
+        self.cascade_model = cascade_model
+        # 완료된 결과를 검색 보관함에 기록
+        self.archive = archive
+        self.pipeline = None
+        # 청크 단위로 전사하면 청크마다, 파일 전체를 한 번에 전사하면 단계(전사/화자 분리)가 끝나야 멈춤
+        chunked = streaming or checkpointing or parallel_workers
+        self.cancel_message = "취소 중... (현재 청크가 끝나면 중지)" if chunked else "취소 중... (현재 단계가 끝나면 중지)"
+
+    def cancel(self):
+        """다음 청크 경계 또는 단계 사이에서 중지 (체크포인트를 쓰면 다음 실행 시 이어서 진행)"""
+        if self.pipeline is not None:
+            self.pipeline.cancel()
 
     def run(self):
+        asr_pool = None
         try:
-            # Whisper 모델 로드
-            self.progress_updated.emit(10, "Whisper 모델 로딩 중...")
-            model = whisper.load_model(self.model_size, device=self.device)
-            
-            # 음성 전사
-            self.progress_updated.emit(30, "음성 전사 진행 중...")
-            result = model.transcribe(self.audio_file, fp16=False, verbose=True)
-            whisper_segments = result["segments"]
-            
-            merged_segments = []
-            
-            if self.use_diarization and self.hf_token:
-                # 화자 분리
-                self.progress_updated.emit(60, "화자 분리 진행 중...")
-                diar_segments = self.diarize_audio(self.audio_file, self.hf_token)
-                
-                # 전사와 화자 분리 결과 병합
-                self.progress_updated.emit(80, "결과 병합 중...")
-                merged_segments = self.merge_transcription_and_diarization(whisper_segments, diar_segments)
+            from pipeline import TranscriptionPipeline
+            if self.parallel_workers:
+                from worker_pool import WorkerPool
+                self.progress_updated.emit(0, f"병렬 전사 워커 {self.parallel_workers}개 시작 중...")
+                asr_pool = WorkerPool({"model": self.model_size, "backend": self.backend, "device": self.device,
+                                       "cascade_model": self.cascade_model},
+                                      self.parallel_workers)
+            self.pipeline = pipeline = TranscriptionPipeline(
+                self.model_size,
+                self.device,
+                self.hf_token,
+                self.use_diarization,
+                word_timestamps=self.word_timestamps,
+                progress_callback=self.progress_updated.emit,
+                result_cache=get_result_cache() if self.use_cache else None,
+                cache_callback=self.cache_status.emit,
+                checkpointing=self.checkpointing,
+                backend=self.backend,
+                vad=self.vad,
+                vad_callback=self.vad_status.emit,
+                diarization_window_sec=self.diarization_window_sec,
+                speaker_index=get_speaker_index() if self.speaker_index else None,
+                asr_pool=asr_pool,
+                cascade_model=self.cascade_model,
+                cascade_callback=self.cascade_status.emit,
+                archive=get_archive() if self.archive else None
+            )
+            message = "성공적으로 전사되었습니다!"
+            if self.streaming:
+                # 청크가 끝날 때마다 세그먼트를 바로 내보내고 전체 목록은 보관하지 않음
+                exporter = None
+                if self.auto_save:
+                    # 선택한 형식에 바로 덧붙이고 청크 경계마다 fsync
+                    exporter = StreamingExporter(self.audio_file, *self.auto_save)
+                    pipeline.chunk_callback = exporter.sync
+                try:
+                    # 저장 중 오류가 나도 생성기를 바로 닫아 화자 분리를 멈추게 함
+                    with closing(pipeline.iter_segments(self.audio_file)) as segments:
+                        for seg in segments:
+                            if exporter is not None:
+                                exporter.write(seg)
+                            self.segment_ready.emit(seg)
+                finally:
+                    if exporter is not None:
+                        exporter.close()
+                merged_segments = []
             else:
-                # 화자 분리 없이 전사만
-                for seg in whisper_segments:
-                    merged_segments.append({
-                        "speaker": "Speaker_1",
-                        "start": seg["start"],
-                        "end": seg["end"],
-                        "text": seg["text"].strip()
-                    })
+                merged_segments = pipeline.run(self.audio_file)
+                if self.auto_save:
+                    exporter = StreamingExporter(self.audio_file, *self.auto_save)
+                    with exporter:
+                        exporter.write_all(merged_segments)
             
+            if self.auto_save:
+                pipeline.profiler.add("export", exporter.elapsed_sec)
+                save_profile(pipeline.profiler.report(), self.audio_file, self.auto_save[0])
+                message += "\n저장된 파일:\n" + "\n".join(str(path) for path in exporter.paths)
+            self.profile_ready.emit(pipeline.profiler.report())
             self.progress_updated.emit(100, "완료!")
-            self.finished.emit("성공적으로 전사되었습니다!", merged_segments)
+            self.finished.emit(message, merged_segments)
             
+        except TranscriptionCancelled:
+            self.cancelled.emit("작업이 취소되었습니다. 같은 설정으로 다시 실행하면 이어서 진행합니다."
+                                if self.checkpointing else "작업이 취소되었습니다.")
         except Exception as e:
             self.error_occurred.emit(f"오류 발생: {str(e)}")
+        finally:
+            if asr_pool is not None:
+                asr_pool.shutdown(wait=False, cancel_futures=True)
 
-    def diarize_audio(self, file_path, hf_token):
+    def diarize_audio(self, audio, hf_token):
         """화자 분리 수행"""
-        try:
-            pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=hf_token
-            )
-            diarization = pipeline(file_path)
-            segments = []
-            for turn, _, speaker in diarization.itertracks(yield_label=True):
-                segments.append({
-                    "start": turn.start, 
-                    "end": turn.end,
-                    "speaker": speaker
-                })
-            return segments
-        except Exception as e:
-            print(f"화자 분리 오류: {e}")
-            return []
+        from pipeline import diarize_audio
+        return diarize_audio(audio, hf_token, self.device)
 
     def merge_transcription_and_diarization(self, whisper_segments, diar_segments):
         """전사 결과와 화자 분리 결과를 병합"""
-        merged = []
-        for seg in whisper_segments:
-            # 가장 많이 겹치는 화자 찾기
-            speaker = "Speaker_Unknown"
-            overlaps = [d for d in diar_segments
-                       if not (d["end"] < seg["start"] or d["start"] > seg["end"])]
-            if overlaps:
-                best_overlap = max(overlaps, 
-                                 key=lambda d: min(d["end"], seg["end"]) - max(d["start"], seg["start"]))
-                speaker = best_overlap["speaker"]
-            
-            merged.append({
-                "speaker": speaker,
-                "start": seg["start"],
-                "end": seg["end"],
-                "text": seg["text"].strip()
-            })
-        return merged
+        from pipeline import merge_transcription_and_diarization
+        return merge_transcription_and_diarization(whisper_segments, diar_segments)
+
+class RemoteTranscriptionWorker(TranscriptionWorker):
+    """작업 서버(job_server)에 파일을 올리고 진행 상황과 결과를 받아오는 워커 스레드
+
+    모델, 장치, 엔진, 화자 분리 여부는 서버를 시작할 때 정한 설정을 사용한다.
+    """
+
+    def __init__(self, server_url, audio_file, options, auto_save=None):
+        super().__init__(audio_file, None, None, None, False, auto_save=auto_save)
+        self.client = JobClient(server_url)
+        self.options = options
+        self.job_id = None
+        self.cancel_requested = False
+        self.cancel_message = "취소 중... (서버에서 아직 시작하지 않은 작업만 취소)"
+
+    def cancel(self):
+        """대기 중인 작업만 취소 (이미 실행 중인 작업은 서버에서 끝까지 진행)"""
+        self.cancel_requested = True
+        if self.job_id is None:
+            return
+        try:
+            self.client.cancel(self.job_id)
+        except RuntimeError as e:
+            self.progress_updated.emit(0, str(e))
+
+    def run(self):
+        try:
+            self.progress_updated.emit(0, "작업 서버로 파일 업로드 중...")
+            job = self.client.submit_file(self.audio_file, self.options)
+            self.job_id = job["id"]
+            if self.cancel_requested:
+                self.cancel()
+            self.progress_updated.emit(0, "작업 서버 대기열에 등록됨")
+            job = self.client.wait(self.job_id, self.progress_updated.emit)
+            if job["status"] == "cancelled":
+                self.cancelled.emit("대기 중이던 서버 작업이 취소되었습니다.")
+                return
+            if job["status"] != "done":
+                raise RuntimeError(job.get("error") or f"서버 작업이 끝나지 않았습니다 ({job['status']}).")
+
+            segments = self.client.result(self.job_id, "json")
+            profile = self.client.result(self.job_id, "profile")
+            message = "성공적으로 전사되었습니다! (작업 서버)"
+            if self.auto_save:
+                paths = [save_segments(segments, self.audio_file, self.auto_save[0], fmt)
+                         for fmt in self.auto_save[1]]
+                save_profile(profile, self.audio_file, self.auto_save[0])
+                message += "\n저장된 파일:\n" + "\n".join(str(path) for path in paths)
+            self.profile_ready.emit(profile)
+            self.progress_updated.emit(100, "완료!")
+            self.finished.emit(message, segments)
+        except Exception as e:
+            self.error_occurred.emit(f"오류 발생: {str(e)}")
+
+class QueueWorker(QThread):
+    """여러 파일을 멀티 프로세스 작업 풀로 처리하는 워커 스레드"""
+    progress_updated = Signal(int, str)
+    job_progress = Signal(int, int, str)
+    job_finished = Signal(int, object, dict)
+    job_failed = Signal(int, str)
+    finished = Signal(str, list)
+    error_occurred = Signal(str)
+
+    def __init__(self, audio_files, options, workers=None):
+        super().__init__()
+        self.audio_files = audio_files
+        self.options = options
+        self.workers = workers
+
+    def run(self):
+        try:
+            if self.options.get("batch_size", 1) > 1:
+                self.run_batched()
+                return
+            from worker_pool import WorkerPool
+            self.progress_updated.emit(0, "작업 풀 시작 중...")
+            with WorkerPool(self.options, self.workers, progress_callback=self.job_progress.emit) as pool:
+                futures = {pool.submit(row, audio_file): row for row, audio_file in self.audio_files}
+                done = 0
+                for future in as_completed(futures):
+                    row = futures[future]
+                    try:
+                        segments, profile = future.result()
+                        self.job_finished.emit(row, segments, profile)
+                    except Exception as e:
+                        self.job_failed.emit(row, str(e))
+                    done += 1
+                    self.progress_updated.emit(
+                        int(done * 100 / len(futures)),
+                        f"대기열 처리 중... ({done}/{len(futures)}, 워커 {pool.workers}개)")
+            self.finished.emit("대기열의 모든 파일을 처리했습니다!", [])
+        except Exception as e:
+            self.error_occurred.emit(f"오류 발생: {str(e)}")
+
+    def run_batched(self):
+        """여러 파일의 창을 묶어 배치 추론 (같은 프로세스)"""
+        from batched_asr import BatchedTranscriber
+        self.progress_updated.emit(0, "배치 추론 시작 중...")
+        rows = {audio_file: row for row, audio_file in self.audio_files}
+        for row in rows.values():
+            self.job_progress.emit(row, 0, "배치 대기")
+        transcriber = BatchedTranscriber(
+            self.options["model"], self.options["device"], self.options["batch_size"],
+            self.options.get("hf_token"), backend=self.options.get("backend", DEFAULT_BACKEND),
+            vad=self.options.get("vad", False),
+            diarization_window_sec=self.options.get("diarization_window_sec"),
+            speaker_index=get_speaker_index() if self.options.get("speaker_index") else None,
+            archive=get_archive() if self.options.get("archive") else None)
+        started = time.perf_counter()
+        for done, (audio_file, result) in enumerate(transcriber.transcribe_files(list(rows)), 1):
+            if isinstance(result, Exception):
+                self.job_failed.emit(rows[audio_file], str(result))
+            else:
+                self.job_finished.emit(rows[audio_file], result, {})
+            elapsed = time.perf_counter() - started
+            self.progress_updated.emit(
+                int(done * 100 / len(rows)),
+                f"배치 추론 중... ({done}/{len(rows)}, {done / elapsed:.2f} clips/sec)")
+        self.finished.emit("대기열의 모든 파일을 처리했습니다!", [])
+
+class LiveWorker(QThread):
+    """실시간 전사 워커 스레드"""
+    partial_ready = Signal(dict)
+    final_ready = Signal(dict)
+    stats_ready = Signal(dict)
+    finished = Signal(str)
+    error_occurred = Signal(str)
+
+    def __init__(self, source, model_size, device, backend, hf_token=None):
+        super().__init__()
+        self.source = source
+        self.live = LiveTranscriber(model_size, device, backend, hf_token=hf_token,
+                                    on_partial=self.partial_ready.emit,
+                                    on_final=self.final_ready.emit,
+                                    on_stats=self.stats_ready.emit)
+
+    def stop(self):
+        self.live.stop()
+
+    def run(self):
+        try:
+            self.live.run(self.source)
+            self.finished.emit("실시간 전사를 마쳤습니다.")
+        except Exception as e:
+            self.error_occurred.emit(f"오류 발생: {str(e)}")
 
 class AudioTranscriberGUI(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.segments = []
+        self.segments = SegmentStore()
         self.audio_file = None
+        self.queue_results = {}
+        self.queue_profiles = {}
+        self.profile = None
+        self.live_worker = None
+        # 콜드 스타트 측정 (프로세스 시작 후 초): first_paint, models_ready, first_transcription
+        self.startup = {}
+        self.startup_probe = os.environ.get(STARTUP_AUDIO_ENV)
         self.init_ui()
         
     def init_ui(self):
@@ -150,14 +391,101 @@ class AudioTranscriberGUI(QMainWindow):
         tab_widget.addTab(main_tab, "전사하기")
         self.setup_main_tab(main_tab)
         
+        # 대기열 탭
+        queue_tab = QWidget()
+        tab_widget.addTab(queue_tab, "작업 대기열")
+        self.setup_queue_tab(queue_tab)
+        
+        # 실시간 전사 탭
+        live_tab = QWidget()
+        tab_widget.addTab(live_tab, "실시간 전사")
+        self.setup_live_tab(live_tab)
+        
+        # 검색 탭 (보관된 결과 전문 검색)
+        self.search_tab = QWidget()
+        tab_widget.addTab(self.search_tab, "검색")
+        self.setup_search_tab(self.search_tab)
+        self.tab_widget = tab_widget
+        tab_widget.currentChanged.connect(self.search_tab_shown)
+        
+        # 성능 분석 탭
+        profile_tab = QWidget()
+        tab_widget.addTab(profile_tab, "성능 분석")
+        self.setup_profile_tab(profile_tab)
+        
         # 설정 탭
         settings_tab = QWidget()
         tab_widget.addTab(settings_tab, "설정")
         self.setup_settings_tab(settings_tab)
         
-        # 상태바
+        # 상태바 (오른쪽에 결과 캐시 적중 여부 표시)
+        self.cache_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.cache_label)
+        self.vad_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.vad_label)
+        self.cascade_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.cascade_label)
+        self.warmup_label = QLabel("⏳ 모델 준비 중...")
+        self.warmup_label.setToolTip("torch / whisper / pyannote 를 백그라운드에서 불러오는 중입니다. "
+                                     "지금 전사를 시작해도 되지만 준비가 끝날 때까지 기다립니다.")
+        self.statusBar().addPermanentWidget(self.warmup_label)
         self.statusBar().showMessage("준비됨")
 
+    def first_paint(self):
+        """창이 처음 그려진 직후 호출: 콜드 스타트 기록 후 모델 준비 시작"""
+        self.mark_startup("first_paint")
+        self.warmup_worker = ModelWarmupWorker()
+        self.warmup_worker.ready.connect(self.models_ready)
+        self.warmup_worker.failed.connect(self.models_failed)
+        self.warmup_worker.start()
+        if self.startup_probe:
+            self.start_startup_probe()
+
+    def models_ready(self, info):
+        self.mark_startup("models_ready")
+        if info["cuda"] and self.device_combo.findText("cuda") < 0:
+            self.device_combo.addItem("cuda")
+            if not (self.worker_running() or self.startup_probe):
+                self.device_combo.setCurrentText("cuda")
+        self.warmup_label.setText(f"✅ 모델 준비됨 ({info['import_sec']:.1f}s)")
+        self.warmup_label.setToolTip("")
+
+    def models_failed(self, error_message):
+        self.warmup_label.setText("⚠️ 모델 준비 실패")
+        self.warmup_label.setToolTip(error_message)
+
+    def worker_running(self):
+        worker = getattr(self, "worker", None)
+        return worker is not None and worker.isRunning()
+
+    def mark_startup(self, name):
+        """콜드 스타트 단계 시각 기록 (단계마다 처음 한 번만)"""
+        if name in self.startup:
+            return
+        uptime = process_uptime_sec(IMPORT_STARTED)
+        self.startup[name] = round(uptime, 3)
+        self.startup_label.setText("시작 시간 (프로세스 시작 후): " + ", ".join(
+            f"{label} {self.startup[key]:.2f}s"
+            for key, label in (("first_paint", "첫 화면"), ("models_ready", "모델 준비"),
+                               ("first_transcription", "첫 전사 완료"))
+            if key in self.startup))
+        log_path = os.environ.get(STARTUP_LOG_ENV)
+        if log_path:
+            with open(log_path, "w", encoding="utf-8") as f:
+                json.dump(self.startup, f)
+
+    def start_startup_probe(self):
+        """측정 모드: 창이 뜨자마자 지정 파일을 전사하고 끝나면 종료"""
+        self.audio_file = self.startup_probe
+        self.model_combo.setCurrentText(os.environ.get(STARTUP_MODEL_ENV, "tiny"))
+        self.diarization_check.setChecked(False)
+        self.use_cache_check.setChecked(False)
+        self.checkpoint_check.setChecked(False)
+        self.auto_save_check.setChecked(False)
+        self.start_transcription()
+        self.worker.finished.connect(lambda *_: QTimer.singleShot(0, QApplication.quit))
+        self.worker.error_occurred.connect(lambda *_: QTimer.singleShot(0, QApplication.quit))
+
     def setup_main_tab(self, parent):
         layout = QVBoxLayout(parent)
         
@@ -186,14 +514,18 @@ class AudioTranscriberGUI(QMainWindow):
         self.model_combo.setCurrentText("medium")
         options_layout.addWidget(self.model_combo, 0, 1)
         
+        # ASR 엔진 (whisper-int8, faster-whisper 는 CPU 에서 더 빠름)
+        options_layout.addWidget(QLabel("ASR 엔진:"), 0, 4)
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(available_backends())
+        self.backend_combo.setCurrentText(DEFAULT_BACKEND)
+        options_layout.addWidget(self.backend_combo, 0, 5)
+        
         # 디바이스
         options_layout.addWidget(QLabel("처리 장치:"), 0, 2)
         self.device_combo = QComboBox()
-        if torch.cuda.is_available():
-            self.device_combo.addItems(["cpu", "cuda"])
-            self.device_combo.setCurrentText("cuda")
-        else:
-            self.device_combo.addItems(["cpu"])
+        # cuda 는 백그라운드에서 torch 를 가져온 뒤 사용 가능하면 추가 (models_ready)
+        self.device_combo.addItems(["cpu"])
         options_layout.addWidget(self.device_combo, 0, 3)
         
         # 화자 분리 옵션
@@ -208,6 +540,33 @@ class AudioTranscriberGUI(QMainWindow):
         self.hf_token_combo.setPlaceholderText("HuggingFace 토큰 입력")
         options_layout.addWidget(self.hf_token_combo, 1, 2, 1, 2)
         
+        # 단어 단위 화자 지정 (Whisper 단어 타임스탬프 사용)
+        self.word_timestamps_check = QCheckBox("단어 단위 화자 지정")
+        options_layout.addWidget(self.word_timestamps_check, 2, 0)
+        
+        # 스트리밍 모드 (청크 단위로 결과를 바로 표시)
+        self.streaming_check = QCheckBox("실시간 결과 표시 (스트리밍)")
+        self.streaming_check.setChecked(True)
+        self.streaming_check.setToolTip("화자 분리는 창 단위(설정하지 않으면 10분)로 처리되어 창이 끝날 때마다 "
+                                        "결과가 표시됩니다.")
+        options_layout.addWidget(self.streaming_check, 2, 1)
+        
+        # 무음 건너뛰기 (VAD)
+        self.vad_check = QCheckBox("무음 구간 건너뛰기 (VAD)")
+        self.vad_check.setToolTip("음성이 있는 구간만 전사/화자 분리하여 속도를 높이고 무음에서의 환각을 줄입니다.")
+        options_layout.addWidget(self.vad_check, 2, 2, 1, 2)
+        
+        # 단계적 전사 (작은 모델로 먼저 전사하고 신뢰도가 낮은 구간만 선택한 모델로 다시 전사)
+        self.cascade_check = QCheckBox("빠른 모델로 먼저 전사 (단계적 전사)")
+        self.cascade_check.setToolTip("초안 모델로 전체를 전사한 뒤, 신뢰도가 낮은 구간만 위에서 고른 "
+                                      "모델로 다시 전사합니다. 깨끗한 음성이 많을수록 빨라집니다.")
+        options_layout.addWidget(self.cascade_check, 3, 0, 1, 2)
+        options_layout.addWidget(QLabel("초안 모델:"), 3, 2)
+        self.cascade_model_combo = QComboBox()
+        self.cascade_model_combo.addItems(CASCADE_DRAFT_MODELS)
+        self.cascade_model_combo.setCurrentText(DEFAULT_DRAFT_MODEL)
+        options_layout.addWidget(self.cascade_model_combo, 3, 3)
+        
         layout.addWidget(options_group)
         
         # 실행 버튼
@@ -232,6 +591,12 @@ class AudioTranscriberGUI(QMainWindow):
         """)
         layout.addWidget(self.start_btn)
         
+        # 취소 버튼 (청크 경계에서 중지)
+        self.cancel_btn = QPushButton("⏹ 취소")
+        self.cancel_btn.clicked.connect(self.cancel_transcription)
+        self.cancel_btn.setEnabled(False)
+        layout.addWidget(self.cancel_btn)
+        
         # 진행률 표시
         progress_group = QGroupBox("📊 진행 상황")
         progress_layout = QVBoxLayout(progress_group)
@@ -248,10 +613,11 @@ class AudioTranscriberGUI(QMainWindow):
         result_group = QGroupBox("📝 전사 결과")
         result_layout = QVBoxLayout(result_group)
         
-        self.result_text = QTextEdit()
-        self.result_text.setReadOnly(True)
-        self.result_text.setMaximumHeight(200)
-        result_layout.addWidget(self.result_text)
+        # 긴 결과도 보이는 행만 그리는 표 (화자 필터, 클릭하면 해당 위치 재생)
+        self.transcript_view = TranscriptView()
+        self.transcript_view.setMinimumHeight(200)
+        self.transcript_view.set_segments(self.segments)
+        result_layout.addWidget(self.transcript_view)
         
         # 저장 버튼들
         save_layout = QHBoxLayout()
@@ -271,6 +637,16 @@ class AudioTranscriberGUI(QMainWindow):
         self.save_json_btn.setEnabled(False)
         save_layout.addWidget(self.save_json_btn)
         
+        self.save_srt_btn = QPushButton("🎬 SRT 저장")
+        self.save_srt_btn.clicked.connect(lambda: self.save_results("srt"))
+        self.save_srt_btn.setEnabled(False)
+        save_layout.addWidget(self.save_srt_btn)
+        
+        self.save_vtt_btn = QPushButton("🎞️ VTT 저장")
+        self.save_vtt_btn.clicked.connect(lambda: self.save_results("vtt"))
+        self.save_vtt_btn.setEnabled(False)
+        save_layout.addWidget(self.save_vtt_btn)
+        
         self.open_folder_btn = QPushButton("📂 폴더 열기")
         self.open_folder_btn.clicked.connect(self.open_output_folder)
         self.open_folder_btn.setEnabled(False)
@@ -279,6 +655,325 @@ class AudioTranscriberGUI(QMainWindow):
         result_layout.addLayout(save_layout)
         layout.addWidget(result_group)
 
+    def setup_queue_tab(self, parent):
+        layout = QVBoxLayout(parent)
+        
+        # 대기열 조작 버튼
+        control_layout = QHBoxLayout()
+        
+        self.queue_add_btn = QPushButton("➕ 파일 추가")
+        self.queue_add_btn.clicked.connect(self.add_queue_files)
+        control_layout.addWidget(self.queue_add_btn)
+        
+        self.queue_clear_btn = QPushButton("🗑️ 비우기")
+        self.queue_clear_btn.clicked.connect(self.clear_queue)
+        control_layout.addWidget(self.queue_clear_btn)
+        
+        control_layout.addWidget(QLabel("동시 작업 수 (0: 자동):"))
+        self.queue_workers_spin = QSpinBox()
+        self.queue_workers_spin.setRange(0, os.cpu_count() or 1)
+        control_layout.addWidget(self.queue_workers_spin)
+        
+        control_layout.addWidget(QLabel("배치 크기 (1: 끔):"))
+        self.queue_batch_spin = QSpinBox()
+        self.queue_batch_spin.setRange(1, 64)
+        control_layout.addWidget(self.queue_batch_spin)
+        
+        self.queue_start_btn = QPushButton("🚀 대기열 실행")
+        self.queue_start_btn.clicked.connect(self.start_queue)
+        control_layout.addWidget(self.queue_start_btn)
+        
+        layout.addLayout(control_layout)
+        
+        # 작업 목록 (파일, 상태, 진행률)
+        self.queue_table = QTableWidget(0, 3)
+        self.queue_table.setHorizontalHeaderLabels(["파일", "상태", "진행률"])
+        self.queue_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.queue_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.queue_table.cellDoubleClicked.connect(self.show_queue_result)
+        layout.addWidget(self.queue_table)
+        
+        layout.addWidget(QLabel("완료된 작업을 더블클릭하면 '전사하기' 탭에서 결과를 확인하고 저장할 수 있습니다."))
+
+    def setup_live_tab(self, parent):
+        layout = QVBoxLayout(parent)
+        
+        # 입력 선택 (모델, 장치, 엔진은 '전사하기' 탭 설정 사용)
+        source_layout = QHBoxLayout()
+        source_layout.addWidget(QLabel("입력:"))
+        self.live_source_combo = QComboBox()
+        self.live_source_combo.addItem("마이크", "mic")
+        self.live_source_combo.addItem("음성 파일 (실제 속도 재생)", "file")
+        self.live_source_combo.addItem("TCP 스트림 (16kHz s16le PCM)", "tcp")
+        self.live_source_combo.currentIndexChanged.connect(self.update_live_source)
+        source_layout.addWidget(self.live_source_combo)
+        
+        self.live_source_edit = QLineEdit()
+        source_layout.addWidget(self.live_source_edit)
+        
+        self.live_browse_btn = QPushButton("찾아보기")
+        self.live_browse_btn.clicked.connect(self.browse_live_file)
+        source_layout.addWidget(self.live_browse_btn)
+        
+        self.live_start_btn = QPushButton("🎙️ 시작")
+        self.live_start_btn.clicked.connect(self.start_live)
+        source_layout.addWidget(self.live_start_btn)
+        
+        self.live_stop_btn = QPushButton("⏹️ 중지")
+        self.live_stop_btn.clicked.connect(self.stop_live)
+        self.live_stop_btn.setEnabled(False)
+        source_layout.addWidget(self.live_stop_btn)
+        layout.addLayout(source_layout)
+        self.update_live_source()
+        
+        # 확정 결과와 아직 바뀔 수 있는 임시 결과
+        self.live_text = QTextEdit()
+        self.live_text.setReadOnly(True)
+        layout.addWidget(self.live_text)
+        
+        self.live_partial_label = QLabel("")
+        self.live_partial_label.setWordWrap(True)
+        self.live_partial_label.setStyleSheet("color: gray; font-style: italic;")
+        layout.addWidget(self.live_partial_label)
+        
+        # 지연: 발화(캡처) 시각부터 화면에 표시되기까지
+        self.live_latency_label = QLabel("지연 시간: -")
+        layout.addWidget(self.live_latency_label)
+
+    def update_live_source(self):
+        kind = self.live_source_combo.currentData()
+        self.live_browse_btn.setEnabled(kind == "file")
+        self.live_source_edit.clear()
+        self.live_source_edit.setPlaceholderText({
+            "mic": "입력 장치 번호 또는 이름 (비우면 기본 장치)",
+            "file": "음성 파일 경로",
+            "tcp": "호스트:포트",
+        }[kind])
+
+    def browse_live_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "음성 파일 선택", "",
+            "Audio Files (*.mp3 *.wav *.flac *.m4a *.ogg *.aac);;All Files (*)")
+        if file_path:
+            self.live_source_edit.setText(file_path)
+
+    def start_live(self):
+        kind = self.live_source_combo.currentData()
+        value = self.live_source_edit.text().strip()
+        try:
+            if kind == "file":
+                if not value:
+                    QMessageBox.warning(self, "경고", "재생할 음성 파일을 선택해주세요.")
+                    return
+                source = FileReplaySource(value)
+            elif kind == "tcp":
+                source = open_source(f"tcp://{value}")
+            else:
+                source = open_source(f"mic:{value}" if value else "mic")
+        except Exception as e:
+            QMessageBox.critical(self, "입력 오류", f"입력을 열 수 없습니다:\n{str(e)}")
+            return
+        
+        # 화자 분리를 켜고 토큰이 있으면 pyannote 임베딩으로 화자 추적
+        hf_token = self.hf_token_combo.currentText().strip()
+        use_diarization = self.diarization_check.isChecked() and hf_token
+        
+        self.live_text.clear()
+        self.live_partial_label.setText("")
+        self.live_latency = {"partial": LatencyStats(), "final": LatencyStats()}
+        self.live_latency_label.setText("지연 시간: -")
+        
+        self.live_worker = LiveWorker(source, self.model_combo.currentText(), self.device_combo.currentText(),
+                                      self.backend_combo.currentText(), hf_token if use_diarization else None)
+        self.live_worker.partial_ready.connect(self.show_live_partial)
+        self.live_worker.final_ready.connect(self.append_live_final)
+        self.live_worker.stats_ready.connect(self.update_live_stats)
+        self.live_worker.finished.connect(self.live_finished)
+        self.live_worker.error_occurred.connect(self.live_error)
+        self.live_start_btn.setEnabled(False)
+        self.live_stop_btn.setEnabled(True)
+        self.statusBar().showMessage("실시간 전사 중... (모델 로딩 후 결과 표시)")
+        self.live_worker.start()
+
+    def stop_live(self):
+        self.live_stop_btn.setEnabled(False)
+        if self.live_worker:
+            self.live_worker.stop()
+
+    def show_live_partial(self, event):
+        self.live_partial_label.setText(event["text"])
+        if event["text"]:
+            self.live_latency["partial"].add(time.perf_counter() - event["capture_time"])
+
+    def append_live_final(self, event):
+        self.live_text.append(f"[{event['speaker']}] {event['text']}")
+        self.live_latency["final"].add(time.perf_counter() - event["capture_time"])
+
+    def update_live_stats(self, stats):
+        parts = []
+        for kind, name in (("partial", "임시"), ("final", "확정")):
+            summary = self.live_latency[kind].summary()
+            if summary["count"]:
+                parts.append(f"{name} p50 {summary['p50']:.2f}s / p95 {summary['p95']:.2f}s")
+        self.live_latency_label.setText(
+            f"지연 시간 (발화 → 화면): {', '.join(parts) or '-'}  |  추론 {stats['infer_sec']:.2f}s, "
+            f"버퍼 {stats['buffer_sec']:.1f}s, 화자 {stats['speakers']}명")
+
+    def live_finished(self, message):
+        self.live_start_btn.setEnabled(True)
+        self.live_stop_btn.setEnabled(False)
+        self.live_partial_label.setText("")
+        self.statusBar().showMessage(message)
+
+    def live_error(self, error_message):
+        self.live_finished("실시간 전사 중 오류가 발생했습니다.")
+        QMessageBox.critical(self, "오류", error_message)
+
+    def setup_search_tab(self, parent):
+        layout = QVBoxLayout(parent)
+
+        # 검색어 (단어를 순서대로 잇는 구절, 단어마다 앞부분 일치)
+        query_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("검색할 구절 (예: 예산 회의) - 비우면 아래 조건만 사용")
+        self.search_edit.returnPressed.connect(self.run_search)
+        query_layout.addWidget(self.search_edit)
+        self.search_btn = QPushButton("🔍 검색")
+        self.search_btn.clicked.connect(self.run_search)
+        query_layout.addWidget(self.search_btn)
+        layout.addLayout(query_layout)
+
+        # 화자, 녹음 날짜, 녹음 안의 위치
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("화자:"))
+        self.search_speaker_combo = QComboBox()
+        self.search_speaker_combo.setEditable(True)
+        self.search_speaker_combo.setMinimumWidth(140)
+        filter_layout.addWidget(self.search_speaker_combo)
+
+        self.search_date_check = QCheckBox("녹음 날짜:")
+        filter_layout.addWidget(self.search_date_check)
+        self.search_since_edit = QDateEdit(QDate.currentDate().addMonths(-3))
+        self.search_until_edit = QDateEdit(QDate.currentDate())
+        for edit in (self.search_since_edit, self.search_until_edit):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.setEnabled(False)
+            self.search_date_check.toggled.connect(edit.setEnabled)
+        filter_layout.addWidget(self.search_since_edit)
+        filter_layout.addWidget(QLabel("~"))
+        filter_layout.addWidget(self.search_until_edit)
+
+        self.search_position_check = QCheckBox("위치 (분):")
+        filter_layout.addWidget(self.search_position_check)
+        self.search_from_spin = QSpinBox()
+        self.search_to_spin = QSpinBox()
+        for spin, value in ((self.search_from_spin, 0), (self.search_to_spin, 60)):
+            spin.setRange(0, 24 * 60)
+            spin.setValue(value)
+            spin.setEnabled(False)
+            self.search_position_check.toggled.connect(spin.setEnabled)
+        filter_layout.addWidget(self.search_from_spin)
+        filter_layout.addWidget(QLabel("~"))
+        filter_layout.addWidget(self.search_to_spin)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+
+        # 결과 (최근 보관한 녹음부터)
+        self.search_table = QTableWidget(0, 5)
+        self.search_table.setHorizontalHeaderLabels(["녹음 날짜", "파일", "화자", "위치", "내용"])
+        self.search_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
+        self.search_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.search_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.search_table.setWordWrap(False)
+        self.search_table.cellDoubleClicked.connect(self.open_search_result)
+        layout.addWidget(self.search_table)
+
+        self.search_status_label = QLabel("결과를 더블클릭하면 '전사하기' 탭에서 녹음 전체를 그 위치부터 볼 수 있습니다.")
+        layout.addWidget(self.search_status_label)
+
+    def search_tab_shown(self, index):
+        """검색 탭을 열 때 보관된 화자 목록 갱신"""
+        if self.tab_widget.widget(index) is not self.search_tab:
+            return
+        current = self.search_speaker_combo.currentText()
+        self.search_speaker_combo.clear()
+        self.search_speaker_combo.addItem("전체")
+        try:
+            self.search_speaker_combo.addItems([name for name, *_ in get_archive().speakers()])
+        except Exception as e:
+            self.search_status_label.setText(f"보관함을 열 수 없습니다: {e}")
+        self.search_speaker_combo.setCurrentText(current or "전체")
+
+    def run_search(self):
+        speaker = self.search_speaker_combo.currentText().strip()
+        since = until = start_sec = end_sec = None
+        if self.search_date_check.isChecked():
+            since = self.search_since_edit.date().startOfDay().toSecsSinceEpoch()
+            # 끝 날짜 포함
+            until = self.search_until_edit.date().addDays(1).startOfDay().toSecsSinceEpoch()
+        if self.search_position_check.isChecked():
+            start_sec = self.search_from_spin.value() * 60.0
+            end_sec = self.search_to_spin.value() * 60.0
+
+        started = time.perf_counter()
+        try:
+            hits = get_archive().search(self.search_edit.text(), None if speaker in ("", "전체") else speaker,
+                                        since, until, start_sec, end_sec)
+        except Exception as e:
+            QMessageBox.warning(self, "검색 오류", str(e))
+            return
+        elapsed = time.perf_counter() - started
+
+        self.search_table.setRowCount(len(hits))
+        for row, hit in enumerate(hits):
+            values = [time.strftime("%Y-%m-%d", time.localtime(hit["recorded_at"])), Path(hit["file"]).name,
+                      hit["speaker"], format_time(hit["start"]), hit["text"]]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 1:
+                    item.setToolTip(hit["file"])
+                elif column == 4:
+                    item.setToolTip(hit["text"])
+                self.search_table.setItem(row, column, item)
+            self.search_table.item(row, 0).setData(Qt.UserRole, hit)
+        more = f", 최대 {DEFAULT_SEARCH_LIMIT}건까지 표시" if len(hits) >= DEFAULT_SEARCH_LIMIT else ""
+        self.search_status_label.setText(f"{len(hits)}건 ({elapsed * 1000:.0f}ms{more})")
+
+    def open_search_result(self, row, _column):
+        """검색 결과의 녹음 전체를 '전사하기' 탭에 표시하고 해당 위치로 이동"""
+        hit = self.search_table.item(row, 0).data(Qt.UserRole)
+        segments = get_archive().transcript(hit["recording"])
+        self.audio_file = hit["file"]
+        self.file_label.setText(Path(self.audio_file).name)
+        # 작업 서버에 올렸던 파일처럼 원본이 없으면 재생하지 않음
+        self.transcript_view.set_audio_file(self.audio_file if os.path.exists(self.audio_file) else None)
+        self.show_profile(None)
+        self.transcription_finished("", segments)
+        self.tab_widget.setCurrentIndex(0)
+        self.transcript_view.show_time(hit["start"])
+
+    def setup_profile_tab(self, parent):
+        layout = QVBoxLayout(parent)
+        
+        self.profile_summary = QLabel("전사를 마치면 단계별 소요 시간과 자원 사용량이 표시됩니다.")
+        self.profile_summary.setWordWrap(True)
+        layout.addWidget(self.profile_summary)
+        
+        self.startup_label = QLabel("")
+        layout.addWidget(self.startup_label)
+        
+        # 단계별 측정 결과 (같은 단계는 합산)
+        self.profile_table = QTableWidget(0, 6)
+        self.profile_table.setHorizontalHeaderLabels(
+            ["단계", "횟수", "경과 시간(초)", "CPU 시간(초)", "최대 RSS(MB)", "RTF"])
+        self.profile_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.profile_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.profile_table)
+        
+        layout.addWidget(QLabel("결과를 저장하면 보고서가 transcript_<파일명>.profile.json 으로 함께 저장됩니다."))
+
     def setup_settings_tab(self, parent):
         layout = QVBoxLayout(parent)
         
@@ -295,6 +990,71 @@ class AudioTranscriberGUI(QMainWindow):
         output_browse_btn.clicked.connect(self.browse_output_folder)
         settings_layout.addWidget(output_browse_btn, 0, 2)
         
+        # 결과 캐시
+        self.use_cache_check = QCheckBox("결과 캐시 사용 (같은 파일/설정 재실행 시 재사용)")
+        self.use_cache_check.setChecked(True)
+        settings_layout.addWidget(self.use_cache_check, 1, 0, 1, 2)
+        
+        clear_cache_btn = QPushButton("캐시 비우기")
+        clear_cache_btn.clicked.connect(self.clear_result_cache)
+        settings_layout.addWidget(clear_cache_btn, 1, 2)
+        
+        # 체크포인트 (중단된 작업 이어하기)
+        self.checkpoint_check = QCheckBox("체크포인트 저장 (중단되거나 취소된 작업을 이어서 진행)")
+        self.checkpoint_check.setChecked(False)
+        self.checkpoint_check.setToolTip("청크 단위로 전사하므로 스트리밍이 아닐 때도 파일 전체를 한 번에 전사한 결과와 "
+                                         "청크 경계에서 문장이 조금 다를 수 있습니다.")
+        settings_layout.addWidget(self.checkpoint_check, 2, 0, 1, 3)
+        
+        # 전사하며 바로 저장 (선택한 형식을 한 번에, 청크마다 디스크에 기록)
+        self.auto_save_check = QCheckBox("전사하며 출력 폴더에 바로 저장:")
+        settings_layout.addWidget(self.auto_save_check, 3, 0)
+        auto_save_layout = QHBoxLayout()
+        self.auto_save_format_checks = {}
+        for fmt in EXPORT_FORMATS:
+            check = QCheckBox(fmt.upper())
+            check.setChecked(fmt in ("txt", "csv", "jsonl"))
+            self.auto_save_format_checks[fmt] = check
+            auto_save_layout.addWidget(check)
+        settings_layout.addLayout(auto_save_layout, 3, 1, 1, 2)
+        
+        # 긴 녹음의 화자 분리 메모리 제한 (창 길이보다 긴 파일은 겹치는 창 단위로 처리)
+        settings_layout.addWidget(QLabel("화자 분리 창 길이 (분, 0: 파일 전체, 스트리밍은 10분):"), 4, 0)
+        self.diarization_window_spin = QSpinBox()
+        self.diarization_window_spin.setRange(0, 120)
+        self.diarization_window_spin.setValue(0)
+        self.diarization_window_spin.setToolTip("긴 녹음에서 메모리가 부족하면 10분 정도로 설정하세요. "
+                                                "창마다 화자 임베딩을 비교해 화자 이름을 유지합니다.")
+        settings_layout.addWidget(self.diarization_window_spin, 4, 1)
+        
+        # 작업 서버 (transcriber_cli.py serve) 에서 전사
+        self.remote_check = QCheckBox("작업 서버에서 전사:")
+        self.remote_check.setToolTip("모델, 장치, 엔진, 화자 분리는 서버를 시작할 때 정한 설정을 사용합니다.")
+        settings_layout.addWidget(self.remote_check, 5, 0)
+        self.remote_url_edit = QLineEdit(f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+        settings_layout.addWidget(self.remote_url_edit, 5, 1, 1, 2)
+        
+        # 파일 간 화자 식별 (transcriber_cli.py speakers 로 등록/이름 붙이기)
+        self.speaker_index_check = QCheckBox("등록된 화자 이름으로 표시 (화자 색인)")
+        self.speaker_index_check.setToolTip("화자 분리 결과를 등록된 화자의 음성 임베딩과 비교해 이름을 붙이고, "
+                                            "파일별 화자를 색인에 기록합니다.")
+        settings_layout.addWidget(self.speaker_index_check, 6, 0, 1, 3)
+        
+        # 긴 파일 하나를 청크로 나눠 여러 프로세스가 동시에 전사
+        settings_layout.addWidget(QLabel("파일 분할 병렬 전사 (프로세스 수, 0: 사용 안 함):"), 7, 0)
+        self.parallel_workers_spin = QSpinBox()
+        self.parallel_workers_spin.setRange(0, max(1, os.cpu_count() or 1))
+        self.parallel_workers_spin.setValue(0)
+        self.parallel_workers_spin.setToolTip("무음 경계에서 나눈 청크를 여러 프로세스가 동시에 전사합니다. "
+                                              "프로세스마다 모델을 따로 로드하므로 메모리를 그만큼 더 씁니다.")
+        settings_layout.addWidget(self.parallel_workers_spin, 7, 1)
+        
+        # 검색 보관함 ('검색' 탭, transcriber_cli.py archive search)
+        self.archive_check = QCheckBox("완료된 결과를 검색 보관함에 기록")
+        self.archive_check.setChecked(True)
+        self.archive_check.setToolTip("세그먼트를 화자, 시간, 원본 파일, 모델과 함께 보관하여 '검색' 탭에서 찾을 수 있습니다.")
+        settings_layout.addWidget(self.archive_check, 8, 0, 1, 3)
+        
         layout.addWidget(settings_group)
         
         # 정보 그룹
@@ -336,7 +1096,19 @@ class AudioTranscriberGUI(QMainWindow):
         layout.addWidget(info_group)
         layout.addStretch()
 
+    def preload_models(self):
+        """파일을 고르는 동안 현재 선택된 모델을 백그라운드에서 미리 로드"""
+        device = self.device_combo.currentText()
+        engine = get_backend(self.backend_combo.currentText())
+        engine.preload(self.model_combo.currentText(), device)
+        if self.cascade_model():
+            engine.preload(self.cascade_model(), device)
+        hf_token = self.hf_token_combo.currentText().strip()
+        if self.diarization_check.isChecked() and hf_token:
+            preload_diarization_pipeline(hf_token, device)
+
     def browse_file(self):
+        self.preload_models()
         file_dialog = QFileDialog()
         file_path, _ = file_dialog.getOpenFileName(
             self, 
@@ -350,6 +1122,103 @@ class AudioTranscriberGUI(QMainWindow):
             self.file_label.setText(Path(file_path).name)
             self.statusBar().showMessage(f"파일 선택됨: {Path(file_path).name}")
 
+    def add_queue_files(self):
+        self.preload_models()
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, 
+            "음성 파일 선택", 
+            "", 
+            "Audio Files (*.mp3 *.wav *.flac *.m4a *.ogg *.aac);;All Files (*)"
+        )
+        for file_path in file_paths:
+            row = self.queue_table.rowCount()
+            self.queue_table.insertRow(row)
+            name_item = QTableWidgetItem(Path(file_path).name)
+            name_item.setData(Qt.UserRole, file_path)
+            self.queue_table.setItem(row, 0, name_item)
+            self.queue_table.setItem(row, 1, QTableWidgetItem("대기"))
+            self.queue_table.setItem(row, 2, QTableWidgetItem("0%"))
+
+    def clear_queue(self):
+        self.queue_table.setRowCount(0)
+        self.queue_results.clear()
+        self.queue_profiles.clear()
+
+    def start_queue(self):
+        pending = [(row, self.queue_table.item(row, 0).data(Qt.UserRole))
+                   for row in range(self.queue_table.rowCount())
+                   if row not in self.queue_results]
+        if not pending:
+            QMessageBox.warning(self, "경고", "대기열에 처리할 파일이 없습니다.")
+            return
+        
+        hf_token = self.hf_token_combo.currentText().strip()
+        use_diarization = self.diarization_check.isChecked()
+        if use_diarization and not hf_token:
+            QMessageBox.warning(self, "경고", "화자 분리를 사용하려면 HuggingFace 토큰을 입력해주세요.")
+            return
+        
+        options = {
+            "model": self.model_combo.currentText(),
+            "backend": self.backend_combo.currentText(),
+            "device": self.device_combo.currentText(),
+            "hf_token": hf_token if use_diarization else None,
+            "word_timestamps": self.word_timestamps_check.isChecked(),
+            "use_cache": self.use_cache_check.isChecked(),
+            "checkpoint": self.checkpoint_check.isChecked(),
+            "vad": self.vad_check.isChecked(),
+            "diarization_window_sec": self.diarization_window_sec(),
+            "speaker_index": self.speaker_index_check.isChecked(),
+            "cascade_model": self.cascade_model(),
+            "archive": self.archive_check.isChecked(),
+            "batch_size": self.queue_batch_spin.value(),
+        }
+        
+        self.queue_start_btn.setEnabled(False)
+        self.queue_add_btn.setEnabled(False)
+        self.queue_clear_btn.setEnabled(False)
+        
+        self.queue_worker = QueueWorker(pending, options, self.queue_workers_spin.value() or None)
+        self.queue_worker.progress_updated.connect(self.update_progress)
+        self.queue_worker.job_progress.connect(self.update_queue_progress)
+        self.queue_worker.job_finished.connect(self.queue_job_finished)
+        self.queue_worker.job_failed.connect(self.queue_job_failed)
+        self.queue_worker.finished.connect(self.queue_finished)
+        self.queue_worker.error_occurred.connect(self.queue_error)
+        self.queue_worker.start()
+
+    def update_queue_progress(self, row, value, message):
+        self.queue_table.item(row, 1).setText(message)
+        self.queue_table.item(row, 2).setText(f"{value}%")
+
+    def queue_job_finished(self, row, segments, profile):
+        self.queue_results[row] = segments
+        self.queue_profiles[row] = profile or None
+        self.queue_table.item(row, 1).setText("완료")
+        self.queue_table.item(row, 2).setText("100%")
+
+    def queue_job_failed(self, row, error_message):
+        self.queue_table.item(row, 1).setText(f"오류: {error_message}")
+
+    def queue_finished(self, message, _):
+        self.queue_start_btn.setEnabled(True)
+        self.queue_add_btn.setEnabled(True)
+        self.queue_clear_btn.setEnabled(True)
+        self.statusBar().showMessage(message)
+
+    def queue_error(self, error_message):
+        self.queue_finished("오류 발생", [])
+        QMessageBox.critical(self, "오류", error_message)
+
+    def show_queue_result(self, row, _column):
+        if row not in self.queue_results:
+            return
+        self.audio_file = self.queue_table.item(row, 0).data(Qt.UserRole)
+        self.file_label.setText(Path(self.audio_file).name)
+        self.transcript_view.set_audio_file(self.audio_file)
+        self.show_profile(self.queue_profiles.get(row))
+        self.transcription_finished("", self.queue_results[row])
+
     def browse_output_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "출력 폴더 선택")
         if folder:
@@ -363,7 +1232,7 @@ class AudioTranscriberGUI(QMainWindow):
         hf_token = self.hf_token_combo.currentText().strip()
         use_diarization = self.diarization_check.isChecked()
         
-        if use_diarization and not hf_token:
+        if use_diarization and not hf_token and not self.remote_check.isChecked():
             QMessageBox.warning(self, "경고", "화자 분리를 사용하려면 HuggingFace 토큰을 입력해주세요.")
             return
         
@@ -371,54 +1240,185 @@ class AudioTranscriberGUI(QMainWindow):
         self.start_btn.setEnabled(False)
         self.progress_bar.setValue(0)
         self.status_label.setText("전사 준비 중...")
-        self.result_text.clear()
+        self.segments = SegmentStore()
+        self.transcript_view.set_segments(self.segments)
+        self.transcript_view.set_audio_file(self.audio_file)
+        self.cache_label.setText("")
+        self.vad_label.setText("")
+        self.cascade_label.setText("")
+        self.show_profile(None)
         
         # 토큰 히스토리에 추가
         if hf_token and hf_token not in [self.hf_token_combo.itemText(i) for i in range(self.hf_token_combo.count())]:
             self.hf_token_combo.addItem(hf_token)
         
         # 워커 스레드 시작
-        self.worker = TranscriptionWorker(
-            self.audio_file,
-            self.model_combo.currentText(),
-            self.device_combo.currentText(),
-            hf_token if use_diarization else None,
-            use_diarization
-        )
+        if self.remote_check.isChecked():
+            options = {
+                "word_timestamps": self.word_timestamps_check.isChecked(),
+                "vad": self.vad_check.isChecked(),
+                "diarization_window_sec": self.diarization_window_sec(),
+                "use_cache": self.use_cache_check.isChecked(),
+                "speaker_index": self.speaker_index_check.isChecked(),
+                "archive": self.archive_check.isChecked(),
+            }
+            self.worker = RemoteTranscriptionWorker(self.remote_url_edit.text().strip(), self.audio_file,
+                                                    options, self.auto_save_options())
+        else:
+            self.worker = TranscriptionWorker(
+                self.audio_file,
+                self.model_combo.currentText(),
+                self.device_combo.currentText(),
+                hf_token if use_diarization else None,
+                use_diarization,
+                self.word_timestamps_check.isChecked(),
+                self.streaming_check.isChecked(),
+                self.use_cache_check.isChecked(),
+                self.checkpoint_check.isChecked(),
+                self.backend_combo.currentText(),
+                self.vad_check.isChecked(),
+                self.auto_save_options(),
+                self.diarization_window_sec(),
+                self.speaker_index_check.isChecked(),
+                self.parallel_workers_spin.value(),
+                self.cascade_model(),
+                self.archive_check.isChecked()
+            )
         
         self.worker.progress_updated.connect(self.update_progress)
+        self.worker.segment_ready.connect(self.append_segment)
+        self.worker.cache_status.connect(self.update_cache_status)
+        self.worker.vad_status.connect(self.update_vad_status)
+        self.worker.cascade_status.connect(self.update_cascade_status)
+        self.worker.profile_ready.connect(self.show_profile)
         self.worker.finished.connect(self.transcription_finished)
+        self.worker.cancelled.connect(self.transcription_cancelled)
         self.worker.error_occurred.connect(self.transcription_error)
         
+        self.cancel_btn.setEnabled(True)
         self.worker.start()
 
+    def auto_save_options(self):
+        """전사하며 바로 저장할 (출력 폴더, 형식 목록), 사용하지 않으면 None"""
+        formats = [fmt for fmt, check in self.auto_save_format_checks.items() if check.isChecked()]
+        if not self.auto_save_check.isChecked() or not formats:
+            return None
+        return Path(self.output_folder.text()), formats
+
+    def cascade_model(self):
+        """단계적 전사의 초안 모델 (사용하지 않거나 선택한 모델과 같으면 None)"""
+        draft = self.cascade_model_combo.currentText()
+        if not self.cascade_check.isChecked() or draft == self.model_combo.currentText():
+            return None
+        return draft
+
+    def diarization_window_sec(self):
+        minutes = self.diarization_window_spin.value()
+        return minutes * 60.0 if minutes else None
+
+    def cancel_transcription(self):
+        self.cancel_btn.setEnabled(False)
+        self.status_label.setText(self.worker.cancel_message)
+        self.worker.cancel()
+
     def update_progress(self, value, message):
         self.progress_bar.setValue(value)
         self.status_label.setText(message)
         self.statusBar().showMessage(message)
 
-    def transcription_finished(self, message, segments):
-        self.segments = segments
+    def update_cache_status(self, hits):
+        names = {"asr": "전사", "diarization": "화자 분리"}
+        parts = [f"{names[stage]} {'✓' if hit else '✗'}" for stage, hit in hits.items()]
+        self.cache_label.setText("캐시: " + ", ".join(parts))
+
+    def update_vad_status(self, stats):
+        total = stats["total_sec"]
+        skipped = stats["skipped_sec"]
+        ratio = 100 * skipped / total if total else 0
+        self.vad_label.setText(f"무음 건너뜀: {skipped / 60:.1f}분 / {total / 60:.1f}분 ({ratio:.0f}%)")
+
+    def update_cascade_status(self, report):
+        self.cascade_label.setText(describe_cascade(report))
+
+    def show_profile(self, profile):
+        """단계별 성능 보고서를 '성능 분석' 탭에 표시"""
+        self.profile = profile
+        self.profile_table.setRowCount(0)
+        if not profile:
+            self.profile_summary.setText("전사를 마치면 단계별 소요 시간과 자원 사용량이 표시됩니다.")
+            return
         
-        # 결과 텍스트 표시
-        result_text = ""
-        for seg in segments:
-            result_text += f"[{seg['speaker']}] {seg['text']}\n"
+        def _fmt(value, digits=2):
+            return "-" if value is None else f"{value:.{digits}f}"
         
-        self.result_text.setText(result_text)
+        meta = profile.get("meta", {})
+        self.profile_summary.setText(
+            f"모델: {meta.get('model')} ({meta.get('backend')}, {meta.get('device')}) | "
+            f"오디오 {_fmt(profile.get('audio_sec'), 1)}초 | 전체 {_fmt(profile.get('wall_sec'), 1)}초 | "
+            f"RTF {_fmt(profile.get('rtf'), 3)} | 최대 RSS {_fmt(profile.get('peak_rss_mb'), 0)}MB"
+            + (f"\n{describe_cascade(meta['cascade'])}" if meta.get("cascade") else ""))
+        for stage in profile.get("stages", ()):
+            row = self.profile_table.rowCount()
+            self.profile_table.insertRow(row)
+            # 다른 단계와 동시에 실행되었으면 CPU 시간에 그 단계의 사용량도 섞여 있음을 표시
+            concurrent = stage.get("concurrent") or []
+            values = [stage["name"], str(stage["count"]), _fmt(stage["wall_sec"]),
+                      _fmt(stage["cpu_sec"]) + (" *" if concurrent else ""),
+                      _fmt(stage["peak_rss_mb"], 0), _fmt(stage["rtf"], 3)]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 3 and concurrent:
+                    item.setToolTip("동시에 실행된 단계의 CPU 시간 포함: " + ", ".join(concurrent))
+                self.profile_table.setItem(row, column, item)
+
+    def clear_result_cache(self):
+        get_result_cache().clear()
+        self.statusBar().showMessage("결과 캐시를 비웠습니다.")
+
+    def append_segment(self, seg):
+        """스트리밍 모드에서 완료된 세그먼트를 결과 창에 바로 추가"""
+        # self.segments 에 추가되고 표에는 모아서 한 번에 표시됨
+        self.transcript_view.append_segment(seg)
+
+    def transcription_finished(self, message, segments):
+        if message:
+            self.mark_startup("first_transcription")
+        # 스트리밍 모드에서는 세그먼트가 이미 append_segment 로 표시됨
+        if segments:
+            self.segments = segments
+            self.transcript_view.set_segments(segments)
+        else:
+            self.transcript_view.flush()
         
         # UI 상태 복원
         self.start_btn.setEnabled(True)
-        self.save_txt_btn.setEnabled(True)
-        self.save_csv_btn.setEnabled(True)
-        self.save_json_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.set_save_enabled(True)
         self.open_folder_btn.setEnabled(True)
         
         self.statusBar().showMessage("전사 완료!")
-        QMessageBox.information(self, "완료", message)
+        if message:
+            QMessageBox.information(self, "완료", message)
+
+    def transcription_cancelled(self, message):
+        self.transcript_view.flush()
+        self.start_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.status_label.setText(message)
+        self.statusBar().showMessage("취소됨")
+        # 취소 전까지 표시된 결과는 저장할 수 있음
+        if self.segments:
+            self.set_save_enabled(True)
+
+    def set_save_enabled(self, enabled):
+        for button in (self.save_txt_btn, self.save_csv_btn, self.save_json_btn,
+                       self.save_srt_btn, self.save_vtt_btn):
+            button.setEnabled(enabled)
 
     def transcription_error(self, error_message):
+        self.transcript_view.flush()
         self.start_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         self.statusBar().showMessage("오류 발생")
         QMessageBox.critical(self, "오류", error_message)
 
@@ -427,33 +1427,18 @@ class AudioTranscriberGUI(QMainWindow):
             QMessageBox.warning(self, "경고", "저장할 결과가 없습니다.")
             return
         
-        basename = Path(self.audio_file).stem
         output_dir = Path(self.output_folder.text())
         
         try:
-            if format_type == "txt":
-                file_path = output_dir / f"transcript_{basename}.txt"
-                with open(file_path, "w", encoding="utf-8") as f:
-                    for seg in self.segments:
-                        f.write(f"[{seg['speaker']}] {seg['text']}\n")
-            
-            elif format_type == "csv":
-                file_path = output_dir / f"transcript_{basename}.csv"
-                with open(file_path, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["start_time", "end_time", "speaker", "text"])
-                    for seg in self.segments:
-                        writer.writerow([
-                            str(timedelta(seconds=int(seg["start"]))),
-                            str(timedelta(seconds=int(seg["end"]))),
-                            seg["speaker"],
-                            seg["text"]
-                        ])
-            
-            elif format_type == "json":
-                file_path = output_dir / f"transcript_{basename}.json"
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(self.segments, f, ensure_ascii=False, indent=2)
+            if self.profile:
+                # 저장 단계도 측정하여 보고서를 결과 파일 옆에 함께 기록
+                profiler = Profiler.from_report(self.profile)
+                with profiler.span(f"export_{format_type}"):
+                    file_path = save_segments(self.segments, self.audio_file, output_dir, format_type)
+                self.show_profile(profiler.report())
+                save_profile(self.profile, self.audio_file, output_dir)
+            else:
+                file_path = save_segments(self.segments, self.audio_file, output_dir, format_type)
             
             QMessageBox.information(self, "저장 완료", f"파일이 저장되었습니다:\n{file_path}")
             
@@ -473,6 +1458,14 @@ class AudioTranscriberGUI(QMainWindow):
             QMessageBox.warning(self, "오류", f"폴더를 열 수 없습니다:\n{str(e)}")
 
 def main():
+    # PyInstaller 단일 exe 에서 작업 풀 프로세스를 띄우기 위해 필요
+    multiprocessing.freeze_support()
+    
+    # 하위 명령이 있으면 GUI 없이 헤드리스 CLI 로 실행 (예: audio_transcriber batch <폴더>)
+    if len(sys.argv) > 1:
+        from transcriber_cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
     app = QApplication(sys.argv)
     app.setApplicationName("음성파일 전사 프로그램")
     
@@ -482,6 +1475,8 @@ def main():
     
     window = AudioTranscriberGUI()
     window.show()
+    # 첫 화면이 그려진 뒤 이벤트 루프에서 호출됨
+    QTimer.singleShot(0, window.first_paint)
     
     sys.exit(app.exec_())
 
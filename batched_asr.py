@@ -0,0 +1,269 @@
+"""
+배치 추론
+- 여러 파일/청크의 30초 mel 창을 하나의 배치로 묶어 인코더를 한 번에 실행
+- 디코더도 whisper.decode 로 배치 탐욕적 디코딩 (품질이 낮은 창만 기준 경로로 재전사)
+- 짧은 통화 녹음처럼 파일이 많을 때 파일별 호출 오버헤드를 줄임
+"""
+
+import os
+import time
+
+import torch
+import whisper
+from whisper.audio import N_SAMPLES, log_mel_spectrogram, pad_or_trim
+from whisper.tokenizer import get_tokenizer
+
+from asr_backends import DEFAULT_BACKEND, WhisperBackend, get_backend
+from audio_io import SAMPLE_RATE, decode_audio
+from pipeline import diarize_audio, merge_transcription_and_diarization, segments_without_speakers
+from vad import chunk_boundaries, pack_speech, speech_regions
+
+# 토큰 타임스탬프 간격 (초)
+TIME_PRECISION = 0.02
+
+# 창 길이: 무음 경계를 찾는 범위(±5초)를 더해도 30초를 넘지 않도록 25초 목표
+WINDOW_SEC = 25.0
+WINDOW_SEARCH_SEC = 5.0
+
+# whisper.transcribe 와 같은 품질 기준 (넘으면 온도 폴백이 있는 기준 경로로 재전사)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def tokens_to_segments(tokens, tokenizer, offset, duration, result):
+    """타임스탬프 토큰이 포함된 디코딩 결과를 Whisper 세그먼트 형식으로 변환"""
+    timestamp_begin = tokenizer.timestamp_begin
+    segments = []
+
+    def _emit(start, end, text_tokens):
+        text = tokenizer.decode(text_tokens)
+        if not text.strip():
+            return
+        segments.append({
+            "seek": int(offset * 100),
+            "start": offset + start,
+            "end": offset + max(start, end),
+            "text": text,
+            "tokens": list(text_tokens),
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob,
+        })
+
+    start = None
+    last_time = 0.0
+    text_tokens = []
+    for token in tokens:
+        if token >= timestamp_begin:
+            t = last_time = (token - timestamp_begin) * TIME_PRECISION
+            if start is None:
+                start = t
+            else:
+                _emit(start, t, text_tokens)
+                start = None
+                text_tokens = []
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    if text_tokens:
+        # 닫는 타임스탬프 없이 끝난 경우 창 끝까지로 봄
+        _emit(last_time if start is None else start, duration, text_tokens)
+    return segments
+
+
+class _FileJob:
+    def __init__(self, audio_file, audio, n_windows, timeline=None):
+        self.audio_file = audio_file
+        self.audio = audio
+        self.timeline = timeline
+        self.remaining = n_windows
+        self.window_segments = [None] * n_windows
+
+
+class BatchedTranscriber:
+    """여러 파일의 창을 묶어 배치로 전사"""
+
+    def __init__(self, model_size, device, batch_size=8, hf_token=None, num_threads=None,
+                 backend=DEFAULT_BACKEND, language=None, vad=False, diarization_window_sec=None,
+                 speaker_index=None, archive=None):
+        engine = get_backend(backend)
+        if not isinstance(engine, WhisperBackend):
+            raise ValueError("배치 추론은 whisper / whisper-int8 엔진에서만 지원합니다.")
+        self.engine = engine
+        self.model_size = model_size
+        self.device = device
+        self.batch_size = max(1, batch_size)
+        self.hf_token = hf_token
+        self.num_threads = num_threads
+        self.language = language
+        self.vad = vad
+        self.diarization_window_sec = diarization_window_sec
+        self.speaker_index = speaker_index
+        # 완료된 파일의 결과를 기록할 검색 보관함 (transcript_archive.TranscriptArchive)
+        self.archive = archive
+        self.model = None
+        self.fallback_windows = 0
+        self.total_windows = 0
+
+    def _decode_batch(self, windows):
+        """창 목록을 한 번의 인코더/디코더 배치로 전사"""
+        model = self.model
+        mel = torch.stack([
+            log_mel_spectrogram(pad_or_trim(torch.from_numpy(samples), N_SAMPLES), model.dims.n_mels)
+            for _, _, _, samples in windows
+        ]).to(model.device)
+        options = whisper.DecodingOptions(fp16=False, language=self.language, without_timestamps=False)
+        results = whisper.decode(model, mel, options)
+
+        for (job, index, offset, samples), result in zip(windows, results):
+            self.total_windows += 1
+            duration = len(samples) / SAMPLE_RATE
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                segments = []
+            elif (result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                  or result.avg_logprob < LOGPROB_THRESHOLD):
+                # 품질이 낮은 창만 온도 폴백이 있는 기준 경로로 다시 전사
+                self.fallback_windows += 1
+                fallback = self.engine.transcribe(model, samples)
+                segments = [dict(seg, start=seg["start"] + offset, end=seg["end"] + offset)
+                            for seg in fallback["segments"]]
+            else:
+                tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                          language=result.language, task="transcribe")
+                segments = tokens_to_segments(result.tokens, tokenizer, offset, duration, result)
+            job.window_segments[index] = segments
+            job.remaining -= 1
+
+    def _finish(self, job):
+        """파일의 모든 창이 끝나면 (필요 시 화자 분리 후) 병합된 세그먼트 반환"""
+        whisper_segments = []
+        for segments in job.window_segments:
+            whisper_segments.extend(segments)
+        timeline = job.timeline
+        for i, seg in enumerate(whisper_segments):
+            seg["id"] = i
+            if timeline is not None:
+                timeline.remap_segment(seg)
+        try:
+            if self.hf_token:
+                diar_segments = []
+                if len(job.audio.samples):
+                    diar_segments = diarize_audio(job.audio, self.hf_token, self.device, self.num_threads,
+                                                  window_sec=self.diarization_window_sec,
+                                                  speaker_index=self.speaker_index)
+                if timeline is not None:
+                    diar_segments = timeline.remap_turns(diar_segments)
+                segments = merge_transcription_and_diarization(whisper_segments, diar_segments)
+            else:
+                segments = segments_without_speakers(whisper_segments)
+            duration = timeline.total_sec if timeline is not None else job.audio.duration
+        finally:
+            job.audio.close()
+        if self.archive is not None:
+            try:
+                self.archive.ingest(os.path.abspath(job.audio_file), segments, self.model_size, self.engine.name,
+                                    duration=duration)
+            except Exception as e:
+                print(f"보관함 기록 오류: {e}")
+        return segments
+
+    def transcribe_files(self, audio_files):
+        """(파일, 세그먼트 목록 또는 예외) 를 완료되는 순서대로 생성
+
+        배치 하나의 전사가 실패하면 그 배치에 창이 있는 파일만 실패로 내보내고 나머지는 계속 처리한다.
+        """
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        self.model = self.engine.load(self.model_size, self.device)
+
+        queue = []
+        jobs = []
+
+        def _flush(limit):
+            """(완료된 작업 목록, (실패한 작업, 예외) 목록)"""
+            failed = []
+            while len(queue) >= limit and queue:
+                batch = queue[:self.batch_size]
+                del queue[:self.batch_size]
+                try:
+                    self._decode_batch(batch)
+                except Exception as e:
+                    broken = list(dict.fromkeys(job for job, _, _, _ in batch))
+                    # 실패한 파일의 남은 창은 전사하지 않음
+                    queue[:] = [window for window in queue if window[0] not in broken]
+                    for job in broken:
+                        job.audio.close()
+                        failed.append((job, e))
+            failed_jobs = [job for job, _ in failed]
+            finished = [job for job in jobs if job.remaining == 0 and job not in failed_jobs]
+            jobs[:] = [job for job in jobs if job.remaining > 0 and job not in failed_jobs]
+            return finished, failed
+
+        def _results(limit):
+            finished, failed = _flush(limit)
+            for job, e in failed:
+                yield job.audio_file, e
+            for job in finished:
+                yield from self._safe_finish(job)
+
+        try:
+            for audio_file in audio_files:
+                timeline = None
+                try:
+                    audio = decode_audio(str(audio_file))
+                    if self.vad:
+                        # 음성 구간만 이어 붙여 창을 나눔 (타임스탬프는 _finish 에서 원본으로 복원)
+                        with audio:
+                            audio, timeline = pack_speech(audio, speech_regions(audio.samples, audio.sample_rate))
+                except Exception as e:
+                    yield audio_file, e
+                    continue
+                sr = audio.sample_rate
+                windows = chunk_boundaries(audio.samples, sr, WINDOW_SEC, WINDOW_SEARCH_SEC)
+                job = _FileJob(audio_file, audio, len(windows), timeline)
+                jobs.append(job)
+                for index, (start, end) in enumerate(windows):
+                    queue.append((job, index, start / sr, audio.samples[start:end]))
+
+                yield from _results(self.batch_size)
+            yield from _results(1)
+        finally:
+            # 중간에 멈추면 (소비자가 반복을 그만두는 경우 포함) 아직 끝나지 않은 파일의 버퍼 해제
+            queue.clear()
+            for job in jobs:
+                job.audio.close()
+
+    def _safe_finish(self, job):
+        try:
+            yield job.audio_file, self._finish(job)
+        except Exception as e:
+            yield job.audio_file, e
+
+
+def compare_throughput(audio_files, model_size, device, batch_size=8, backend=DEFAULT_BACKEND):
+    """같은 파일들을 파일별 경로와 배치 경로로 전사(ASR 만)해 clips/sec 비교"""
+    engine = get_backend(backend)
+    model = engine.load(model_size, device)
+
+    started = time.perf_counter()
+    for audio_file in audio_files:
+        with decode_audio(str(audio_file)) as audio:
+            engine.transcribe(model, audio.samples)
+    per_file = time.perf_counter() - started
+
+    transcriber = BatchedTranscriber(model_size, device, batch_size, backend=backend)
+    started = time.perf_counter()
+    for _ in transcriber.transcribe_files(audio_files):
+        pass
+    batched = time.perf_counter() - started
+
+    count = len(audio_files)
+    return {
+        "clips": count,
+        "per_file_clips_per_sec": count / per_file if per_file else 0.0,
+        "batched_clips_per_sec": count / batched if batched else 0.0,
+        "speedup": per_file / batched if batched else 0.0,
+        "fallback_windows": transcriber.fallback_windows,
+        "total_windows": transcriber.total_windows,
+    }
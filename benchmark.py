@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+전사 파이프라인 벤치마크
+- 디코딩, Whisper 전사(tiny/base), 화자 분리, 병합, 형식별 결과 저장을 단계별로 측정
+- 길이별 합성 음성(두 화자 + 무음)과 직접 지정한 음성 파일 사용
+- 기본값은 로컬 대체 모델(무작위 가중치 Whisper, 스펙트럼 군집 화자 분리)이라 오프라인·CPU 에서 실행
+- 실시간 배율(RTF), 처리량, 최대 메모리 보고 / 기준 결과 저장 및 허용 오차를 넘는 성능 저하 표시
+
+사용 예:
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --compare benchmark_baseline.json --tolerance 0.15
+    python benchmark.py --audio sample.mp3 --real-models --hf-token <토큰>
+    python benchmark.py --startup --lengths 15      # GUI 콜드 스타트 (첫 화면, 첫 전사)
+"""
+
+import os
+import sys
+import json
+import wave
+import argparse
+import platform
+import statistics
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import torch
+import whisper
+from whisper.model import ModelDimensions, Whisper
+
+from alignment import merge_transcription_and_diarization
+from asr_backends import DEFAULT_BACKEND, get_backend
+from audio_io import SAMPLE_RATE, decode_audio
+from exporters import EXPORT_FORMATS, save_segments
+from pipeline import diarize_audio
+from profiling import Profiler
+from vad import speech_regions
+
+BENCHMARK_VERSION = 1
+
+DEFAULT_LENGTHS_SEC = (15, 60, 300)
+DEFAULT_MODELS = ("tiny", "base")
+STAGES = ("decode", "asr", "diarization", "merge", "export")
+
+# 대체 Whisper 모델 구조 (공개 체크포인트와 같은 크기, 가중치만 무작위)
+STAND_IN_DIMS = {
+    "tiny": dict(n_mels=80, n_audio_ctx=1500, n_audio_state=384, n_audio_head=6, n_audio_layer=4,
+                 n_vocab=51865, n_text_ctx=448, n_text_state=384, n_text_head=6, n_text_layer=4),
+    "base": dict(n_mels=80, n_audio_ctx=1500, n_audio_state=512, n_audio_head=8, n_audio_layer=6,
+                 n_vocab=51865, n_text_ctx=448, n_text_state=512, n_text_head=8, n_text_layer=6),
+}
+# 무작위 가중치는 EOT 를 잘 내지 않으므로 창마다 디코딩 토큰 수를 고정해 비용을 일정하게 함
+STAND_IN_SAMPLE_LEN = 96
+
+# 대체 화자 분리: 1초 창의 대역 에너지로 두 화자 군집
+DIAR_WINDOW_SEC = 1.0
+DIAR_FRAME = 400
+DIAR_BANDS = 24
+
+# 병합/저장 단계용 합성 세그먼트 (3초 세그먼트, 단어 8개)
+SEGMENT_SEC = 3.0
+WORDS_PER_SEGMENT = 8
+
+# GUI 콜드 스타트 측정 단계 (프로세스 시작 후 초)
+STARTUP_STAGES = ("first_paint", "models_ready", "first_transcription")
+GUI_SCRIPT = Path(__file__).resolve().parent / "audio_transcriber.py"
+STARTUP_TIMEOUT_SEC = 600
+
+# 너무 짧은 단계는 잡음이 크므로 이 차이(초) 이하는 성능 저하로 보지 않음
+MIN_REGRESSION_SEC = 0.005
+
+
+def make_synthetic_audio(path, duration_sec, seed=0, sample_rate=SAMPLE_RATE):
+    """두 화자가 번갈아 말하는 합성 음성(16bit WAV) 생성
+
+    화자마다 기본 주파수가 다른 배음 신호에 음절 단위 진폭 변화를 주고,
+    턴 사이에는 짧은 쉼과 가끔 긴 무음을 넣는다. 같은 seed 면 항상 같은 파일이 된다.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration_sec * sample_rate)
+    f0s = (120.0, 210.0)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        written = 0
+        turn = 0
+        while written < total:
+            if turn % 5 == 4:
+                gap = rng.uniform(3.0, 8.0)
+            else:
+                gap = rng.uniform(0.3, 1.5)
+            speech = rng.uniform(2.0, 6.0)
+            n_gap = min(total - written, int(gap * sample_rate))
+            n_speech = min(total - written - n_gap, int(speech * sample_rate))
+
+            t = np.arange(n_speech) / sample_rate
+            f0 = f0s[turn % 2] * (1.0 + 0.03 * np.sin(2 * np.pi * 5.0 * t))
+            phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+            voiced = sum(np.sin(k * phase) / k for k in range(1, 11))
+            envelope = (0.5 + 0.5 * np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, np.pi))) ** 2
+            block = np.concatenate([np.zeros(n_gap), 0.3 * voiced * envelope])
+            block += rng.normal(0.0, 0.003, len(block))
+            wav.writeframes((np.clip(block, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+            written += len(block)
+            turn += 1
+    return path
+
+
+def synthetic_segments(duration_sec):
+    """병합/저장 단계용 Whisper 형식 세그먼트 (단어 타임스탬프 포함)"""
+    segments = []
+    start = 0.0
+    word_sec = SEGMENT_SEC / WORDS_PER_SEGMENT
+    while start < duration_sec:
+        end = min(duration_sec, start + SEGMENT_SEC)
+        words = [{"word": f" 단어{i}", "start": start + i * word_sec,
+                  "end": min(end, start + (i + 1) * word_sec), "probability": 0.9}
+                 for i in range(WORDS_PER_SEGMENT) if start + i * word_sec < end]
+        segments.append({"id": len(segments), "start": start, "end": end,
+                         "text": "".join(w["word"] for w in words), "words": words})
+        start = end
+    return segments
+
+
+def load_stand_in_whisper(model_size, seed=0):
+    """공개 모델과 같은 구조의 무작위 가중치 Whisper (다운로드 없이 실행)"""
+    torch.manual_seed(seed)
+    model = Whisper(ModelDimensions(**STAND_IN_DIMS[model_size]))
+    return model.eval()
+
+
+def stand_in_transcribe(model, samples):
+    return model.transcribe(samples, fp16=False, language="ko", temperature=0.0,
+                            condition_on_previous_text=False, sample_len=STAND_IN_SAMPLE_LEN,
+                            verbose=None)["segments"]
+
+
+def _band_features(samples):
+    """프레임별 대역 로그 에너지를 평균한 창 특징"""
+    n_frames = len(samples) // DIAR_FRAME
+    frames = np.asarray(samples[:n_frames * DIAR_FRAME], dtype=np.float32).reshape(n_frames, DIAR_FRAME)
+    power = np.abs(np.fft.rfft(frames * np.hanning(DIAR_FRAME), axis=1)) ** 2
+    bands = np.array_split(power, DIAR_BANDS, axis=1)
+    energy = np.stack([band.sum(axis=1) for band in bands], axis=1)
+    return np.log(energy + 1e-10).mean(axis=0)
+
+
+def stand_in_diarize(audio, n_speakers=2, iterations=10):
+    """pyannote 대신 쓰는 로컬 화자 분리 (음성 구간 → 1초 창 특징 → k-means)"""
+    sr = audio.sample_rate
+    window = int(DIAR_WINDOW_SEC * sr)
+    spans = []
+    features = []
+    for start, end in speech_regions(audio.samples, sr):
+        for w_start in range(start, end, window):
+            w_end = min(end, w_start + window)
+            if w_end - w_start < DIAR_FRAME:
+                continue
+            spans.append((w_start, w_end))
+            features.append(_band_features(audio.samples[w_start:w_end]))
+    if not spans:
+        return []
+    x = np.stack(features)
+    x -= x.mean(axis=0)
+
+    # 결정적인 초기값: 첫 창과 그로부터 가장 먼 창부터 차례로 선택
+    centers = [x[0]]
+    while len(centers) < min(n_speakers, len(x)):
+        distance = np.min([np.linalg.norm(x - c, axis=1) for c in centers], axis=0)
+        centers.append(x[int(np.argmax(distance))])
+    centers = np.stack(centers)
+    for _ in range(iterations):
+        labels = np.argmin(np.linalg.norm(x[:, None, :] - centers[None], axis=2), axis=1)
+        for k in range(len(centers)):
+            if np.any(labels == k):
+                centers[k] = x[labels == k].mean(axis=0)
+
+    turns = []
+    for (start, end), label in zip(spans, labels):
+        speaker = f"SPEAKER_{int(label):02d}"
+        if turns and turns[-1]["speaker"] == speaker and start / sr <= turns[-1]["end"]:
+            turns[-1]["end"] = end / sr
+        else:
+            turns.append({"start": start / sr, "end": end / sr, "speaker": speaker})
+    return turns
+
+
+class BenchmarkRunner:
+    """단계별로 repeats 번 실행하고 중앙값 기록"""
+
+    def __init__(self, args, output_dir):
+        self.args = args
+        self.output_dir = Path(output_dir)
+        self.results = []
+        self.models = {}
+
+    def measure(self, case, stage, func, audio_sec=None, items=None, unit=None, repeats=None):
+        """func 를 반복 실행해 (중앙값 경과 시간, RTF, 처리량, 최대 RSS) 기록 후 마지막 반환값 반환"""
+        profiler = Profiler()
+        result = None
+        for _ in range(repeats or self.args.repeats):
+            with profiler.span(stage, audio_sec):
+                result = func()
+        walls = [span["wall_sec"] for span in profiler.spans]
+        wall = statistics.median(walls)
+        if items is None:
+            items, unit = audio_sec, "audio_sec/s"
+        record = {
+            "case": case,
+            "stage": stage,
+            "audio_sec": audio_sec,
+            "repeats": len(walls),
+            "wall_sec": round(wall, 4),
+            "wall_min_sec": round(min(walls), 4),
+            "rtf": round(wall / audio_sec, 4) if audio_sec else None,
+            "throughput": round(items / wall, 2) if items and wall else None,
+            "throughput_unit": unit,
+            "peak_rss_mb": max((s["peak_rss_mb"] or 0.0) for s in profiler.spans) or None,
+        }
+        self.results.append(record)
+        print(format_row(record), flush=True)
+        return result
+
+    def load_model(self, model_size):
+        """모델 로딩 시간도 한 번 측정 (이후 재사용)"""
+        if model_size not in self.models:
+            if self.args.real_models:
+                engine = get_backend(self.args.backend)
+                loader = lambda: engine.load(model_size, "cpu")
+            else:
+                loader = lambda: load_stand_in_whisper(model_size, self.args.seed)
+            self.models[model_size] = self.measure("-", f"asr_load_{model_size}", loader, repeats=1)
+        return self.models[model_size]
+
+    def run_case(self, case, audio_file):
+        stages = self.args.stages
+        decoded = []
+
+        def _decode():
+            # 반복 측정 중 이전 버퍼(memmap 임시 파일 포함)는 바로 해제
+            if decoded:
+                decoded.pop().close()
+            decoded.append(decode_audio(str(audio_file)))
+            return decoded[-1]
+
+        audio = self.measure(case, "decode", _decode)
+        with audio:
+            duration = audio.duration
+            if "asr" in stages:
+                for model_size in self.args.models:
+                    model = self.load_model(model_size)
+                    if self.args.real_models:
+                        engine = get_backend(self.args.backend)
+                        transcribe = lambda: engine.transcribe(model, audio.samples)["segments"]
+                    else:
+                        transcribe = lambda: stand_in_transcribe(model, audio.samples)
+                    self.measure(case, f"asr_{model_size}", transcribe, duration)
+
+            diar_segments = []
+            if "diarization" in stages:
+                if self.args.real_models and self.args.hf_token:
+                    diarize = lambda: diarize_audio(audio, self.args.hf_token, "cpu")
+                else:
+                    diarize = lambda: stand_in_diarize(audio)
+                diar_segments = self.measure(case, "diarization", diarize, duration)
+
+        segments = synthetic_segments(duration)
+        if not diar_segments:
+            diar_segments = stand_in_turns(duration)
+        merged = segments
+        if "merge" in stages:
+            merged = self.measure(case, "merge",
+                                  lambda: merge_transcription_and_diarization(segments, diar_segments),
+                                  duration, len(segments), "segments/s")
+        if "export" in stages:
+            for fmt in EXPORT_FORMATS:
+                self.measure(case, f"export_{fmt}",
+                             lambda: save_segments(merged, audio_file, self.output_dir, fmt),
+                             duration, len(merged), "segments/s")
+
+
+    def measure_startup(self, audio_file):
+        """GUI 를 매번 새 프로세스로 띄워 첫 화면, 모델 준비, 첫 전사 완료 시각의 중앙값 기록
+
+        첫 전사는 실제 Whisper 모델(--startup-model)을 사용하므로 모델이 미리 받아져 있어야 한다.
+        """
+        from audio_transcriber import STARTUP_AUDIO_ENV, STARTUP_LOG_ENV, STARTUP_MODEL_ENV
+        runs = []
+        for _ in range(self.args.repeats):
+            with tempfile.TemporaryDirectory(prefix="audio_transcriber_startup_") as log_dir:
+                log_path = Path(log_dir) / "startup.json"
+                env = dict(os.environ, **{
+                    STARTUP_LOG_ENV: str(log_path),
+                    STARTUP_AUDIO_ENV: str(audio_file),
+                    STARTUP_MODEL_ENV: self.args.startup_model,
+                })
+                # 화면이 없는 서버에서도 실행되도록 오프스크린 렌더링
+                env.setdefault("QT_QPA_PLATFORM", "offscreen")
+                subprocess.run([sys.executable, str(GUI_SCRIPT)], env=env, timeout=STARTUP_TIMEOUT_SEC)
+                if log_path.exists():
+                    runs.append(json.loads(log_path.read_text(encoding="utf-8")))
+        for stage in STARTUP_STAGES:
+            values = [run[stage] for run in runs if stage in run]
+            if not values:
+                print(f"⚠️ 콜드 스타트 '{stage}' 를 측정하지 못했습니다.", file=sys.stderr)
+                continue
+            record = {
+                "case": "gui",
+                "stage": f"startup_{stage}",
+                "audio_sec": None,
+                "repeats": len(values),
+                "wall_sec": round(statistics.median(values), 4),
+                "wall_min_sec": round(min(values), 4),
+                "rtf": None,
+                "throughput": None,
+                "throughput_unit": None,
+                "peak_rss_mb": None,
+            }
+            self.results.append(record)
+            print(format_row(record), flush=True)
+
+
+def stand_in_turns(duration_sec, turn_sec=4.0):
+    """화자 분리를 건너뛴 경우 병합 단계용 교대 턴"""
+    turns = []
+    start = 0.0
+    while start < duration_sec:
+        turns.append({"start": start, "end": min(duration_sec, start + turn_sec),
+                      "speaker": f"SPEAKER_{len(turns) % 2:02d}"})
+        start += turn_sec
+    return turns
+
+
+def environment_info(args):
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "whisper": getattr(whisper, "__version__", None),
+        "cpu_count": os.cpu_count(),
+        "threads": torch.get_num_threads(),
+        "models": "real" if args.real_models else "stand-in",
+        "backend": args.backend if args.real_models else None,
+    }
+
+
+def format_row(record):
+    def _fmt(value, digits):
+        return "-" if value is None else f"{value:.{digits}f}"
+    throughput = "-" if record["throughput"] is None else f"{record['throughput']:.1f} {record['throughput_unit']}"
+    return (f"{record['case']:<16} {record['stage']:<16} {_fmt(record['audio_sec'], 1):>8} "
+            f"{_fmt(record['wall_sec'], 4):>10} {_fmt(record['rtf'], 4):>8} {throughput:>22} "
+            f"{_fmt(record['peak_rss_mb'], 0):>8}")
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """기준보다 (1 + tolerance) 배 넘게 느려진 단계 목록"""
+    if baseline.get("environment") != report["environment"]:
+        print("⚠️ 기준 결과와 실행 환경이 다릅니다. 비교 결과는 참고용입니다.", file=sys.stderr)
+    base = {(r["case"], r["stage"]): r for r in baseline.get("results", ())}
+    regressions = []
+    print("\n기준 대비:")
+    for record in report["results"]:
+        previous = base.get((record["case"], record["stage"]))
+        if previous is None:
+            continue
+        ratio = record["wall_sec"] / previous["wall_sec"] if previous["wall_sec"] else float("inf")
+        regressed = (ratio > 1.0 + tolerance
+                     and record["wall_sec"] - previous["wall_sec"] > MIN_REGRESSION_SEC)
+        mark = "▲ 성능 저하" if regressed else ("▼ 개선" if ratio < 1.0 - tolerance else "")
+        print(f"  {record['case']:<16} {record['stage']:<16} {previous['wall_sec']:>9.4f}s → "
+              f"{record['wall_sec']:>9.4f}s ({ratio:5.2f}x) {mark}")
+        if regressed:
+            regressions.append(dict(record, baseline_wall_sec=previous["wall_sec"], ratio=round(ratio, 3)))
+    return regressions
+
+
+def parse_list(value, cast=str):
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="전사 파이프라인 벤치마크")
+    parser.add_argument("--lengths", type=lambda v: parse_list(v, float), default=list(DEFAULT_LENGTHS_SEC),
+                        help="합성 음성 길이(초) 목록, 쉼표 구분 (빈 값이면 합성 음성 사용 안 함)")
+    parser.add_argument("--audio", nargs="*", default=[], help="추가로 측정할 음성 파일")
+    parser.add_argument("--models", type=parse_list, default=list(DEFAULT_MODELS))
+    parser.add_argument("--stages", type=parse_list, default=list(STAGES),
+                        help=f"측정할 단계 (기본: {','.join(STAGES)})")
+    parser.add_argument("--repeats", type=int, default=3, help="단계별 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--threads", type=int, default=4, help="torch 스레드 수 (결과 재현을 위해 고정)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--real-models", action="store_true",
+                        help="대체 모델 대신 실제 Whisper 가중치(및 --hf-token 이 있으면 pyannote) 사용")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="--real-models 사용 시 ASR 엔진")
+    parser.add_argument("--hf-token", default=os.environ.get("HF_TOKEN"))
+    parser.add_argument("--startup", action="store_true",
+                        help="GUI 콜드 스타트(첫 화면, 모델 준비, 첫 전사 완료)도 측정 (PySide6 필요)")
+    parser.add_argument("--startup-model", default="tiny", help="콜드 스타트 첫 전사에 쓸 Whisper 모델")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--save-baseline", default=None, help="결과를 기준 파일로 저장")
+    parser.add_argument("--compare", default=None, help="비교할 기준 파일")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="허용 성능 저하 비율 (기본 15%%)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="audio_transcriber_bench_") as work_dir:
+        work_dir = Path(work_dir)
+        cases = []
+        for i, length in enumerate(args.lengths):
+            path = make_synthetic_audio(work_dir / f"synthetic_{length:g}s.wav", length, args.seed + i)
+            cases.append((f"synthetic_{length:g}s", path))
+        for audio_file in args.audio:
+            cases.append((Path(audio_file).stem[:16], Path(audio_file)))
+        if not cases:
+            print("측정할 음성이 없습니다.", file=sys.stderr)
+            return 2
+
+        report = {"version": BENCHMARK_VERSION, "environment": environment_info(args),
+                  "settings": {"repeats": args.repeats, "seed": args.seed, "models": args.models,
+                               "stages": args.stages},
+                  "results": []}
+        print(f"{'case':<16} {'stage':<16} {'audio(s)':>8} {'wall(s)':>10} {'RTF':>8} "
+              f"{'throughput':>22} {'RSS(MB)':>8}")
+        runner = BenchmarkRunner(args, work_dir / "exports")
+        for case, audio_file in cases:
+            runner.run_case(case, audio_file)
+        if args.startup:
+            runner.measure_startup(cases[0][1])
+        report["results"] = runner.results
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"결과 저장: {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ 허용 오차({args.tolerance:.0%})를 넘는 성능 저하 {len(regressions)}건", file=sys.stderr)
+            return 1
+        print(f"\n✅ 허용 오차({args.tolerance:.0%}) 안에서 성능 저하 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
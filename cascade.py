@@ -0,0 +1,164 @@
+"""
+단계적 전사 (모델 캐스케이드)
+- 작은 모델(tiny/base)로 전체를 먼저 전사하고, Whisper 가 세그먼트마다 돌려주는 avg_logprob,
+  no_speech_prob, compression_ratio 로 신뢰도가 낮은 구간만 골라 큰 모델로 다시 전사
+- 다시 전사한 구간은 앞뒤로 조금 더 디코딩한 뒤 단어 중심이 구간 안에 있는 단어만 남겨
+  초안 세그먼트 자리에 끼워 넣음 (parallel_asr.trim_to_span)
+- 큰 모델로 다시 전사한 오디오 비율과, 큰 모델로 전체를 전사했을 때와 비교한 예상 속도 향상 보고
+"""
+
+import math
+import time
+
+from parallel_asr import padded_span, trim_to_span
+
+CASCADE_DRAFT_MODELS = ("tiny", "base")
+DEFAULT_DRAFT_MODEL = "base"
+
+# 재전사 기준 (Whisper 의 온도 폴백 기준보다 엄격하게: logprob -1.0, 압축률 2.4, 무음 0.6)
+CASCADE_LOGPROB_THRESHOLD = -0.6
+CASCADE_COMPRESSION_THRESHOLD = 2.4
+CASCADE_NO_SPEECH_THRESHOLD = 0.6
+# 재전사 구간 앞뒤로 더 디코딩할 길이 (초)
+CASCADE_PAD_SEC = 0.5
+# 이보다 가까운 재전사 구간은 한 번에 디코딩 (Whisper 는 호출마다 30초 창을 처리하므로)
+CASCADE_MERGE_GAP_SEC = 5.0
+# Whisper 가 한 번에 처리하는 창 길이 (초, 속도 향상 추정에 사용)
+WHISPER_WINDOW_SEC = 30.0
+
+
+def is_low_confidence(seg):
+    """초안 세그먼트를 큰 모델로 다시 전사해야 하는지 (값이 없는 항목은 통과로 봄)"""
+    avg_logprob = seg.get("avg_logprob")
+    if avg_logprob is not None and avg_logprob < CASCADE_LOGPROB_THRESHOLD:
+        return True
+    compression_ratio = seg.get("compression_ratio")
+    if compression_ratio is not None and compression_ratio > CASCADE_COMPRESSION_THRESHOLD:
+        return True
+    # 무음으로 판단하면서도 텍스트를 낸 세그먼트는 환각일 가능성이 높음
+    no_speech_prob = seg.get("no_speech_prob")
+    return no_speech_prob is not None and no_speech_prob > CASCADE_NO_SPEECH_THRESHOLD
+
+
+def escalation_regions(segments, merge_gap=CASCADE_MERGE_GAP_SEC):
+    """신뢰도가 낮은 세그먼트를 이어 붙인 (시작, 끝) 초 구간 목록"""
+    regions = []
+    for seg in segments:
+        if not is_low_confidence(seg):
+            continue
+        if regions and seg["start"] - regions[-1][1] <= merge_gap:
+            regions[-1][1] = max(regions[-1][1], seg["end"])
+        else:
+            regions.append([seg["start"], seg["end"]])
+    return [tuple(region) for region in regions]
+
+
+def splice_segments(draft, refined, regions):
+    """재전사 구간에 중심이 있는 초안 세그먼트를 빼고 다시 전사한 세그먼트를 시간순으로 합침"""
+    def _escalated(seg):
+        center = (seg["start"] + seg["end"]) / 2
+        return any(start <= center < end for start, end in regions)
+
+    segments = [seg for seg in draft if not _escalated(seg)] + refined
+    segments.sort(key=lambda seg: seg["start"])
+    for i, seg in enumerate(segments):
+        seg["id"] = i
+    return segments
+
+
+class CascadeStats:
+    """단계적 전사 누적 통계 (청크/워커별 결과를 merge 로 합산)"""
+
+    def __init__(self, draft_model, final_model):
+        self.draft_model = draft_model
+        self.final_model = final_model
+        self.audio_sec = 0.0
+        self.segments = 0
+        self.escalated_segments = 0
+        self.regions = 0
+        self.escalated_sec = 0.0
+        self.draft_wall_sec = 0.0
+        self.refine_wall_sec = 0.0
+        # 큰 모델이 처리한 30초 창 수 (큰 모델 창 하나의 비용 추정용)
+        self.refine_windows = 0
+
+    def merge(self, other):
+        for name in ("audio_sec", "segments", "escalated_segments", "regions", "escalated_sec",
+                     "draft_wall_sec", "refine_wall_sec", "refine_windows"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def report(self):
+        """보고서 딕셔너리
+
+        speedup 은 큰 모델로 전체를 전사했을 때의 예상 시간 (재전사에서 잰 창 하나의 시간 ×
+        전체 오디오의 창 수) 을 실제 두 단계 시간으로 나눈 값이다. 재전사 구간이 없으면 None.
+        """
+        speedup = None
+        elapsed = self.draft_wall_sec + self.refine_wall_sec
+        if self.refine_windows and elapsed:
+            full_sec = self.refine_wall_sec / self.refine_windows * math.ceil(self.audio_sec / WHISPER_WINDOW_SEC)
+            speedup = round(full_sec / elapsed, 2)
+        return {
+            "draft_model": self.draft_model,
+            "final_model": self.final_model,
+            "audio_sec": round(float(self.audio_sec), 2),
+            "segments": self.segments,
+            "escalated_segments": self.escalated_segments,
+            "regions": self.regions,
+            "escalated_sec": round(float(self.escalated_sec), 2),
+            "escalated_ratio": round(float(self.escalated_sec / self.audio_sec), 4) if self.audio_sec else 0.0,
+            "draft_wall_sec": round(self.draft_wall_sec, 4),
+            "refine_wall_sec": round(self.refine_wall_sec, 4),
+            "estimated_speedup": speedup,
+        }
+
+
+def describe_cascade(report):
+    """상태 표시줄/로그용 한 줄 요약"""
+    text = (f"{report['final_model']} 재전사: 오디오의 {100 * report['escalated_ratio']:.0f}% "
+            f"({report['regions']}구간, 초안 {report['draft_model']})")
+    if report["estimated_speedup"] is not None:
+        text += f", {report['final_model']} 전체 전사 대비 약 {report['estimated_speedup']:.1f}배 빠름 (추정)"
+    return text
+
+
+def cascade_transcribe(engine, draft_model, final_model, samples, sample_rate, offset=0.0, word_timestamps=False,
+                       initial_prompt=None, stats=None):
+    """초안 모델로 전사하고 신뢰도가 낮은 구간만 큰 모델로 다시 전사한 세그먼트 목록
+
+    samples 는 offset(초)에서 시작하는 오디오이며 결과 타임스탬프는 원본 기준이다.
+    재전사는 경계 단어를 골라내기 위해 항상 단어 타임스탬프로 디코딩한다.
+    """
+    from pipeline import transcribe_chunk
+
+    started = time.perf_counter()
+    draft = transcribe_chunk(engine, draft_model, samples, offset, word_timestamps, initial_prompt)
+    draft_wall = time.perf_counter() - started
+
+    regions = escalation_regions(draft)
+    refined = []
+    refine_windows = 0
+    started = time.perf_counter()
+    for start, end in regions:
+        first, last = padded_span(int((start - offset) * sample_rate), int(math.ceil((end - offset) * sample_rate)),
+                                  len(samples), sample_rate, CASCADE_PAD_SEC)
+        # 앞쪽 초안 텍스트를 문맥으로 전달
+        context = [seg["text"].strip() for seg in draft if seg["end"] <= start]
+        prompt = context[-1] if context and context[-1] else initial_prompt
+        segments = transcribe_chunk(engine, final_model, samples[first:last], offset + first / sample_rate, True,
+                                    prompt)
+        refined.extend(trim_to_span(segments, start, end, keep_words=word_timestamps))
+        refine_windows += math.ceil((last - first) / sample_rate / WHISPER_WINDOW_SEC)
+    refine_wall = time.perf_counter() - started
+
+    if stats is not None:
+        stats.audio_sec += len(samples) / sample_rate
+        stats.segments += len(draft)
+        stats.escalated_segments += sum(1 for seg in draft if is_low_confidence(seg))
+        stats.regions += len(regions)
+        stats.escalated_sec += sum(end - start for start, end in regions)
+        stats.draft_wall_sec += draft_wall
+        stats.refine_wall_sec += refine_wall
+        stats.refine_windows += refine_windows
+    return splice_segments(draft, refined, regions)
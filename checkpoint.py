@@ -0,0 +1,140 @@
+"""
+체크포인트 / 이어하기
+- 청크 단위 전사 결과를 오디오 옆 사이드카 파일(JSON Lines)에 덧붙여 기록
+- 같은 파일, 같은 설정으로 다시 실행하면 마지막으로 완료된 청크부터 이어서 진행
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+
+from result_cache import default_cache_dir
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_SUFFIX = ".transcript-checkpoint.jsonl"
+
+
+class TranscriptionCancelled(Exception):
+    """사용자가 작업을 취소함 (청크 경계에서 중지)"""
+
+
+def checkpoint_path(audio_file, audio_hash):
+    """오디오 옆 사이드카 경로 (쓰기 권한이 없으면 캐시 폴더)"""
+    sidecar = Path(f"{audio_file}{CHECKPOINT_SUFFIX}")
+    if os.access(sidecar.parent, os.W_OK):
+        return sidecar
+    return default_cache_dir() / "checkpoints" / f"{audio_hash}.jsonl"
+
+
+class ChunkCheckpoint:
+    """청크 단위 진행 상황 기록
+
+    첫 줄은 오디오 해시와 설정을 담은 헤더이고, 이후 청크마다
+    {"type": "chunk", "end": 완료된 샘플 위치, "prompt": 다음 청크 문맥, "segments": [...]}
+    화자 분리가 끝나면 {"type": "diarization", "turns": [...], "speakers": {화자: 임베딩}} 한 줄을 추가한다.
+    """
+
+    def __init__(self, path, audio_hash, settings):
+        self.path = Path(path)
+        self.header = {"type": "header", "version": CHECKPOINT_VERSION,
+                       "audio_hash": audio_hash, "settings": settings}
+        self.completed_offset = 0
+        self.prompt = None
+        self.diarization = None
+        self.diarization_speakers = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _records(self):
+        """(레코드, 레코드 끝 바이트 위치) 생성, 중간에 끊긴 마지막 줄은 무시"""
+        with open(self.path, "rb") as f:
+            position = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                position += len(line)
+                yield record, position
+
+    def load(self):
+        """기존 체크포인트가 같은 오디오/설정이면 상태를 읽고 True 반환"""
+        if not self.path.exists():
+            return False
+        valid_end = 0
+        try:
+            for record, position in self._records():
+                if valid_end == 0 or record.get("type") == "header":
+                    # 첫 줄은 반드시 같은 오디오/설정의 헤더여야 함
+                    if record != self.header:
+                        return False
+                elif record.get("type") == "chunk":
+                    self.completed_offset = record["end"]
+                    self.prompt = record.get("prompt")
+                elif record.get("type") == "diarization":
+                    self.diarization = record["turns"]
+                    self.diarization_speakers = record.get("speakers") or {}
+                valid_end = position
+        except OSError:
+            return False
+        if valid_end == 0:
+            return False
+        # 비정상 종료로 끊긴 꼬리를 잘라 이후 기록이 깨지지 않게 함
+        with open(self.path, "r+b") as f:
+            f.truncate(valid_end)
+        return True
+
+    def iter_chunks(self):
+        """저장된 청크의 세그먼트 목록을 순서대로 생성"""
+        for record, _ in self._records():
+            if record.get("type") == "chunk":
+                yield record["segments"]
+
+    def start(self, resume):
+        """기록 시작 (resume=False 면 새 헤더로 덮어씀)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume:
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self.completed_offset = 0
+            self.prompt = None
+            self.diarization = None
+            self.diarization_speakers = {}
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append(self.header)
+
+    def _append(self, record):
+        with self._lock:
+            if self._file is None:
+                # 작업이 끝나 이미 닫힌 경우 (예: 취소 후 끝난 화자 분리)
+                return
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def add_chunk(self, end, segments, prompt):
+        self._append({"type": "chunk", "end": end, "prompt": prompt, "segments": segments})
+        self.completed_offset = end
+        self.prompt = prompt
+
+    def add_diarization(self, turns, speakers=None):
+        self._append({"type": "diarization", "turns": turns, "speakers": speakers or {}})
+        self.diarization = turns
+        self.diarization_speakers = speakers or {}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        """작업이 끝나면 체크포인트 삭제"""
+        self.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
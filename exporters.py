@@ -0,0 +1,313 @@
+"""
+전사 결과 저장
+- txt, csv, json, jsonl, srt, vtt, seg(바이너리) 형식 (GUI 저장 버튼과 헤드리스 배치 실행에서 공용)
+- 모든 형식은 세그먼트 단위로 덧붙여 쓰는 스트리밍 writer 로 구현되어 전체 결과를 메모리에 두지 않음
+- StreamingExporter: 세그먼트 스트림을 구독해 선택한 형식을 한 번에 기록하고 청크 경계마다 fsync
+"""
+
+import os
+import csv
+import json
+import time
+import struct
+from datetime import timedelta
+from pathlib import Path
+
+from segment_store import SegmentStore, format_timestamps
+
+EXPORT_FORMATS = ("txt", "csv", "json", "jsonl", "srt", "vtt", "seg")
+
+
+def output_path(output_dir, audio_file, format_type):
+    """결과 파일 경로: <출력 폴더>/transcript_<파일명>.<형식>"""
+    basename = Path(audio_file).stem
+    return Path(output_dir) / f"transcript_{basename}.{format_type}"
+
+
+def _timestamp(seconds, separator):
+    """HH:MM:SS,mmm (SRT) / HH:MM:SS.mmm (VTT)"""
+    millis = max(0, int(round(seconds * 1000)))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class SegmentWriter:
+    """형식별 스트리밍 writer (세그먼트가 끝날 때마다 write 호출)"""
+    binary = False
+    newline = None
+
+    def __init__(self, file_path):
+        self.path = Path(file_path)
+        self.count = 0
+        if self.binary:
+            self._file = open(self.path, "wb")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8", newline=self.newline)
+        self.begin()
+
+    def begin(self):
+        pass
+
+    def prepare(self, segments):
+        """이어서 기록할 세그먼트 목록 전체를 미리 받음 (save_all, 형식별로 한 번에 계산할 값이 있을 때)"""
+
+    def write_segment(self, seg):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def write(self, seg):
+        self.write_segment(seg)
+        self.count += 1
+
+    def sync(self):
+        """지금까지 쓴 내용을 디스크에 기록 (청크 경계에서 호출)"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            self.end()
+            self.sync()
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class TxtWriter(SegmentWriter):
+    def write_segment(self, seg):
+        self._file.write(f"[{seg['speaker']}] {seg['text']}\n")
+
+
+class CsvWriter(SegmentWriter):
+    newline = ""
+
+    def begin(self):
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["start_time", "end_time", "speaker", "text"])
+
+    def write_segment(self, seg):
+        self._writer.writerow([
+            str(timedelta(seconds=int(seg["start"]))),
+            str(timedelta(seconds=int(seg["end"]))),
+            seg["speaker"],
+            seg["text"]
+        ])
+
+
+class JsonWriter(SegmentWriter):
+    """json.dump(segments, indent=2) 와 같은 출력을 세그먼트 단위로 기록 (닫을 때 배열 완성)"""
+
+    def write_segment(self, seg):
+        item = json.dumps(seg, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self._file.write(("[\n  " if self.count == 0 else ",\n  ") + item)
+
+    def end(self):
+        self._file.write("[]" if self.count == 0 else "\n]")
+
+
+class JsonlWriter(SegmentWriter):
+    """한 줄에 세그먼트 하나 (중간에 중단되어도 완료된 줄은 그대로 읽을 수 있음)"""
+
+    def write_segment(self, seg):
+        self._file.write(json.dumps(seg, ensure_ascii=False) + "\n")
+
+
+class TimedWriter(SegmentWriter):
+    """시작/끝 타임스탬프를 쓰는 형식 (SegmentStore 를 한 번에 저장하면 배열 연산으로 미리 변환)"""
+    separator = ","
+
+    def begin(self):
+        self._times = None
+
+    def prepare(self, segments):
+        if isinstance(segments, SegmentStore):
+            # (첫 세그먼트의 기록 순번, 시작 문자열 목록, 끝 문자열 목록)
+            self._times = (self.count, format_timestamps(segments.starts, self.separator).tolist(),
+                           format_timestamps(segments.ends, self.separator).tolist())
+
+    def times(self, seg):
+        if self._times is not None:
+            first, starts, ends = self._times
+            i = self.count - first
+            if i < len(starts):
+                return starts[i], ends[i]
+            self._times = None
+        return _timestamp(seg["start"], self.separator), _timestamp(seg["end"], self.separator)
+
+
+class SrtWriter(TimedWriter):
+    def write_segment(self, seg):
+        start, end = self.times(seg)
+        self._file.write(f"{self.count + 1}\n{start} --> {end}\n[{seg['speaker']}] {seg['text']}\n\n")
+
+
+class VttWriter(TimedWriter):
+    separator = "."
+
+    def begin(self):
+        super().begin()
+        self._file.write("WEBVTT\n\n")
+
+    def write_segment(self, seg):
+        start, end = self.times(seg)
+        self._file.write(f"{start} --> {end}\n<v {seg['speaker']}>{seg['text']}\n\n")
+
+
+SEG_MAGIC = b"ATSEG"
+SEG_VERSION = 1
+_SEG_HEADER = struct.Struct("<5sB")
+_SEG_SPEAKER = struct.Struct("<BHH")       # 레코드 종류, 화자 번호, 이름 길이
+_SEG_SEGMENT = struct.Struct("<BIIHI")     # 레코드 종류, 시작(ms), 끝(ms), 화자 번호, 텍스트 길이
+_SEG_SPEAKER_RECORD = 1
+_SEG_SEGMENT_RECORD = 2
+
+
+class BinarySegmentWriter(SegmentWriter):
+    """색인용 압축 바이너리 형식 (.seg)
+
+    헤더 b"ATSEG" + 버전(1바이트) 뒤에 레코드가 이어진다 (모두 리틀 엔디언).
+    - 화자 정의: 종류 1 (B), 화자 번호 (H), 이름 길이 (H), UTF-8 이름
+    - 세그먼트: 종류 2 (B), 시작 ms (I), 끝 ms (I), 화자 번호 (H), 텍스트 길이 (I), UTF-8 텍스트
+    화자는 처음 나올 때 한 번만 정의하므로 스트리밍으로 기록할 수 있다.
+    """
+    binary = True
+
+    def begin(self):
+        self._speakers = {}
+        self._file.write(_SEG_HEADER.pack(SEG_MAGIC, SEG_VERSION))
+
+    def write_segment(self, seg):
+        speaker = seg["speaker"]
+        if speaker not in self._speakers:
+            self._speakers[speaker] = len(self._speakers)
+            name = speaker.encode("utf-8")
+            self._file.write(_SEG_SPEAKER.pack(_SEG_SPEAKER_RECORD, self._speakers[speaker], len(name)) + name)
+        text = seg["text"].encode("utf-8")
+        self._file.write(_SEG_SEGMENT.pack(_SEG_SEGMENT_RECORD, int(round(seg["start"] * 1000)),
+                                           int(round(seg["end"] * 1000)), self._speakers[speaker],
+                                           len(text)) + text)
+
+
+def read_binary_segments(file_path):
+    """.seg 파일의 세그먼트를 순서대로 생성 (끝이 잘린 레코드는 무시)"""
+    with open(file_path, "rb") as f:
+        magic, version = _SEG_HEADER.unpack(f.read(_SEG_HEADER.size))
+        if magic != SEG_MAGIC or version != SEG_VERSION:
+            raise ValueError(f"지원하지 않는 세그먼트 파일입니다: {file_path}")
+        speakers = {}
+        while True:
+            kind = f.read(1)
+            if not kind:
+                return
+            if kind[0] == _SEG_SPEAKER_RECORD:
+                fixed = kind + f.read(_SEG_SPEAKER.size - 1)
+                if len(fixed) < _SEG_SPEAKER.size:
+                    return
+                _, number, length = _SEG_SPEAKER.unpack(fixed)
+                name = f.read(length)
+                if len(name) < length:
+                    return
+                speakers[number] = name.decode("utf-8")
+            elif kind[0] == _SEG_SEGMENT_RECORD:
+                fixed = kind + f.read(_SEG_SEGMENT.size - 1)
+                if len(fixed) < _SEG_SEGMENT.size:
+                    return
+                _, start_ms, end_ms, number, length = _SEG_SEGMENT.unpack(fixed)
+                text = f.read(length)
+                if len(text) < length:
+                    return
+                yield {"speaker": speakers.get(number), "start": start_ms / 1000,
+                       "end": end_ms / 1000, "text": text.decode("utf-8")}
+            else:
+                raise ValueError(f"손상된 세그먼트 파일입니다: {file_path}")
+
+
+WRITERS = {
+    "txt": TxtWriter,
+    "csv": CsvWriter,
+    "json": JsonWriter,
+    "jsonl": JsonlWriter,
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "seg": BinarySegmentWriter,
+}
+
+
+class StreamingExporter:
+    """세그먼트 스트림을 구독해 선택한 모든 형식을 한 번에 기록
+
+    write() 로 세그먼트를 받을 때마다 각 파일에 덧붙이고, sync() (청크 경계)에서
+    fsync 한다. 중간에 중단되어도 닫을 때까지 받은 세그먼트는 모든 형식에 남는다.
+    """
+
+    def __init__(self, audio_file, output_dir, formats):
+        unknown = [fmt for fmt in formats if fmt not in WRITERS]
+        if unknown:
+            raise ValueError(f"지원하지 않는 형식입니다: {', '.join(unknown)}")
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        # 기록에 쓴 누적 시간 (전사와 번갈아 실행되므로 성능 측정용으로 따로 집계)
+        self.elapsed_sec = 0.0
+        self.writers = []
+        try:
+            for fmt in dict.fromkeys(formats):
+                self.writers.append(WRITERS[fmt](output_path(output_dir, audio_file, fmt)))
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def paths(self):
+        return [writer.path for writer in self.writers]
+
+    def write(self, seg):
+        started = time.perf_counter()
+        for writer in self.writers:
+            writer.write(seg)
+        self.elapsed_sec += time.perf_counter() - started
+
+    def write_all(self, segments):
+        """세그먼트 목록 전체를 기록 (형식별로 한 번에 계산할 값은 미리 계산)"""
+        started = time.perf_counter()
+        for writer in self.writers:
+            writer.prepare(segments)
+        self.elapsed_sec += time.perf_counter() - started
+        for seg in segments:
+            self.write(seg)
+
+    def sync(self):
+        started = time.perf_counter()
+        for writer in self.writers:
+            writer.sync()
+        self.elapsed_sec += time.perf_counter() - started
+
+    def close(self):
+        started = time.perf_counter()
+        for writer in self.writers:
+            writer.close()
+        self.elapsed_sec += time.perf_counter() - started
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_all(segments, audio_file, output_dir, formats):
+    """세그먼트 목록을 선택한 모든 형식으로 한 번에 저장하고 파일 경로 목록 반환"""
+    with StreamingExporter(audio_file, output_dir, formats) as exporter:
+        exporter.write_all(segments)
+    return exporter.paths
+
+
+def save_segments(segments, audio_file, output_dir, format_type):
+    """지정한 형식으로 결과를 저장하고 파일 경로 반환"""
+    if format_type not in WRITERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {format_type}")
+    return save_all(segments, audio_file, output_dir, [format_type])[0]
@@ -0,0 +1,545 @@
+"""
+전사 작업 서버 (asyncio)
+- 파일 업로드 또는 서버에 있는 파일 경로로 작업 등록, SQLite 대기열에 저장 (서버를 다시 켜도 유지)
+- 모델을 로드해 둔 작업 풀(worker_pool)의 워커 프로세스로 분배 (모델은 작업 사이에 계속 재사용)
+- REST API 로 상태, 진행률, 결과 조회 / SSE(server-sent events)로 진행 상황 구독
+- JobClient: GUI 와 스크립트에서 쓰는 표준 라이브러리(urllib) 클라이언트
+
+API:
+    POST   /jobs                  JSON {"path": 서버 파일 경로, "options": {...}}
+                                  또는 음성 파일 본문 (?filename=이름&options=JSON)
+    GET    /jobs                  작업 목록 (최근 순)
+    GET    /jobs/<id>             상태와 진행률
+    GET    /jobs/<id>/events      진행 상황 SSE (작업이 끝나면 연결 종료)
+    GET    /jobs/<id>/result      결과 (?format=json|txt|csv|jsonl|srt|vtt|seg|profile)
+    DELETE /jobs/<id>             대기 중인 작업 취소
+    GET    /health                워커 수와 대기/실행 중 작업 수
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import functools
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlparse
+
+from exporters import EXPORT_FORMATS, output_path, save_segments
+from profiling import PROFILE_FORMAT, save_profile
+from result_cache import hash_audio_file
+from transcript_archive import get_archive
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+# 작업마다 바꿀 수 있는 옵션 (모델, 장치, 엔진, 화자 분리 토큰은 서버 시작 시 정한 것을 사용)
+JOB_OPTION_KEYS = ("word_timestamps", "vad", "diarization_window_sec", "use_cache", "speaker_index", "archive")
+MAX_UPLOAD_BYTES = int(os.environ.get("AUDIO_TRANSCRIBER_MAX_UPLOAD_MB", "2048")) * 1024 * 1024
+MAX_JSON_BYTES = 1024 * 1024
+# SSE 연결이 끊기지 않도록 이 간격(초)마다 주석 줄 전송
+SSE_KEEPALIVE_SEC = 15.0
+
+_READ_BLOCK = 1 << 20
+_CONTENT_TYPES = {
+    "json": "application/json", "jsonl": "application/x-ndjson", "txt": "text/plain; charset=utf-8",
+    "csv": "text/csv; charset=utf-8", "srt": "application/x-subrip", "vtt": "text/vtt",
+    "seg": "application/octet-stream", "profile": "application/json",
+}
+_STATUS_TEXT = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class JobStore:
+    """SQLite 작업 대기열 (서버 이벤트 루프 스레드에서만 사용)"""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                audio_path TEXT NOT NULL,
+                uploaded INTEGER NOT NULL,
+                options TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        # 서버가 중간에 종료되어 실행 중으로 남은 작업은 처음부터 다시 실행
+        self.conn.execute("UPDATE jobs SET status = 'queued', progress = 0, message = '', started_at = NULL "
+                          "WHERE status = 'running'")
+        self.conn.commit()
+
+    @staticmethod
+    def _row(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["uploaded"] = bool(job["uploaded"])
+        return job
+
+    def add(self, filename, audio_path, options, uploaded, job_id=None):
+        job_id = job_id or uuid.uuid4().hex
+        self.conn.execute(
+            "INSERT INTO jobs (id, status, filename, audio_path, uploaded, options, created_at) "
+            "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+            (job_id, filename, str(audio_path), int(uploaded), json.dumps(options), time.time()))
+        self.conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        return self._row(self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, limit=100):
+        rows = self.conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self._row(row) for row in rows]
+
+    def count(self, status):
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def claim_next(self):
+        """가장 오래된 대기 작업을 실행 중으로 바꾸고 반환 (없으면 None)"""
+        row = self.conn.execute(
+            "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+        if row is None:
+            return None
+        self.update(row["id"], status="running", started_at=time.time(), message="작업 시작")
+        return self.get(row["id"])
+
+    def update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self.conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def _safe_filename(name):
+    """업로드 파일 이름에서 경로와 특수 문자 제거"""
+    name = Path(name or "").name
+    name = re.sub(r"[^\w.\-]+", "_", name).strip("._")
+    return name or "audio"
+
+
+def job_public(job):
+    """API 로 내보낼 작업 정보 (서버 내부 경로 제외)"""
+    return {key: job[key] for key in ("id", "status", "filename", "options", "progress", "message", "error",
+                                      "created_at", "started_at", "finished_at")}
+
+
+async def _read_request(reader):
+    """요청 줄과 헤더 읽기 (본문은 경로별로 따로 읽음)"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "잘못된 요청입니다.")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    url = urlparse(target)
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    return {"method": method.upper(), "path": url.path.rstrip("/") or "/", "query": query, "headers": headers}
+
+
+def _content_length(request, limit):
+    try:
+        length = int(request["headers"].get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "Content-Length 가 올바르지 않습니다.")
+    if length > limit:
+        raise HttpError(413, f"요청 본문이 너무 큽니다 (최대 {limit // (1024 * 1024)}MB).")
+    return length
+
+
+async def _send(writer, status, body=b"", content_type="application/json", extra_headers=()):
+    headers = [f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}",
+               f"Content-Type: {content_type}",
+               f"Content-Length: {len(body)}",
+               "Connection: close", *extra_headers]
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _send_json(writer, status, payload):
+    await _send(writer, status, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+class JobServer:
+    """SQLite 대기열의 작업을 작업 풀로 분배하고 HTTP 로 상태를 제공"""
+
+    def __init__(self, data_dir, pool_options, workers=None):
+        """pool_options: worker_pool.WorkerPool 옵션 (model, backend, device, hf_token, ...)"""
+        self.data_dir = Path(data_dir)
+        (self.data_dir / "uploads").mkdir(parents=True, exist_ok=True)
+        (self.data_dir / "results").mkdir(parents=True, exist_ok=True)
+        self.store = JobStore(self.data_dir / "jobs.sqlite3")
+        self.pool_options = dict(pool_options)
+        # 검색 보관함 기록은 원래 파일 이름을 아는 서버가 맡음 (작업별 archive 옵션으로 바꿀 수 있음)
+        self.archive = self.pool_options.pop("archive", False)
+        self.workers = workers
+        self.pool = None
+        self.running = {}      # 작업 ID -> 결과 Future
+        self.subscribers = {}  # 작업 ID -> SSE 구독 큐 집합
+        self.server = None
+
+    def result_dir(self, job_id):
+        return self.data_dir / "results" / job_id
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # 모델을 쓰는 모듈은 서버를 실제로 시작할 때 가져옴
+        from worker_pool import WorkerPool
+        self.loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.pool = WorkerPool(self.pool_options, self.workers, progress_callback=self._progress_from_pool)
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self._dispatcher.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+        # 실행 중인 작업은 다음에 서버를 켜면 다시 실행됨
+        await asyncio.to_thread(self.pool.shutdown, False, True)
+        self.store.close()
+
+    # ------------------------------------------------------------------
+    # 작업 분배
+
+    async def _dispatch(self):
+        while True:
+            while len(self.running) < self.pool.workers:
+                job = self.store.claim_next()
+                if job is None:
+                    break
+                self._publish(job["id"], "status", job_public(job))
+                overrides = {key: value for key, value in job["options"].items() if key != "archive"}
+                future = asyncio.wrap_future(self.pool.submit(job["id"], job["audio_path"], overrides))
+                self.running[job["id"]] = future
+                future.add_done_callback(functools.partial(self._job_done, job["id"]))
+            self._wake.clear()
+            await self._wake.wait()
+
+    def _progress_from_pool(self, job_id, value, message):
+        # 작업 풀의 진행 상황 스레드에서 호출됨
+        self.loop.call_soon_threadsafe(self._on_progress, job_id, value, message)
+
+    def _on_progress(self, job_id, value, message):
+        if job_id not in self.running:
+            return
+        self.store.update(job_id, progress=value, message=message)
+        self._publish(job_id, "progress", {"id": job_id, "progress": value, "message": message})
+
+    def _job_done(self, job_id, future):
+        asyncio.create_task(self._finish_job(job_id, future))
+
+    async def _finish_job(self, job_id, future):
+        job = self.store.get(job_id)
+        try:
+            segments, profile = future.result()
+            await asyncio.to_thread(self._save_result, job, segments, profile)
+            self.store.update(job_id, status="done", progress=100, message="완료", finished_at=time.time())
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e), message="실패", finished_at=time.time())
+        finally:
+            del self.running[job_id]
+            if job["uploaded"]:
+                Path(job["audio_path"]).unlink(missing_ok=True)
+            self._publish(job_id, "status", job_public(self.store.get(job_id)))
+            self._wake.set()
+
+    def _save_result(self, job, segments, profile):
+        result_dir = self.result_dir(job["id"])
+        save_segments(segments, job["filename"], result_dir, "json")
+        save_profile(profile, job["filename"], result_dir)
+        if job["options"].get("archive", self.archive):
+            self._archive_result(job, segments, profile)
+
+    @staticmethod
+    def _archive_result(job, segments, profile):
+        """결과를 검색 보관함에 기록 (업로드 파일은 지우기 전에 해시를 구하고 원래 이름으로 기록)"""
+        meta = profile.get("meta", {})
+        try:
+            get_archive().ingest(job["filename"] if job["uploaded"] else job["audio_path"], segments,
+                                 meta.get("model") or "", meta.get("backend"),
+                                 audio_hash=hash_audio_file(job["audio_path"]), duration=profile.get("audio_sec"),
+                                 recorded_at=job["created_at"] if job["uploaded"] else None)
+        except Exception as e:
+            print(f"보관함 기록 오류: {e}")
+
+    def _publish(self, job_id, event, data):
+        for queue in self.subscribers.get(job_id, ()):
+            queue.put_nowait((event, data))
+
+    # ------------------------------------------------------------------
+    # HTTP
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await _read_request(reader)
+            if request is not None:
+                await self._route(request, reader, writer)
+        except HttpError as e:
+            await _send_json(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            await _send_json(writer, 500, {"error": str(e)})
+        finally:
+            writer.close()
+
+    async def _route(self, request, reader, writer):
+        method, parts = request["method"], request["path"].strip("/").split("/")
+        if parts == ["health"] and method == "GET":
+            await _send_json(writer, 200, {"workers": self.pool.workers, "queued": self.store.count("queued"),
+                                           "running": len(self.running)})
+        elif parts == ["jobs"] and method == "POST":
+            job = await self._create_job(request, reader)
+            self._wake.set()
+            await _send_json(writer, 201, job_public(job))
+        elif parts == ["jobs"] and method == "GET":
+            await _send_json(writer, 200, [job_public(job) for job in self.store.list()])
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.store.get(parts[1])
+            if job is None:
+                raise HttpError(404, "작업이 없습니다.")
+            action = parts[2] if len(parts) == 3 else None
+            if action is None and method == "GET":
+                await _send_json(writer, 200, job_public(job))
+            elif action is None and method == "DELETE":
+                await _send_json(writer, 200, self._cancel_job(job))
+            elif action == "events" and method == "GET":
+                await self._stream_events(job, writer)
+            elif action == "result" and method == "GET":
+                await self._send_result(job, request["query"].get("format", "json"), writer)
+            else:
+                raise HttpError(405, "지원하지 않는 요청입니다.")
+        else:
+            raise HttpError(404, "경로가 없습니다.")
+
+    async def _create_job(self, request, reader):
+        content_type = request["headers"].get("content-type", "")
+        if content_type.startswith("application/json"):
+            length = _content_length(request, MAX_JSON_BYTES)
+            try:
+                payload = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise HttpError(400, "JSON 본문이 올바르지 않습니다.")
+            path = Path(payload.get("path") or "")
+            if not path.is_file():
+                raise HttpError(400, f"서버에 파일이 없습니다: {path}")
+            options = self._job_options(payload.get("options"))
+            return self.store.add(path.name, path.resolve(), options, uploaded=False)
+
+        # 음성 파일 본문을 조각 단위로 디스크에 기록 (메모리에 전체를 올리지 않음)
+        try:
+            options = self._job_options(json.loads(request["query"].get("options", "{}")))
+        except ValueError:
+            raise HttpError(400, "options 가 올바른 JSON 이 아닙니다.")
+        length = _content_length(request, MAX_UPLOAD_BYTES)
+        if length == 0:
+            raise HttpError(400, "업로드할 파일 본문이 없습니다.")
+        job_id = uuid.uuid4().hex
+        filename = _safe_filename(request["query"].get("filename"))
+        upload_path = self.data_dir / "uploads" / f"{job_id}_{filename}"
+        try:
+            with open(upload_path, "wb") as f:
+                remaining = length
+                while remaining:
+                    block = await reader.readexactly(min(remaining, _READ_BLOCK))
+                    f.write(block)
+                    remaining -= len(block)
+        except BaseException:
+            upload_path.unlink(missing_ok=True)
+            raise
+        return self.store.add(filename, upload_path, options, uploaded=True, job_id=job_id)
+
+    @staticmethod
+    def _job_options(options):
+        options = options or {}
+        if not isinstance(options, dict):
+            raise HttpError(400, "options 는 객체여야 합니다.")
+        unknown = sorted(set(options) - set(JOB_OPTION_KEYS))
+        if unknown:
+            raise HttpError(400, f"작업별로 바꿀 수 없는 옵션입니다: {', '.join(unknown)}")
+        return options
+
+    def _cancel_job(self, job):
+        if job["status"] != "queued":
+            raise HttpError(409, "대기 중인 작업만 취소할 수 있습니다.")
+        self.store.update(job["id"], status="cancelled", message="취소됨", finished_at=time.time())
+        if job["uploaded"]:
+            Path(job["audio_path"]).unlink(missing_ok=True)
+        job = self.store.get(job["id"])
+        self._publish(job["id"], "status", job_public(job))
+        return job_public(job)
+
+    async def _stream_events(self, job, writer):
+        """현재 상태를 먼저 보내고 작업이 끝날 때까지 진행 상황 전송"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        queue = asyncio.Queue()
+        self.subscribers.setdefault(job["id"], set()).add(queue)
+        try:
+            event, data = "status", job_public(job)
+            while True:
+                writer.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+                await writer.drain()
+                if event == "status" and data["status"] in FINISHED_STATUSES:
+                    return
+                while True:
+                    try:
+                        event, data = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SEC)
+                        break
+                    except asyncio.TimeoutError:
+                        writer.write(b": keep-alive\n\n")
+                        await writer.drain()
+        finally:
+            subscribers = self.subscribers.get(job["id"], set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self.subscribers.pop(job["id"], None)
+
+    async def _send_result(self, job, format_type, writer):
+        if job["status"] != "done":
+            raise HttpError(409, f"작업이 끝나지 않았습니다 ({job['status']}).")
+        if format_type not in EXPORT_FORMATS and format_type != "profile":
+            raise HttpError(400, f"지원하지 않는 형식입니다: {format_type}")
+        result_dir = self.result_dir(job["id"])
+        path = output_path(result_dir, job["filename"], PROFILE_FORMAT if format_type == "profile" else format_type)
+        if not path.exists() and format_type != "profile":
+            # JSON 결과에서 요청한 형식을 처음 한 번만 만들어 둠
+            def _convert():
+                with open(output_path(result_dir, job["filename"], "json"), encoding="utf-8") as f:
+                    segments = json.load(f)
+                save_segments(segments, job["filename"], result_dir, format_type)
+            await asyncio.to_thread(_convert)
+        body = await asyncio.to_thread(path.read_bytes)
+        await _send(writer, 200, body, _CONTENT_TYPES[format_type],
+                    [f"Content-Disposition: attachment; filename*=UTF-8''{quote(path.name)}"])
+
+
+def serve(data_dir, pool_options, workers=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """작업 서버 실행 (Ctrl+C 로 종료)"""
+    async def _main():
+        server = JobServer(data_dir, pool_options, workers)
+        address = await server.start(host, port)
+        print(f"작업 서버 시작: http://{address[0]}:{address[1]} (워커 {server.pool.workers}개, "
+              f"데이터: {server.data_dir})")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
+
+
+class JobClient:
+    """작업 서버 HTTP 클라이언트"""
+
+    def __init__(self, base_url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _open(self, method, path, data=None, headers=None, timeout=None):
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers or {})
+        try:
+            return urllib.request.urlopen(request, timeout=timeout or self.timeout)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error")
+            except ValueError:
+                message = None
+            raise RuntimeError(message or f"작업 서버 오류 ({e.code})") from None
+
+    def _json(self, method, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        with self._open(method, path, data, {"Content-Type": "application/json"}) as response:
+            return json.loads(response.read())
+
+    def submit_file(self, audio_file, options=None):
+        """음성 파일을 업로드해 작업 등록"""
+        query = f"?filename={quote(Path(audio_file).name)}&options={quote(json.dumps(options or {}))}"
+        size = os.path.getsize(audio_file)
+        with open(audio_file, "rb") as f:
+            headers = {"Content-Type": "application/octet-stream", "Content-Length": str(size)}
+            with self._open("POST", "/jobs" + query, f, headers, timeout=max(self.timeout, 600)) as response:
+                return json.loads(response.read())
+
+    def submit_path(self, path, options=None):
+        """서버에서 접근할 수 있는 파일 경로로 작업 등록"""
+        return self._json("POST", "/jobs", {"path": str(path), "options": options or {}})
+
+    def status(self, job_id):
+        return self._json("GET", f"/jobs/{job_id}")
+
+    def jobs(self):
+        return self._json("GET", "/jobs")
+
+    def cancel(self, job_id):
+        return self._json("DELETE", f"/jobs/{job_id}")
+
+    def events(self, job_id):
+        """(이벤트 이름, 데이터) 를 작업이 끝날 때까지 생성"""
+        with self._open("GET", f"/jobs/{job_id}/events", timeout=SSE_KEEPALIVE_SEC * 4) as response:
+            event, data = "message", []
+            for line in response:
+                line = line.decode("utf-8").rstrip("\r\n")
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    yield event, json.loads("\n".join(data))
+                    event, data = "message", []
+
+    def result(self, job_id, format_type="json"):
+        """결과 본문 (json, profile 은 파싱한 값, 나머지는 bytes)"""
+        with self._open("GET", f"/jobs/{job_id}/result?format={format_type}") as response:
+            body = response.read()
+        return json.loads(body) if format_type in ("json", "profile") else body
+
+    def wait(self, job_id, progress_callback=None):
+        """작업이 끝날 때까지 진행 상황을 받고 마지막 상태 반환"""
+        job = None
+        for event, data in self.events(job_id):
+            if event == "progress" and progress_callback:
+                progress_callback(data["progress"], data["message"])
+            elif event == "status":
+                job = data
+        return job or self.status(job_id)
@@ -0,0 +1,485 @@
+"""
+실시간 전사 (마이크 / 파이프 / 소켓)
+- 입력 장치(sounddevice) 또는 원시 PCM 스트림(표준 입력, FIFO, TCP)에서 16kHz 모노 오디오 수신
+- 롤링 윈도우 Whisper 추론: 새 오디오가 step_sec 만큼 쌓일 때마다 아직 확정되지 않은 버퍼를 다시 전사
+  · 연속된 두 번의 추론에서 똑같이 나온 앞부분 세그먼트는 확정(final), 나머지는 임시 결과(partial)
+  · 말이 멈추거나(무음) 버퍼가 너무 길어지면 바로 확정
+- 확정된 세그먼트마다 온라인 화자 임베딩 추적기로 화자를 점진적으로 지정
+- 발화 시점(캡처 시각)부터 결과가 나오기까지의 지연 측정
+- 음성 파일을 실제 속도로 재생하여 마이크 대신 사용 가능 (테스트/재현용)
+"""
+
+import os
+import re
+import sys
+import stat
+import time
+import queue
+import socket
+import threading
+from bisect import bisect_left
+from collections import deque
+from urllib.parse import urlparse
+
+import numpy as np
+
+from asr_backends import DEFAULT_BACKEND, get_backend
+from audio_io import SAMPLE_RATE, decode_audio
+from vad import FRAME_SEC, frame_energy_db
+
+BLOCK_SEC = 0.1
+STEP_SEC = 1.0
+MAX_BUFFER_SEC = 20.0
+# 버퍼 끝에서 이 안쪽에 끝나는 세그먼트는 다음 오디오에 따라 바뀔 수 있으므로 확정하지 않음
+HOLDBACK_SEC = 1.0
+# 이 크기보다 작은 프레임만 이어지면 무음, 무음이 이만큼 이어지면 발화 끝으로 보고 확정
+SILENCE_DB = -45.0
+SILENCE_FINALIZE_SEC = 0.8
+# 다음 추론에 문맥으로 넘길 확정 텍스트 길이 (문자)
+PROMPT_CHARS = 200
+
+# 화자 임베딩이 기존 화자와 이 코사인 유사도 이상이면 같은 화자
+PYANNOTE_SPEAKER_THRESHOLD = 0.5
+SPECTRAL_SPEAKER_THRESHOLD = 0.85
+MIN_SPEAKER_SEC = 0.5
+
+RAW_PCM_SUFFIXES = (".pcm", ".raw")
+
+
+# ---------------------------------------------------------------------------
+# 입력 소스: blocks() 가 (float32 샘플, 캡처 시각 perf_counter) 를 생성
+# ---------------------------------------------------------------------------
+
+class AudioSource:
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self):
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def blocks(self):
+        raise NotImplementedError
+
+
+class MicrophoneSource(AudioSource):
+    """입력 장치 캡처 (sounddevice 필요)"""
+
+    def __init__(self, device=None, block_sec=BLOCK_SEC):
+        super().__init__()
+        self.device = device
+        self.block_sec = block_sec
+
+    def blocks(self):
+        try:
+            import sounddevice
+        except ImportError:
+            raise RuntimeError("마이크 입력에는 sounddevice 패키지가 필요합니다 (pip install sounddevice).")
+        captured = queue.Queue()
+
+        def _callback(indata, frames, time_info, status):
+            # 콜백 시점이 블록 마지막 샘플의 캡처 시각
+            captured.put((indata[:, 0].copy(), time.perf_counter()))
+
+        with sounddevice.InputStream(samplerate=self.sample_rate, channels=1, dtype="float32",
+                                     blocksize=int(self.sample_rate * self.block_sec),
+                                     device=self.device, callback=_callback):
+            while not self._stop.is_set():
+                try:
+                    yield captured.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+
+class PcmStreamSource(AudioSource):
+    """원시 PCM 스트림 (16kHz 모노, s16le 또는 f32le)
+
+    캡처 시각은 데이터가 도착한 시각이므로 보내는 쪽의 버퍼링 지연은 포함하지 않는다.
+    """
+
+    FORMATS = {"s16le": ("<i2", 32768.0), "f32le": ("<f4", 1.0)}
+
+    def __init__(self, stream, sample_format="s16le", block_sec=BLOCK_SEC, closer=None):
+        super().__init__()
+        if sample_format not in self.FORMATS:
+            raise ValueError(f"지원하지 않는 PCM 형식입니다: {sample_format}")
+        self.stream = stream
+        self.dtype, self.scale = self.FORMATS[sample_format]
+        self.block_bytes = int(self.sample_rate * block_sec) * np.dtype(self.dtype).itemsize
+        self.closer = closer
+
+    def blocks(self):
+        itemsize = np.dtype(self.dtype).itemsize
+        pending = b""
+        try:
+            while not self._stop.is_set():
+                data = self.stream.read(self.block_bytes)
+                if not data:
+                    break
+                data = pending + data
+                usable = len(data) - len(data) % itemsize
+                pending = data[usable:]
+                samples = np.frombuffer(data[:usable], dtype=self.dtype).astype(np.float32) / self.scale
+                yield samples, time.perf_counter()
+        finally:
+            if self.closer:
+                self.closer()
+
+
+class FileReplaySource(AudioSource):
+    """음성 파일을 실제 속도로 재생하여 마이크 대신 사용 (realtime=False 면 최대한 빠르게)"""
+
+    def __init__(self, path, realtime=True, block_sec=BLOCK_SEC):
+        super().__init__()
+        self.path = path
+        self.realtime = realtime
+        self.block = int(self.sample_rate * block_sec)
+
+    def blocks(self):
+        with decode_audio(str(self.path)) as audio:
+            started = time.perf_counter()
+            for start in range(0, len(audio.samples), self.block):
+                if self._stop.is_set():
+                    break
+                end = min(len(audio.samples), start + self.block)
+                captured = time.perf_counter()
+                if self.realtime:
+                    # 블록 마지막 샘플이 "말해지는" 시각까지 기다림
+                    captured = started + end / self.sample_rate
+                    delay = captured - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                yield np.array(audio.samples[start:end], dtype=np.float32), captured
+
+
+def open_source(spec, sample_format="s16le", realtime=True):
+    """입력 지정 문자열로 소스 생성
+
+    mic 또는 mic:<장치>    입력 장치
+    -                     표준 입력의 원시 PCM
+    tcp://호스트:포트       TCP 로 받는 원시 PCM
+    *.pcm, *.raw, FIFO     파일/파이프의 원시 PCM
+    그 밖의 파일            음성 파일을 실제 속도로 재생
+    """
+    if spec == "mic" or spec.startswith("mic:"):
+        device = spec[4:] or None
+        if device is not None and device.isdigit():
+            device = int(device)
+        return MicrophoneSource(device)
+    if spec == "-":
+        return PcmStreamSource(sys.stdin.buffer, sample_format)
+    if spec.startswith("tcp://"):
+        url = urlparse(spec)
+        sock = socket.create_connection((url.hostname, url.port))
+        stream = sock.makefile("rb")
+
+        def _close():
+            stream.close()
+            sock.close()
+        return PcmStreamSource(stream, sample_format, closer=_close)
+    if spec.lower().endswith(RAW_PCM_SUFFIXES) or stat.S_ISFIFO(os.stat(spec).st_mode):
+        stream = open(spec, "rb")
+        return PcmStreamSource(stream, sample_format, closer=stream.close)
+    return FileReplaySource(spec, realtime)
+
+
+# ---------------------------------------------------------------------------
+# 온라인 화자 추적
+# ---------------------------------------------------------------------------
+
+class PyannoteEmbedder:
+    """pyannote 화자 임베딩 (HF 토큰 필요)"""
+    threshold = PYANNOTE_SPEAKER_THRESHOLD
+
+    def __init__(self, hf_token, device="cpu"):
+        from model_cache import load_speaker_embedding_model
+        self.inference = load_speaker_embedding_model(hf_token, device)
+
+    def __call__(self, samples, sample_rate):
+        import torch
+        waveform = torch.from_numpy(np.ascontiguousarray(samples, dtype=np.float32)).unsqueeze(0)
+        return np.asarray(self.inference({"waveform": waveform, "sample_rate": sample_rate})).reshape(-1)
+
+
+class SpectralEmbedder:
+    """토큰이 없을 때 쓰는 간이 임베딩 (대역 로그 에너지의 스펙트럼 모양, 정확도 낮음)"""
+    threshold = SPECTRAL_SPEAKER_THRESHOLD
+    frame = 400
+    bands = 32
+
+    def __call__(self, samples, sample_rate):
+        n_frames = len(samples) // self.frame
+        frames = np.asarray(samples[:n_frames * self.frame], dtype=np.float32).reshape(n_frames, self.frame)
+        power = np.abs(np.fft.rfft(frames * np.hanning(self.frame), axis=1)) ** 2
+        energy = np.stack([band.sum(axis=1) for band in np.array_split(power, self.bands, axis=1)], axis=1)
+        log_energy = np.log(energy + 1e-10)
+        # 음량과 무관하도록 프레임별 평균을 빼고 모양만 사용
+        shape = log_energy - log_energy.mean(axis=1, keepdims=True)
+        return np.concatenate([shape.mean(axis=0), shape.std(axis=0)])
+
+
+class OnlineSpeakerTracker:
+    """확정된 발화의 임베딩을 기존 화자 중심과 비교해 화자를 점진적으로 지정"""
+
+    def __init__(self, embedder, threshold=None, max_speakers=None):
+        self.embedder = embedder
+        self.threshold = embedder.threshold if threshold is None else threshold
+        self.max_speakers = max_speakers
+        self.centroids = []
+        self.last_speaker = None
+
+    def assign(self, samples, sample_rate):
+        """화자 이름 반환 (너무 짧은 발화는 직전 화자)"""
+        if len(samples) < MIN_SPEAKER_SEC * sample_rate:
+            return self.last_speaker or "Speaker_1"
+        embedding = self.embedder(samples, sample_rate)
+        embedding = embedding / (np.linalg.norm(embedding) + 1e-10)
+        best, best_similarity = None, -1.0
+        for index, centroid in enumerate(self.centroids):
+            similarity = float(centroid @ embedding) / (np.linalg.norm(centroid) + 1e-10)
+            if similarity > best_similarity:
+                best, best_similarity = index, similarity
+        full = self.max_speakers is not None and len(self.centroids) >= self.max_speakers
+        if best is not None and (best_similarity >= self.threshold or full):
+            # 중심은 정규화된 임베딩의 합 (방향만 비교)
+            self.centroids[best] = self.centroids[best] + embedding
+        else:
+            self.centroids.append(embedding)
+            best = len(self.centroids) - 1
+        self.last_speaker = f"Speaker_{best + 1}"
+        return self.last_speaker
+
+
+# ---------------------------------------------------------------------------
+# 롤링 윈도우 전사
+# ---------------------------------------------------------------------------
+
+class LatencyStats:
+    """지연 시간 통계 (초)"""
+
+    def __init__(self, window=1000):
+        self.values = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value):
+        self.values.append(value)
+        self.count += 1
+
+    def summary(self):
+        if not self.values:
+            return {"count": 0}
+        values = np.asarray(self.values)
+        return {
+            "count": self.count,
+            "mean": float(values.mean()),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+        }
+
+
+def _normalize(text):
+    return re.sub(r"[\W_]+", "", text).lower()
+
+
+class LiveTranscriber:
+    """입력 소스의 오디오를 롤링 윈도우로 전사하며 임시/확정 결과를 콜백으로 전달
+
+    on_partial(event), on_final(event), on_stats(stats) 는 run() 을 호출한 스레드에서 호출된다.
+    event: {"type", "speaker", "start", "end", "text", "capture_time", "latency_sec"}
+    (start/end 는 스트림 시작 기준 초, capture_time 은 결과에 포함된 마지막 음성의 캡처 시각)
+    """
+
+    def __init__(self, model_size="base", device="cpu", backend=DEFAULT_BACKEND, hf_token=None,
+                 step_sec=STEP_SEC, max_buffer_sec=MAX_BUFFER_SEC, max_speakers=None,
+                 on_partial=None, on_final=None, on_stats=None):
+        self.engine = get_backend(backend)
+        self.model_size = model_size
+        self.device = device
+        self.hf_token = hf_token
+        self.step_sec = step_sec
+        self.max_buffer_sec = max_buffer_sec
+        self.max_speakers = max_speakers
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.on_stats = on_stats
+        self.latency = {"partial": LatencyStats(), "final": LatencyStats()}
+        self.tracker = None
+        self.source = None
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+        if self.source is not None:
+            self.source.stop()
+
+    def _make_tracker(self):
+        embedder = None
+        if self.hf_token:
+            try:
+                embedder = PyannoteEmbedder(self.hf_token, self.device)
+            except Exception as e:
+                print(f"화자 임베딩 모델 로딩 실패, 간이 임베딩 사용: {e}")
+        return OnlineSpeakerTracker(embedder or SpectralEmbedder(), max_speakers=self.max_speakers)
+
+    def run(self, source):
+        """소스가 끝나거나 stop() 될 때까지 실행"""
+        self.source = source
+        self.model = self.engine.load(self.model_size, self.device)
+        self.tracker = self._make_tracker()
+        self.sample_rate = source.sample_rate
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0          # 버퍼 첫 샘플의 스트림 내 위치
+        self.block_ends = []           # (블록 끝 샘플 위치, 캡처 시각)
+        self.hypothesis = []           # 직전 추론의 미확정 세그먼트 텍스트
+        self.prompt = ""
+
+        # 캡처는 별도 스레드에서 계속 받고, 추론이 느려도 블록을 잃지 않도록 큐에 쌓음
+        blocks = queue.Queue()
+
+        def _reader():
+            try:
+                for block in source.blocks():
+                    blocks.put(block)
+                    if self._stop.is_set():
+                        break
+            except Exception as e:
+                blocks.put(e)
+            finally:
+                blocks.put(None)
+
+        threading.Thread(target=_reader, name="live-capture", daemon=True).start()
+        step = int(self.step_sec * self.sample_rate)
+        total = 0
+        last_step = 0
+        ended = False
+        while not ended:
+            items = [blocks.get()]
+            while True:
+                try:
+                    items.append(blocks.get_nowait())
+                except queue.Empty:
+                    break
+            for item in items:
+                if item is None:
+                    ended = True
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                samples, captured = item
+                total += len(samples)
+                self.buffer = np.concatenate([self.buffer, samples])
+                self.block_ends.append((total, captured))
+            if ended or self._stop.is_set():
+                break
+            if total - last_step >= step:
+                last_step = total
+                self._step()
+        # 남은 미확정 결과를 모두 확정
+        self._step(flush=True)
+        source.stop()
+
+    def _capture_time(self, position):
+        """스트림 내 샘플 위치의 캡처 시각"""
+        index = bisect_left(self.block_ends, (position, float("-inf")))
+        if index >= len(self.block_ends):
+            end, captured = self.block_ends[-1]
+        else:
+            end, captured = self.block_ends[index]
+        return captured - (end - position) / self.sample_rate
+
+    def _trim(self, position):
+        """position (스트림 샘플 위치) 이전의 버퍼 삭제"""
+        position = min(max(position, self.buffer_start), self.buffer_start + len(self.buffer))
+        self.buffer = self.buffer[position - self.buffer_start:]
+        self.buffer_start = position
+        while len(self.block_ends) > 1 and self.block_ends[0][0] < position:
+            self.block_ends.pop(0)
+
+    def _event(self, kind, start, end, text, speaker=None):
+        position = int(round(end * self.sample_rate))
+        captured = self._capture_time(min(position, self.buffer_start + len(self.buffer)))
+        latency = time.perf_counter() - captured
+        if text:
+            self.latency[kind].add(latency)
+        return {"type": kind, "speaker": speaker, "start": start, "end": end, "text": text,
+                "capture_time": captured, "latency_sec": latency}
+
+    def _step(self, flush=False):
+        sr = self.sample_rate
+        buffer_end = self.buffer_start + len(self.buffer)
+        if len(self.buffer) == 0:
+            return
+        energy = frame_energy_db(self.buffer, sr)
+        if len(energy) == 0 or energy.max() < SILENCE_DB:
+            # 버퍼 전체가 무음: 전사하지 않고 버림
+            self._trim(buffer_end)
+            self.hypothesis = []
+            self._emit_partial("", buffer_end / sr, buffer_end / sr)
+            return
+
+        started = time.perf_counter()
+        offset = self.buffer_start / sr
+        result = self.engine.transcribe(self.model, self.buffer, initial_prompt=self.prompt or None)
+        infer_sec = time.perf_counter() - started
+        segments = [(offset + seg["start"], offset + seg["end"], seg["text"].strip())
+                    for seg in result["segments"] if seg["text"].strip()]
+
+        silent_frames = int(SILENCE_FINALIZE_SEC / FRAME_SEC)
+        tail_silent = len(energy) >= silent_frames and energy[-silent_frames:].max() < SILENCE_DB
+        buffer_sec = len(self.buffer) / sr
+        if flush or tail_silent:
+            # 말이 멈췄으면 지금까지의 결과는 더 바뀌지 않음
+            commit = segments
+        else:
+            # 직전 추론과 일치하고 버퍼 끝에서 충분히 떨어진 앞부분만 확정
+            commit = []
+            for index, (start, end, text) in enumerate(segments):
+                if (index < len(self.hypothesis) and _normalize(self.hypothesis[index]) == _normalize(text)
+                        and end <= buffer_end / sr - HOLDBACK_SEC):
+                    commit.append((start, end, text))
+                else:
+                    break
+            if not commit and buffer_sec > self.max_buffer_sec:
+                # 버퍼가 너무 길면 마지막 세그먼트만 남기고 확정
+                commit = segments[:-1]
+                if not segments:
+                    self._trim(buffer_end - int(HOLDBACK_SEC * sr))
+
+        for start, end, text in commit:
+            self._finalize(start, end, text)
+        rest = segments[len(commit):]
+        self.hypothesis = [text for _, _, text in rest]
+        if flush or tail_silent:
+            self._trim(buffer_end)
+        elif commit:
+            self._trim(int(round(commit[-1][1] * sr)))
+
+        if rest:
+            self._emit_partial(" ".join(text for _, _, text in rest), rest[0][0], buffer_end / sr)
+        else:
+            self._emit_partial("", buffer_end / sr, buffer_end / sr)
+        if self.on_stats:
+            self.on_stats({
+                "infer_sec": infer_sec,
+                "buffer_sec": buffer_sec,
+                "rtf": infer_sec / self.step_sec,
+                "partial": self.latency["partial"].summary(),
+                "final": self.latency["final"].summary(),
+                "speakers": len(self.tracker.centroids),
+            })
+
+    def _emit_partial(self, text, start, end):
+        if self.on_partial:
+            self.on_partial(self._event("partial", start, end, text))
+
+    def _finalize(self, start, end, text):
+        sr = self.sample_rate
+        first = max(0, int(start * sr) - self.buffer_start)
+        last = max(first, int(end * sr) - self.buffer_start)
+        speaker = self.tracker.assign(self.buffer[first:last], sr)
+        self.prompt = (self.prompt + " " + text).strip()[-PROMPT_CHARS:]
+        event = self._event("final", start, end, text, speaker)
+        if self.on_final:
+            self.on_final(event)
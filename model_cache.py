@@ -0,0 +1,209 @@
+"""
+모델 캐시
+- Whisper / pyannote 모델을 프로세스 전역에서 재사용
+- (모델 이름, 장치, dtype) 키 기반 LRU 제거 및 메모리 예산
+- 파일 선택 중 백그라운드 미리 로딩
+- torch / whisper / pyannote 는 실제로 모델을 로드할 때 가져옴 (GUI 시작 시간 단축)
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+# 화자 임베딩 모델 (speaker-diarization-3.1 이 내부에서 쓰는 것과 같은 모델)
+SPEAKER_EMBEDDING_MODEL = "pyannote/wespeaker-voxceleb-resnet34-LM"
+
+# 캐시가 보관할 모델 메모리 총량 (MB)
+DEFAULT_MEMORY_BUDGET_MB = int(os.environ.get("AUDIO_TRANSCRIBER_MODEL_CACHE_MB", "6144"))
+
+
+def estimate_model_bytes(model):
+    """모델 파라미터와 버퍼가 차지하는 메모리(바이트) 추정"""
+    import torch
+    modules = []
+    if isinstance(model, torch.nn.Module):
+        modules.append(model)
+    else:
+        # pyannote Pipeline 은 nn.Module 이 아니므로 내부 추론 모델을 찾아 합산
+        for value in vars(model).values():
+            if isinstance(value, torch.nn.Module):
+                modules.append(value)
+                continue
+            for attr in ("model", "model_"):
+                inner = getattr(value, attr, None)
+                if isinstance(inner, torch.nn.Module):
+                    modules.append(inner)
+
+    total = 0
+    seen = set()
+    for module in modules:
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            if id(tensor) in seen:
+                continue
+            seen.add(id(tensor))
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelCache:
+    """(모델 이름, 장치, dtype) 키로 로드된 모델을 보관하는 LRU 캐시"""
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (model, nbytes)
+        self._pending = {}             # key -> Future (로딩 중인 모델)
+
+    def get(self, key, loader):
+        """캐시된 모델 반환, 없으면 loader()로 로드 (같은 키의 동시 로딩은 한 번만 수행)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._pending[key] = future
+
+        if not owner:
+            # 다른 스레드(예: 미리 로딩)가 로드 중이면 완료를 기다림
+            return future.result()
+
+        try:
+            model = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        nbytes = estimate_model_bytes(model)
+        with self._lock:
+            del self._pending[key]
+            self._entries[key] = (model, nbytes)
+            self._evict()
+        future.set_result(model)
+        return model
+
+    def preload(self, key, loader):
+        """백그라운드 스레드에서 모델을 미리 로드"""
+        def _run():
+            try:
+                self.get(key, loader)
+            except Exception as e:
+                print(f"모델 미리 로딩 실패 {key}: {e}")
+
+        thread = threading.Thread(target=_run, daemon=True)
+        thread.start()
+        return thread
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(nbytes for _, nbytes in self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        # 아직 torch 를 가져오지 않았다면 비울 GPU 메모리도 없음
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def _evict(self):
+        """메모리 예산을 넘으면 가장 오래 사용하지 않은 모델부터 제거 (최신 모델은 유지)"""
+        total = sum(nbytes for _, nbytes in self._entries.values())
+        evicted_cuda = False
+        while total > self.memory_budget and len(self._entries) > 1:
+            key, (_, nbytes) = self._entries.popitem(last=False)
+            total -= nbytes
+            evicted_cuda = evicted_cuda or str(key[1]).startswith("cuda")
+        if evicted_cuda:
+            import torch
+            torch.cuda.empty_cache()
+
+
+_model_cache = ModelCache()
+
+
+def get_model_cache():
+    """프로세스 전역 모델 캐시"""
+    return _model_cache
+
+
+def whisper_model_key(model_size, device, dtype="fp32"):
+    return (model_size, device, dtype)
+
+
+def diarization_pipeline_key(device, dtype="fp32"):
+    return (DIARIZATION_MODEL, device, dtype)
+
+
+def speaker_embedding_key(device):
+    return (SPEAKER_EMBEDDING_MODEL, device, "fp32")
+
+
+def _whisper_loader(model_size, device):
+    def _load():
+        import whisper
+        return whisper.load_model(model_size, device=device)
+    return _load
+
+
+def _diarization_loader(hf_token, device):
+    def _load():
+        import torch
+        from pyannote.audio import Pipeline
+        pipeline = Pipeline.from_pretrained(DIARIZATION_MODEL, use_auth_token=hf_token)
+        if pipeline is None:
+            # 토큰이 잘못됐거나 모델 약관에 동의하지 않은 경우 None 이 반환됨
+            raise RuntimeError("화자 분리 모델을 불러올 수 없습니다. HF 토큰과 모델 약관 동의를 확인하세요.")
+        pipeline.to(torch.device(device))
+        return pipeline
+    return _load
+
+
+def _speaker_embedding_loader(hf_token, device):
+    def _load():
+        import torch
+        from pyannote.audio import Inference, Model
+        model = Model.from_pretrained(SPEAKER_EMBEDDING_MODEL, use_auth_token=hf_token)
+        if model is None:
+            raise RuntimeError("화자 임베딩 모델을 불러올 수 없습니다. HF 토큰과 모델 약관 동의를 확인하세요.")
+        # 입력 구간 전체에서 임베딩 하나를 계산
+        return Inference(model, window="whole", device=torch.device(device))
+    return _load
+
+
+def load_whisper_model(model_size, device, dtype="fp32"):
+    """Whisper 모델을 캐시에서 가져오거나 로드"""
+    return _model_cache.get(whisper_model_key(model_size, device, dtype),
+                            _whisper_loader(model_size, device))
+
+
+def load_diarization_pipeline(hf_token, device="cpu", dtype="fp32"):
+    """pyannote 화자 분리 파이프라인을 캐시에서 가져오거나 로드"""
+    return _model_cache.get(diarization_pipeline_key(device, dtype),
+                            _diarization_loader(hf_token, device))
+
+
+def load_speaker_embedding_model(hf_token, device="cpu"):
+    """pyannote 화자 임베딩 추론기를 캐시에서 가져오거나 로드"""
+    return _model_cache.get(speaker_embedding_key(device), _speaker_embedding_loader(hf_token, device))
+
+
+def preload_whisper_model(model_size, device, dtype="fp32"):
+    return _model_cache.preload(whisper_model_key(model_size, device, dtype),
+                                _whisper_loader(model_size, device))
+
+
+def preload_diarization_pipeline(hf_token, device="cpu", dtype="fp32"):
+    return _model_cache.preload(diarization_pipeline_key(device, dtype),
+                                _diarization_loader(hf_token, device))
@@ -0,0 +1,70 @@
+"""
+파일 분할 병렬 전사
+- 긴 파일 하나를 무음 경계에서 비슷한 길이의 청크로 나눠 작업 풀(worker_pool)의 여러 프로세스가 동시에 전사
+- 청크마다 앞뒤로 조금 더(PARALLEL_OVERLAP_SEC) 전사한 뒤, 단어 중심이 청크 자신의 구간에 있는
+  단어만 남겨 경계에 걸친 단어가 두 번 나오지 않게 함
+- 결과는 청크 순서대로 이어 붙이며 타임스탬프는 원본 기준 (세그먼트 형식은 순차 전사와 같음)
+- 긴 오디오가 memmap 이면 워커가 같은 임시 파일을 직접 읽어 샘플을 복사해 보내지 않음
+"""
+
+import numpy as np
+
+# 청크 경계 앞뒤로 더 전사할 길이 (초, 경계에서 잘린 단어를 온전히 인식하기 위함)
+PARALLEL_OVERLAP_SEC = 1.0
+# 워커당 청크 수 (길이가 다른 청크가 섞여도 워커가 놀지 않도록 워커 수보다 여러 배로 나눔)
+CHUNKS_PER_WORKER = 4
+MIN_PARALLEL_CHUNK_SEC = 30.0
+MAX_PARALLEL_CHUNK_SEC = 300.0
+
+
+def parallel_chunk_sec(duration, workers):
+    """워커 수에 맞춘 청크 길이 (초)"""
+    chunk_sec = duration / max(1, workers * CHUNKS_PER_WORKER)
+    return min(MAX_PARALLEL_CHUNK_SEC, max(MIN_PARALLEL_CHUNK_SEC, chunk_sec))
+
+
+def span_source(audio, first, last):
+    """워커에 넘길 샘플 구간 (memmap 이면 (임시 파일 경로, 전체 샘플 수), 아니면 구간 복사본)"""
+    if audio.is_memmap:
+        return audio.mmap_path, len(audio.samples)
+    return np.ascontiguousarray(audio.samples[first:last], dtype=np.float32)
+
+
+def read_span(source, first, last):
+    """span_source 로 만든 구간의 샘플 (워커 프로세스에서 호출)"""
+    if isinstance(source, np.ndarray):
+        return source
+    path, total = source
+    return np.array(np.memmap(path, dtype=np.float32, mode="r", shape=(total,))[first:last])
+
+
+def padded_span(start, end, total, sample_rate, pad_sec=PARALLEL_OVERLAP_SEC):
+    """청크 (시작, 끝) 샘플 구간에 앞뒤 여유를 붙인 전사 구간"""
+    pad = int(pad_sec * sample_rate)
+    return max(0, start - pad), min(total, end + pad)
+
+
+def trim_to_span(segments, start, end, keep_words=True):
+    """[start, end) 초 구간에 중심이 있는 단어만 남긴 세그먼트 목록
+
+    단어 정보가 없는 세그먼트는 세그먼트 중심으로 판단한다. 일부 단어만 남은 세그먼트는
+    남은 단어로 시작/끝/텍스트를 다시 만든다. keep_words=False 면 단어 목록을 뺀다.
+    """
+    trimmed = []
+    for seg in segments:
+        words = seg.get("words")
+        if words:
+            owned = [w for w in words if start <= (w["start"] + w["end"]) / 2 < end]
+            if not owned:
+                continue
+            if len(owned) < len(words):
+                seg = dict(seg, start=owned[0]["start"], end=owned[-1]["end"],
+                           text="".join(w["word"] for w in owned), words=owned)
+                # 잘라낸 세그먼트의 토큰은 텍스트와 맞지 않으므로 제거
+                seg.pop("tokens", None)
+        elif not start <= (seg["start"] + seg["end"]) / 2 < end:
+            continue
+        if not keep_words:
+            seg = {k: v for k, v in seg.items() if k != "words"}
+        trimmed.append(seg)
+    return trimmed
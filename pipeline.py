@@ -0,0 +1,802 @@
+"""
+전사 파이프라인 (Qt 비의존)
+- 오디오 디코딩 → Whisper 전사 / pyannote 화자 분리 → 병합
+- 전사와 화자 분리를 별도 스레드에서 동시에 실행하고 각 스레드에 torch 스레드 예산 배분
+- 스트리밍 모드: 무음 경계 청크 단위로 전사하며 세그먼트를 순서대로 바로 내보냄
+- 결과 캐시: 전사/화자 분리 중 캐시에 없는 단계만 실행
+- 체크포인트: 청크마다 진행 상황을 기록하고 중단된 작업을 이어서 진행
+- 취소: 청크/창 경계에서 (파일 전체를 한 번에 전사하는 경로는 단계 사이에서) 중지
+- 무음 건너뛰기(VAD): 음성 구간만 이어 붙여 처리하고 결과 타임스탬프를 원본 시간축으로 복원
+- 단계별 성능 측정: 캐시 조회, 디코딩, 모델 로딩, 전사, 화자 분리, 병합 (profiler)
+- 창 단위 화자 분리: 긴 오디오를 겹치는 창으로 나눠 최대 메모리를 제한하고 창마다 병합 단계로 전달
+- 화자 식별: 화자 분리가 넘겨 준 화자별 임베딩을 등록된 화자 색인과 비교해 이름 지정 (speaker_index)
+- 파일 분할 병렬 전사: 작업 풀을 주면 무음 경계 청크를 여러 프로세스가 동시에 전사 (parallel_asr)
+- 단계적 전사: 작은 모델로 먼저 전사하고 신뢰도가 낮은 구간만 선택한 모델로 다시 전사 (cascade)
+- 병합 결과는 열 단위 저장소(SegmentStore)로 반환 (반복하면 기존 형식의 세그먼트 딕셔너리)
+- 검색 보관함: 끝까지 완료된 결과를 원본 파일 해시, 모델과 함께 전문 색인에 기록 (transcript_archive)
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from alignment import merge_transcription_and_diarization
+from audio_io import decode_audio
+from checkpoint import ChunkCheckpoint, TranscriptionCancelled, checkpoint_path
+from asr_backends import DEFAULT_BACKEND, get_backend
+from cascade import CascadeStats, cascade_transcribe
+from model_cache import DIARIZATION_MODEL, load_diarization_pipeline
+from parallel_asr import padded_span, parallel_chunk_sec, span_source
+from profiling import Profiler, profile_span
+from result_cache import compact_asr_segments, hash_audio_file
+from segment_store import SEGMENT_KEYS, SegmentStore
+from speaker_index import SpeakerNamer, speakers_from_turns
+from vad import chunk_boundaries, pack_speech, speech_regions
+from windowed_diarization import DIARIZATION_WINDOW_SEC, iter_windowed_turns
+
+# 스트리밍 모드 청크 길이 (초)
+STREAM_CHUNK_SEC = 30.0
+# 스트리밍 중 화자 분리를 기다리며 모아 두는 세그먼트의 최대 길이 (화자 분리 창 길이의 배수)
+MAX_PENDING_WINDOWS = 2
+
+
+def split_thread_budget(total_threads=None, use_diarization=True):
+    """전체 CPU 스레드를 (전사, 화자 분리) 스레드 수로 나눔"""
+    total = total_threads or os.cpu_count() or 1
+    if not use_diarization:
+        return total, 0
+    asr_threads = max(1, (total + 1) // 2)
+    diar_threads = max(1, total - asr_threads)
+    return asr_threads, diar_threads
+
+
+def set_thread_budget(num_threads):
+    """현재 스레드의 torch 연산(intra-op) 스레드 수 설정 (되돌리지 않음)
+
+    OpenMP 로 빌드된 torch(기본 배포판)에서 set_num_threads 는 호출한 스레드가 여는 병렬 영역의
+    스레드 수만 바꾸므로 전사/화자 분리 스레드가 시작할 때 한 번씩 설정하면 각자의 예산을 가진다.
+    끝날 때 이전 값으로 되돌리면 다른 스레드가 아직 작업 중일 때 값이 엇갈리므로 되돌리지 않고,
+    같은 스레드를 다시 쓰는 작업은 시작할 때마다 다시 설정한다.
+    네이티브 스레드 풀로 빌드된 torch 에서는 프로세스 전체에 적용되어 마지막 설정이 남는다.
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+
+def transcribe_audio(audio, model_size, device, num_threads=None, word_timestamps=False, backend=DEFAULT_BACKEND):
+    """선택한 ASR 엔진으로 전사 수행 후 세그먼트 목록 반환"""
+    engine = get_backend(backend)
+    set_thread_budget(num_threads)
+    model = engine.load(model_size, device)
+    result = engine.transcribe(model, audio.samples, word_timestamps=word_timestamps, verbose=True)
+    return result["segments"]
+
+
+def shift_segment(seg, offset):
+    """청크 기준 타임스탬프를 원본 오디오 기준으로 이동"""
+    seg["start"] += offset
+    seg["end"] += offset
+    for word in seg.get("words") or ():
+        word["start"] += offset
+        word["end"] += offset
+    return seg
+
+
+def transcribe_chunk(engine, model, samples, offset, word_timestamps=False, initial_prompt=None):
+    """오디오 청크 하나를 전사하고 원본 기준 타임스탬프의 세그먼트 반환"""
+    result = engine.transcribe(model, samples, word_timestamps=word_timestamps, initial_prompt=initial_prompt)
+    return [shift_segment(seg, offset) for seg in result["segments"]]
+
+
+def iter_diarization(audio, hf_token, device="cpu", num_threads=None, profiler=None, window_sec=None,
+                     cancel_event=None):
+    """화자 분리 턴을 (확정된 구간 끝(초), 턴 목록, 화자별 임베딩) 단위로 생성
+
+    window_sec 를 지정하고 오디오가 그보다 길면 겹치는 창 단위로 처리하여 최대 메모리를
+    창 크기로 제한하고 (windowed_diarization), 아니면 파일 전체를 한 번에 처리한다.
+    화자별 임베딩은 {화자 이름: {"embedding", "duration"}} 이며 지금까지 나온 화자 전체를 담는다.
+    """
+    set_thread_budget(num_threads)
+    with profile_span(profiler, "diarization_model_load"):
+        pipeline = load_diarization_pipeline(hf_token, device)
+    if isinstance(audio, (str, os.PathLike)):
+        with profile_span(profiler, "diarization"):
+            diarization, embeddings = pipeline(audio, return_embeddings=True)
+    elif window_sec and audio.duration > window_sec:
+        yield from iter_windowed_turns(pipeline, audio.samples, audio.sample_rate, window_sec,
+                                       profiler=profiler, cancel_event=cancel_event)
+        return
+    else:
+        # 이미 디코딩된 버퍼를 waveform 딕셔너리로 전달하여 재디코딩 방지
+        with profile_span(profiler, "diarization", audio.duration):
+            diarization, embeddings = pipeline(audio.as_pyannote_input(), return_embeddings=True)
+    segments = []
+    for turn, _, speaker in diarization.itertracks(yield_label=True):
+        segments.append({
+            "start": turn.start,
+            "end": turn.end,
+            "speaker": speaker
+        })
+    yield float("inf"), segments, speakers_from_turns(segments, embeddings, diarization.labels())
+
+
+def diarize_speakers(audio, hf_token, device="cpu", num_threads=None, profiler=None, window_sec=None,
+                     cancel_event=None):
+    """화자 분리 수행 후 (턴 목록, 화자별 임베딩) 반환 (실패하면 빈 결과)
+
+    창 단위로 처리하는 중에 cancel_event 가 설정되면 남은 창은 건너뛴다 (호출자가 결과를 버려야 함).
+    """
+    try:
+        segments, speakers = [], {}
+        for _, turns, window_speakers in iter_diarization(audio, hf_token, device, num_threads, profiler,
+                                                          window_sec, cancel_event):
+            segments.extend(turns)
+            speakers.update(window_speakers)
+        return segments, speakers
+    except Exception as e:
+        print(f"화자 분리 오류: {e}")
+        return [], {}
+
+
+def diarize_audio(audio, hf_token, device="cpu", num_threads=None, profiler=None, window_sec=None,
+                  speaker_index=None):
+    """화자 분리 수행 (audio: 디코딩된 DecodedAudio 또는 파일 경로)
+
+    speaker_index 를 주면 등록된 화자와 일치하는 화자는 등록 이름으로 바꿔 반환한다.
+    """
+    segments, speakers = diarize_speakers(audio, hf_token, device, num_threads, profiler, window_sec)
+    if speaker_index is not None:
+        segments = SpeakerNamer(speaker_index).rename_turns(segments, speakers)
+    return segments
+
+
+class TurnStream:
+    """확정되는 대로 도착하는 화자 분리 턴 (병합 단계는 확정된 구간까지 먼저 사용)
+
+    파일 전체를 한 번에 처리하면 끝날 때 모든 턴이 한꺼번에 도착하고,
+    창 단위로 처리하면 창마다 확정된 구간 끝(until)이 앞으로 나아간다.
+    """
+
+    def __init__(self, turns=None, speakers=None):
+        self.turns = list(turns or ())
+        self.speakers = dict(speakers or {})
+        self.until = float("inf") if turns is not None else 0.0
+        # 끝까지 실패 없이 처리되었는지 (캐시/체크포인트에는 완전한 결과만 기록)
+        self.complete = turns is not None
+        self._cond = threading.Condition()
+        self._callbacks = []
+
+    def add(self, turns, until, speakers=None):
+        with self._cond:
+            self.turns.extend(turns)
+            self.speakers.update(speakers or {})
+            self.until = max(self.until, until)
+            self._cond.notify_all()
+
+    def finish(self, complete):
+        with self._cond:
+            self.until = float("inf")
+            self.complete = complete
+            callbacks = list(self._callbacks) if complete else []
+            self._cond.notify_all()
+        for callback in callbacks:
+            callback(list(self.turns), dict(self.speakers))
+
+    def on_complete(self, callback):
+        self._callbacks.append(callback)
+
+    def speakers_snapshot(self):
+        with self._cond:
+            return dict(self.speakers)
+
+    def covers(self, t):
+        with self._cond:
+            return self.until >= t
+
+    def wait(self, start=float("-inf"), end=float("inf")):
+        """end 까지 확정될 때까지 기다렸다가 [start, end] 와 겹치는 턴 반환"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.until >= end)
+            return [turn for turn in self.turns if turn["end"] >= start and turn["start"] <= end]
+
+
+def segments_without_speakers(whisper_segments):
+    """화자 분리 없이 전사만 한 경우의 결과 형식 (SegmentStore)"""
+    extras = {i: {"words": [dict(word, speaker="Speaker_1") for word in seg["words"]]}
+              for i, seg in enumerate(whisper_segments) if seg.get("words")}
+    return SegmentStore.from_columns([seg["start"] for seg in whisper_segments],
+                                     [seg["end"] for seg in whisper_segments],
+                                     ["Speaker_1"] * len(whisper_segments),
+                                     [seg["text"].strip() for seg in whisper_segments], extras)
+
+
+class TranscriptionPipeline:
+    """한 파일에 대한 전사 작업 (GUI 워커와 헤드리스 실행에서 공용)"""
+
+    def __init__(self, model_size, device, hf_token=None, use_diarization=False,
+                 num_threads=None, word_timestamps=False, progress_callback=None,
+                 result_cache=None, cache_callback=None, checkpointing=False, backend=DEFAULT_BACKEND,
+                 vad=False, vad_callback=None, chunk_callback=None, diarization_window_sec=None,
+                 speaker_index=None, asr_pool=None, cascade_model=None, cascade_callback=None, archive=None):
+        self.model_size = model_size
+        self.device = device
+        self.hf_token = hf_token
+        self.use_diarization = bool(use_diarization and hf_token)
+        self.num_threads = num_threads
+        self.word_timestamps = word_timestamps
+        self.progress_callback = progress_callback
+        self.result_cache = result_cache
+        self.cache_callback = cache_callback
+        self.cache_hits = {}
+        self.audio_hash = None
+        self.checkpointing = checkpointing
+        self.backend = backend
+        self.vad = vad
+        self.vad_callback = vad_callback
+        self.vad_stats = None
+        self.chunk_callback = chunk_callback
+        # 이 길이(초)보다 긴 오디오는 창 단위로 화자 분리 (None: 항상 파일 전체)
+        self.diarization_window_sec = diarization_window_sec
+        # 이번 실행에서 쓰는 창 길이 (스트리밍에서는 지정하지 않아도 창 단위로 처리)
+        self.window_sec = diarization_window_sec
+        # 이번 실행의 전사 방식 (결과 캐시 키, result_cache.ResultCache.asr_key)
+        self.asr_mode = "whole"
+        # 등록된 화자 색인 (있으면 화자 분리 결과의 화자를 등록 이름으로 바꾸고 파일별 등장 기록)
+        self.speaker_index = speaker_index
+        self.speaker_namer = None
+        self.speakers = {}
+        # 파일을 청크로 나눠 동시에 전사할 작업 풀 (worker_pool.WorkerPool, 모델을 로드해 둔 프로세스)
+        self.asr_pool = asr_pool
+        # 먼저 전체를 전사할 작은 모델 (None: model_size 로 한 번만 전사)
+        self.cascade_model = cascade_model
+        self.cascade_callback = cascade_callback
+        self.cascade_stats = None
+        # 완료된 결과를 기록할 검색 보관함 (transcript_archive.TranscriptArchive)
+        self.archive = archive
+        self.profiler = None
+        self.cancel_event = threading.Event()
+
+    def _start_profile(self, audio_file):
+        """파일 하나에 대한 측정 시작 (결과는 self.profiler.report())"""
+        self.profiler = Profiler(
+            file=os.path.basename(str(audio_file)), model=self.model_size, backend=self.backend,
+            device=self.device, diarization=self.use_diarization, word_timestamps=bool(self.word_timestamps),
+            vad=bool(self.vad), diarization_window_sec=self.window_sec,
+            num_threads=self.num_threads or torch.get_num_threads(), cascade_model=self.cascade_model,
+        )
+        self.cascade_stats = CascadeStats(self.cascade_model, self.model_size) if self.cascade_model else None
+
+    def _finish_cascade(self):
+        """단계적 전사 통계를 성능 보고서에 넣고 알림 (재전사 비율, 예상 속도 향상)"""
+        if self.cascade_stats is None:
+            return
+        report = self.cascade_stats.report()
+        if self.profiler is not None:
+            self.profiler.meta["cascade"] = report
+        if self.cascade_callback:
+            self.cascade_callback(dict(report))
+
+    def _start_speakers(self):
+        """파일 하나에 대한 화자 식별 상태 초기화"""
+        self.speakers = {}
+        self.speaker_namer = SpeakerNamer(self.speaker_index) if self.speaker_index is not None else None
+
+    def report(self, value, message):
+        if self.progress_callback:
+            self.progress_callback(value, message)
+
+    def _asr_done(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self.report(60, "음성 전사 완료, 화자 분리 대기 중...")
+
+    def progress_at(self, position, total, start=10, end=95):
+        """실제 오디오 처리 위치로 진행률 계산"""
+        return start + int((end - start) * position / max(1, total))
+
+    def _lookup_cache(self, audio_file):
+        """캐시에서 (Whisper 세그먼트, 화자 분리 턴) 조회 (없는 단계는 None)"""
+        self.cache_hits = {}
+        if self.result_cache is None:
+            return None, None
+        self.report(5, "캐시 확인 중...")
+        with profile_span(self.profiler, "cache_lookup"):
+            self.audio_hash = hash_audio_file(audio_file)
+            cache = self.result_cache
+            whisper_segments = cache.get(cache.asr_key(self.audio_hash, self.model_size, self.device,
+                                                       self.word_timestamps, self.backend, self.vad,
+                                                       self.cascade_model, self.asr_mode))
+            self.cache_hits["asr"] = whisper_segments is not None
+            diar_segments = None
+            if self.use_diarization:
+                diar_segments = cache.get(cache.diarization_key(self.audio_hash, DIARIZATION_MODEL,
+                                                                self.device, self.vad,
+                                                                self.window_sec))
+                if diar_segments is not None:
+                    speakers = cache.get(cache.speakers_key(self.audio_hash, DIARIZATION_MODEL, self.device,
+                                                            self.vad, self.window_sec))
+                    if speakers is None and self.speaker_index is not None:
+                        # 화자 임베딩 없이 저장된 결과로는 화자를 식별할 수 없으므로 다시 실행
+                        diar_segments = None
+                    self.speakers = speakers or {}
+                self.cache_hits["diarization"] = diar_segments is not None
+        if self.cache_callback:
+            self.cache_callback(dict(self.cache_hits))
+        return whisper_segments, diar_segments
+
+    def _store_asr(self, whisper_segments):
+        if self.result_cache is None:
+            return
+        cache = self.result_cache
+        with profile_span(self.profiler, "cache_store"):
+            cache.put(cache.asr_key(self.audio_hash, self.model_size, self.device, self.word_timestamps,
+                                    self.backend, self.vad, self.cascade_model, self.asr_mode),
+                      compact_asr_segments(whisper_segments))
+
+    def _store_diarization(self, diar_segments, speakers):
+        # 화자 분리 실패 시 빈 목록이 반환되므로 빈 결과는 저장하지 않음
+        if self.result_cache is None or not diar_segments:
+            return
+        cache = self.result_cache
+        with profile_span(self.profiler, "cache_store"):
+            cache.put(cache.diarization_key(self.audio_hash, DIARIZATION_MODEL, self.device, self.vad,
+                                            self.window_sec),
+                      diar_segments)
+            cache.put(cache.speakers_key(self.audio_hash, DIARIZATION_MODEL, self.device, self.vad,
+                                         self.window_sec),
+                      speakers)
+
+    def _merge(self, whisper_segments, diar_segments, speakers=None):
+        with profile_span(self.profiler, "merge"):
+            if not self.use_diarization:
+                return segments_without_speakers(whisper_segments)
+            if self.speaker_namer is not None:
+                diar_segments = self.speaker_namer.rename_turns(
+                    diar_segments, self.speakers if speakers is None else speakers)
+            return merge_transcription_and_diarization(whisper_segments, diar_segments)
+
+    def _record_speakers(self, audio_file, speakers):
+        """화자 임베딩과 식별 결과를 색인에 기록 (이름으로 녹음 검색, 나중에 이름 붙이기)"""
+        if self.speaker_namer is None or not speakers:
+            return
+        try:
+            if self.audio_hash is None:
+                self.audio_hash = hash_audio_file(audio_file)
+            with profile_span(self.profiler, "speaker_index"):
+                self.speaker_namer.record(self.audio_hash, audio_file, speakers)
+        except Exception as e:
+            print(f"화자 색인 기록 오류: {e}")
+
+    def _archive_result(self, audio_file, segments):
+        """완료된 결과를 검색 보관함에 기록 (실패해도 전사 결과에는 영향 없음)"""
+        if self.archive is None:
+            return
+        try:
+            if self.audio_hash is None:
+                self.audio_hash = hash_audio_file(audio_file)
+            with profile_span(self.profiler, "archive"):
+                self.archive.ingest(os.path.abspath(audio_file), segments, self.model_size, self.backend, self.audio_hash,
+                                    self.profiler.audio_sec if self.profiler is not None else None)
+        except Exception as e:
+            print(f"보관함 기록 오류: {e}")
+
+    @contextmanager
+    def _decoded(self, audio_file, progress):
+        """오디오 디코딩 후 (버퍼, 시간축 변환기) 반환
+
+        VAD 를 쓰면 음성 구간만 이어 붙인 버퍼와 원본 시간축 변환기(SpeechTimeline)를,
+        쓰지 않으면 원본 버퍼와 None 을 반환한다.
+        """
+        self.report(progress, "오디오 디코딩 중...")
+        with profile_span(self.profiler, "decode") as span:
+            audio = decode_audio(audio_file)
+            span["audio_sec"] = audio.duration
+        if self.profiler is not None:
+            self.profiler.audio_sec = audio.duration
+        with audio:
+            if not self.vad:
+                yield audio, None
+                return
+            self.report(progress, "음성 구간 검출 중...")
+            with profile_span(self.profiler, "vad", audio.duration):
+                packed, timeline = pack_speech(audio, speech_regions(audio.samples, audio.sample_rate))
+            self.vad_stats = timeline.stats()
+            if self.vad_callback:
+                self.vad_callback(dict(self.vad_stats))
+            skipped = timeline.skipped_sec
+            self.report(progress, f"무음 {skipped:.0f}초 건너뜀 "
+                                  f"(전체의 {100 * skipped / max(timeline.total_sec, 1e-9):.0f}%)")
+        with packed:
+            yield packed, timeline
+
+    def _submit_chunks(self, audio, chunks):
+        """청크를 모두 작업 풀에 제출 (앞뒤 여유를 붙여 전사하고 청크 구간의 단어만 받음)"""
+        sr = audio.sample_rate
+        total = len(audio.samples)
+        futures = []
+        for start, end in chunks:
+            first, last = padded_span(start, end, total, sr)
+            # 파일 맨 앞/뒤만 열린 구간 (이어서 진행하면 첫 청크 앞의 여유 구간은 이미 체크포인트에 있음)
+            owned = (start / sr if start > 0 else float("-inf"), end / sr if end < total else float("inf"))
+            futures.append(self.asr_pool.submit_span(span_source(audio, first, last), first, last, sr, owned,
+                                                     self.word_timestamps))
+        return futures
+
+    def _chunk_result(self, future, start, end, sample_rate):
+        """청크 전사 결과를 기다려 받음 (대기 시간은 asr, 워커의 처리 시간은 asr_worker 로 기록)"""
+        audio_sec = (end - start) / sample_rate
+        with profile_span(self.profiler, "asr", audio_sec):
+            segments, wall_sec, cpu_sec, cascade_stats = future.result()
+        if self.profiler is not None:
+            self.profiler.add("asr_worker", wall_sec, cpu_sec, audio_sec)
+        if self.cascade_stats is not None and cascade_stats is not None:
+            self.cascade_stats.merge(cascade_stats)
+        return segments
+
+    def _load_asr_models(self, engine):
+        """(전사 모델, 단계적 전사의 초안 모델 또는 None) 로드"""
+        with profile_span(self.profiler, "asr_model_load"):
+            model = engine.load(self.model_size, self.device)
+            draft_model = engine.load(self.cascade_model, self.device) if self.cascade_model else None
+        return model, draft_model
+
+    def _transcribe_samples(self, engine, model, draft_model, samples, sample_rate, offset, prompt=None):
+        """오디오 구간 하나를 전사 (초안 모델이 있으면 단계적 전사)"""
+        if draft_model is None:
+            return transcribe_chunk(engine, model, samples, offset, self.word_timestamps, prompt)
+        return cascade_transcribe(engine, draft_model, model, samples, sample_rate, offset, self.word_timestamps,
+                                  prompt, self.cascade_stats)
+
+    def _transcribe_parallel(self, audio):
+        sr = audio.sample_rate
+        chunks = chunk_boundaries(audio.samples, sr, parallel_chunk_sec(audio.duration, self.asr_pool.workers))
+        futures = self._submit_chunks(audio, chunks)
+        segments = []
+        try:
+            for (start, end), future in zip(chunks, futures):
+                self._check_cancelled()
+                segments.extend(self._chunk_result(future, start, end, sr))
+        finally:
+            for future in futures:
+                future.cancel()
+        for i, seg in enumerate(segments):
+            seg["id"] = i
+        return segments
+
+    def _transcribe(self, audio, timeline, num_threads):
+        if self.asr_pool is not None:
+            segments = self._transcribe_parallel(audio)
+        else:
+            engine = get_backend(self.backend)
+            set_thread_budget(num_threads)
+            model, draft_model = self._load_asr_models(engine)
+            with profile_span(self.profiler, "asr", audio.duration):
+                if draft_model is not None:
+                    segments = self._transcribe_samples(engine, model, draft_model, audio.samples,
+                                                        audio.sample_rate, 0.0)
+                else:
+                    segments = engine.transcribe(model, audio.samples, word_timestamps=self.word_timestamps,
+                                                 verbose=True)["segments"]
+        self._finish_cascade()
+        if timeline is not None:
+            segments = [timeline.remap_segment(seg) for seg in segments]
+        return segments
+
+    def _diarize(self, audio, timeline, num_threads):
+        """화자 분리 후 턴을 원본 시간축으로 변환"""
+        if len(audio.samples) == 0:
+            return []
+        turns, self.speakers = diarize_speakers(audio, self.hf_token, self.device, num_threads, self.profiler,
+                                                self.window_sec, self.cancel_event)
+        if timeline is not None:
+            turns = timeline.remap_turns(turns)
+        return turns
+
+    def _diarize_into(self, stream, audio, timeline, num_threads):
+        """화자 분리 턴을 확정되는 대로 원본 시간축으로 변환해 stream 에 추가
+
+        창 단위로 처리하는 중에 취소되면 남은 창은 건너뛴다 (불완전한 결과는 기록하지 않음).
+        """
+        complete = False
+        try:
+            if len(audio.samples):
+                for until, turns, speakers in iter_diarization(audio, self.hf_token, self.device, num_threads,
+                                                               self.profiler, self.window_sec,
+                                                               self.cancel_event):
+                    if until >= audio.duration:
+                        until = float("inf")
+                    elif timeline is not None:
+                        until = timeline.to_original(until, is_end=True)
+                    if timeline is not None:
+                        turns = timeline.remap_turns(turns)
+                    stream.add(turns, until, speakers)
+            complete = not self.cancel_event.is_set()
+        except Exception as e:
+            print(f"화자 분리 오류: {e}")
+        finally:
+            stream.finish(complete)
+
+    def cancel(self):
+        """다음 청크/창 경계 또는 단계 사이에서 작업 중지 요청"""
+        self.cancel_event.set()
+
+    def _check_cancelled(self):
+        """취소 요청이 있으면 중지 (청크 단위 경로는 청크마다, 파일 전체 경로는 단계 사이와 창/청크 경계에서 확인)"""
+        if self.cancel_event.is_set():
+            raise TranscriptionCancelled("작업이 취소되었습니다.")
+
+    def _open_checkpoint(self, audio_file, chunk_sec):
+        """체크포인트를 열고 이어서 진행할 수 있으면 기존 상태를 읽음"""
+        if not self.checkpointing:
+            return None
+        if self.audio_hash is None:
+            self.audio_hash = hash_audio_file(audio_file)
+        settings = {
+            "model": self.model_size,
+            "backend": self.backend,
+            "device": self.device,
+            "word_timestamps": bool(self.word_timestamps),
+            "diarization": self.use_diarization,
+            "chunk_sec": chunk_sec,
+            "vad": bool(self.vad),
+            "diarization_window_sec": self.window_sec,
+        }
+        if self.cascade_model:
+            settings["cascade_model"] = self.cascade_model
+        checkpoint = ChunkCheckpoint(checkpoint_path(audio_file, self.audio_hash), self.audio_hash, settings)
+        checkpoint.start(resume=checkpoint.load())
+        return checkpoint
+
+    def iter_segments(self, audio_file, chunk_sec=STREAM_CHUNK_SEC):
+        """스트리밍 모드: 무음 경계 청크 단위로 전사하며 병합된 세그먼트를 순서대로 생성
+
+        결과는 청크 단위로 바로 내보내므로 파이프라인은 파일 전체 결과를 보관하지 않는다
+        (결과 캐시를 쓰는 경우 저장용으로 축약된 Whisper 세그먼트만, 보관함을 쓰는 경우
+        단어 목록을 뺀 열 단위 세그먼트만 모아 둔다).
+        화자 분리는 창 단위로 병렬 실행되며 (창 길이를 지정하지 않으면 DIARIZATION_WINDOW_SEC),
+        화자 분리가 아직 확정하지 않은 구간의 청크는 모아 두었다가 함께 내보낸다. 모아 둔 길이가
+        창 MAX_PENDING_WINDOWS 개를 넘으면 전사를 멈추고 기다린다. 체크포인트를 쓰면 청크마다 진행 상황을
+        기록하고, 다시 실행하면 마지막으로 완료된 청크 다음부터 이어서 진행한다.
+        """
+        if self.archive is None:
+            yield from self._iter_segments(audio_file, chunk_sec)
+            return
+        archived = SegmentStore()
+        for seg in self._iter_segments(audio_file, chunk_sec):
+            archived.append({key: seg[key] for key in SEGMENT_KEYS})
+            yield seg
+        self._archive_result(audio_file, archived)
+
+    def _iter_segments(self, audio_file, chunk_sec):
+        # 파일 전체를 한 번에 화자 분리하면 끝날 때까지 아무것도 내보낼 수 없으므로 항상 창 단위로 처리
+        self.window_sec = self.diarization_window_sec or DIARIZATION_WINDOW_SEC
+        self.asr_mode = "parallel" if self.asr_pool is not None else f"chunked:{chunk_sec:g}"
+        self._start_profile(audio_file)
+        self._start_speakers()
+        cached_asr, cached_diar = self._lookup_cache(audio_file)
+        if cached_asr is not None:
+            # 전사가 캐시에 있으면 스트리밍할 필요 없이 (필요한 경우 화자 분리만 실행하고) 바로 내보냄
+            yield from self._run_stages(audio_file, cached_asr, cached_diar)
+            return
+
+        checkpoint = self._open_checkpoint(audio_file, chunk_sec)
+        resume_offset = checkpoint.completed_offset if checkpoint else 0
+        prompt = checkpoint.prompt if checkpoint else None
+        if cached_diar is None and checkpoint is not None and self.use_diarization:
+            cached_diar = checkpoint.diarization
+            self.speakers = checkpoint.diarization_speakers
+
+        try:
+            with self._decoded(audio_file, 5) as (audio, timeline):
+                yield from self._stream_chunks(audio, timeline, chunk_sec, checkpoint, resume_offset,
+                                               prompt, cached_diar)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        self._record_speakers(audio_file, self.speakers)
+        if checkpoint is not None:
+            checkpoint.remove()
+
+    def _stream_chunks(self, audio, timeline, chunk_sec, checkpoint, resume_offset, prompt, cached_diar):
+        total = len(audio.samples)
+        sr = audio.sample_rate
+        if self.asr_pool is not None:
+            # 작업 풀의 워커 수에 맞춰 청크 길이를 정함
+            chunk_sec = parallel_chunk_sec((total - resume_offset) / sr, self.asr_pool.workers)
+        # 이어서 진행하는 경우 남은 구간만 청크로 나눔
+        chunks = [(start + resume_offset, end + resume_offset)
+                  for start, end in chunk_boundaries(audio.samples[resume_offset:], sr, chunk_sec)]
+        need_diarization = self.use_diarization and cached_diar is None
+        asr_threads, diar_threads = split_thread_budget(self.num_threads, need_diarization)
+        max_pending_sec = MAX_PENDING_WINDOWS * self.window_sec
+
+        executor = None
+        futures = []
+        diar_turns = None
+        if cached_diar is not None and self.use_diarization:
+            diar_turns = TurnStream(cached_diar, self.speakers)
+        elif need_diarization:
+            diar_turns = TurnStream()
+            if checkpoint is not None:
+                diar_turns.on_complete(lambda turns, speakers: self._checkpoint_diarization(checkpoint, turns,
+                                                                                           speakers))
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarization")
+            executor.submit(self._diarize_into, diar_turns, audio, timeline, diar_threads)
+
+        finished = False
+        set_thread_budget(asr_threads)
+        try:
+            pending = []
+            asr_for_cache = [] if self.result_cache is not None else None
+
+            # 체크포인트에 저장된 청크를 먼저 내보냄
+            if checkpoint is not None and resume_offset:
+                self.report(self.progress_at(resume_offset, total),
+                            f"이전 작업 이어서 진행 ({resume_offset / sr:.0f}초부터)")
+                for segments in checkpoint.iter_chunks():
+                    if asr_for_cache is not None:
+                        asr_for_cache.extend(segments)
+                    pending.extend(segments)
+                    if self._diarized(pending, diar_turns) or self._pending_sec(pending) >= max_pending_sec:
+                        yield from self._merge_pending(pending, diar_turns)
+                        pending = []
+
+            if self.asr_pool is not None:
+                # 모든 청크를 한꺼번에 제출하고 결과는 순서대로 받음 (이전 청크 문맥은 쓰지 않음)
+                self.report(self.progress_at(resume_offset, total),
+                            f"청크 {len(chunks)}개를 워커 {self.asr_pool.workers}개로 병렬 전사 중...")
+                futures = self._submit_chunks(audio, chunks)
+            else:
+                self.report(self.progress_at(resume_offset, total), "Whisper 모델 로딩 중...")
+                engine = get_backend(self.backend)
+                model, draft_model = self._load_asr_models(engine)
+
+            for i, (start, end) in enumerate(chunks):
+                if self.cancel_event.is_set():
+                    raise TranscriptionCancelled("작업이 취소되었습니다.")
+                if futures:
+                    segments = self._chunk_result(futures[i], start, end, sr)
+                else:
+                    with profile_span(self.profiler, "asr", (end - start) / sr):
+                        segments = self._transcribe_samples(engine, model, draft_model, audio.samples[start:end],
+                                                            sr, start / sr, prompt)
+                if timeline is not None:
+                    segments = [timeline.remap_segment(seg) for seg in segments]
+                # 이전 청크의 끝부분을 다음 청크의 문맥으로 전달
+                if segments:
+                    prompt = segments[-1]["text"].strip() or prompt
+                compact = compact_asr_segments(segments)
+                if checkpoint is not None:
+                    checkpoint.add_chunk(end, compact, prompt)
+                if asr_for_cache is not None:
+                    asr_for_cache.extend(compact)
+                pending.extend(segments)
+
+                position = f"{end / sr:.0f}/{total / sr:.0f}초"
+                if self._diarized(pending, diar_turns):
+                    self.report(self.progress_at(end, total), f"음성 전사 중 ({position})")
+                elif self._pending_sec(pending) < max_pending_sec:
+                    self.report(self.progress_at(end, total), f"음성 전사 중 ({position}), 화자 분리 대기 중...")
+                    continue
+                else:
+                    # 모아 둔 세그먼트가 너무 길면 전사를 멈추고 화자 분리가 따라오기를 기다림
+                    self.report(self.progress_at(end, total), f"화자 분리 대기 중 ({position})...")
+                yield from self._merge_pending(pending, diar_turns)
+                pending = []
+
+            self._finish_cascade()
+            if pending:
+                self.report(95, "화자 분리 완료 대기 중...")
+                yield from self._merge_pending(pending, diar_turns)
+            finished = True
+        finally:
+            if not finished:
+                # 취소, 오류, 소비자가 생성기를 닫은 경우 모두 화자 분리도 다음 창 경계에서 멈추게 함
+                self.cancel_event.set()
+            # 중단되면 아직 시작하지 않은 청크는 실행하지 않음
+            for future in futures:
+                future.cancel()
+            if executor is not None:
+                # 중단 시에는 진행 중인 화자 분리가 끝나기를 기다리지 않음
+                executor.shutdown(wait=finished)
+
+        if asr_for_cache is not None:
+            self._store_asr(asr_for_cache)
+        if need_diarization:
+            turns = diar_turns.wait()
+            self.speakers = diar_turns.speakers_snapshot()
+            if diar_turns.complete:
+                self._store_diarization(turns, self.speakers)
+
+    def _checkpoint_diarization(self, checkpoint, turns, speakers):
+        if not turns:
+            return
+        try:
+            checkpoint.add_diarization(turns, speakers)
+        except OSError as e:
+            print(f"체크포인트 기록 오류: {e}")
+
+    @staticmethod
+    def _diarized(segments, diar_turns):
+        """대기 중인 세그먼트 구간의 화자 분리 턴이 모두 확정되었는지"""
+        return diar_turns is None or not segments or diar_turns.covers(segments[-1]["end"])
+
+    @staticmethod
+    def _pending_sec(segments):
+        return segments[-1]["end"] - segments[0]["start"] if segments else 0.0
+
+    def _merge_pending(self, segments, diar_turns):
+        """대기 중인 청크 세그먼트를 병합해 내보낸 뒤 청크 경계 알림 (예: 저장 파일 fsync)
+
+        제너레이터이므로 알림은 호출자가 마지막 세그먼트를 처리한 다음에 실행된다.
+        창 단위 화자 분리에서는 세그먼트 구간과 겹치는 턴만 넘긴다.
+        """
+        turns = speakers = None
+        if diar_turns is not None and segments:
+            turns = diar_turns.wait(min(seg["start"] for seg in segments), max(seg["end"] for seg in segments))
+            speakers = diar_turns.speakers_snapshot()
+        elif diar_turns is not None:
+            turns = []
+        yield from self._merge(segments, turns, speakers)
+        if self.chunk_callback:
+            self.chunk_callback()
+
+    def run(self, audio_file):
+        """파일 하나를 전사하고 병합된 결과를 SegmentStore 로 반환"""
+        if self.checkpointing:
+            # 체크포인트는 청크 단위로 기록되므로 청크 경로로 실행
+            return SegmentStore.from_segments(self.iter_segments(audio_file))
+        self.window_sec = self.diarization_window_sec
+        self.asr_mode = "parallel" if self.asr_pool is not None else "whole"
+        self._start_profile(audio_file)
+        self._start_speakers()
+        cached_asr, cached_diar = self._lookup_cache(audio_file)
+        self._check_cancelled()
+        segments = self._run_stages(audio_file, cached_asr, cached_diar)
+        self._archive_result(audio_file, segments)
+        return segments
+
+    def _run_stages(self, audio_file, whisper_segments=None, diar_segments=None):
+        """캐시에 없는 단계만 실행하고 결과 병합"""
+        need_asr = whisper_segments is None
+        need_diarization = self.use_diarization and diar_segments is None
+
+        if need_asr or need_diarization:
+            # 오디오 디코딩 (한 번만 디코딩하여 전사와 화자 분리에서 공유)
+            with self._decoded(audio_file, 10) as (audio, timeline):
+                self._check_cancelled()
+                # 한 단계만 실행할 때도 스레드 수를 지정 (같은 스레드의 이전 작업 예산이 남지 않도록)
+                threads, _ = split_thread_budget(self.num_threads, False)
+                if need_asr and need_diarization:
+                    # 전사와 화자 분리를 동시에 실행하고 둘 다 끝나면 병합
+                    asr_threads, diar_threads = split_thread_budget(self.num_threads, True)
+                    self.report(30, "음성 전사 및 화자 분리 병렬 진행 중...")
+                    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline") as executor:
+                        asr_future = executor.submit(self._transcribe, audio, timeline, asr_threads)
+                        diar_future = executor.submit(self._diarize, audio, timeline, diar_threads)
+                        asr_future.add_done_callback(self._asr_done)
+                        whisper_segments = asr_future.result()
+                        diar_segments = diar_future.result()
+                elif need_asr:
+                    self.report(30, "음성 전사 진행 중...")
+                    whisper_segments = self._transcribe(audio, timeline, threads)
+                else:
+                    self.report(60, "캐시된 전사 사용, 화자 분리 진행 중...")
+                    diar_segments = self._diarize(audio, timeline, threads)
+            # 취소되면 중간에 멈춘 단계의 불완전한 결과는 저장하지 않음
+            self._check_cancelled()
+
+            if need_asr:
+                self._store_asr(whisper_segments)
+            if need_diarization:
+                self._store_diarization(diar_segments, self.speakers)
+        else:
+            self.report(60, "캐시된 결과 사용")
+        if self.use_diarization:
+            self._record_speakers(audio_file, self.speakers)
+
+        # 전사와 화자 분리 결과 병합
+        self.report(80, "결과 병합 중...")
+        return self._merge(whisper_segments, diar_segments)
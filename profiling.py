@@ -0,0 +1,192 @@
+"""
+단계별 성능 측정
+- 단계(span)마다 경과 시간, CPU 시간, 최대 RSS, 오디오 길이, 실시간 배율(RTF) 기록
+- CPU 시간은 프로세스 전체 기준이며, 다른 스레드의 단계와 동시에 실행된 경우 겹친 단계를 함께 기록
+- 같은 이름의 단계는 합산하여 (모델 로딩, 디코딩, 전사, 화자 분리, 병합, 저장) 표로 제공
+- 전사 결과 옆에 JSON 보고서로 저장하여 모델 크기별 회귀 추적
+"""
+
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+from exporters import output_path
+
+PROFILE_VERSION = 1
+PROFILE_FORMAT = "profile.json"
+
+
+def peak_rss_bytes():
+    """프로세스 최대 RSS (알 수 없으면 None)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 는 바이트, 리눅스는 KB 단위
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    except ImportError:
+        return None
+
+
+def process_uptime_sec(fallback_origin=None):
+    """프로세스가 시작된 뒤 지난 시간 (초)
+
+    psutil 이 없으면 fallback_origin (perf_counter 값) 기준, 그것도 없으면 None.
+    """
+    try:
+        import psutil
+        return time.time() - psutil.Process().create_time()
+    except ImportError:
+        return None if fallback_origin is None else time.perf_counter() - fallback_origin
+
+
+def _mb(value):
+    return None if value is None else round(value / (1024 * 1024), 1)
+
+
+def _rtf(wall_sec, audio_sec):
+    return round(wall_sec / audio_sec, 4) if audio_sec else None
+
+
+class Profiler:
+    """한 작업의 단계별 측정 기록 (여러 스레드에서 동시에 사용 가능)
+
+    CPU 시간은 프로세스 전체 기준(time.process_time)이라 torch 연산 스레드의 시간도 포함한다.
+    전사와 화자 분리처럼 다른 스레드에서 동시에 실행된 단계는 서로의 CPU 시간도 포함하므로
+    "concurrent" 에 겹친 단계 이름을 남긴다. 최대 RSS 는 단계가 끝난 시점까지의 프로세스 최대값이다.
+    """
+
+    def __init__(self, **meta):
+        self.meta = meta
+        self.audio_sec = None
+        self.spans = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        # 진행 중인 span: [이름, 스레드, 겹친 단계 이름 집합]
+        self._active = []
+
+    @classmethod
+    def from_report(cls, report):
+        """저장된 보고서에서 이어서 기록 (예: 전사 후 결과 저장 단계 추가)"""
+        profiler = cls(**report.get("meta", {}))
+        profiler.audio_sec = report.get("audio_sec")
+        profiler.spans = [dict(span) for span in report.get("spans", ())]
+        profiler._origin = time.perf_counter() - report.get("wall_sec", 0.0)
+        return profiler
+
+    @contextmanager
+    def span(self, name, audio_sec=None):
+        """with 블록 하나를 name 단계로 기록
+
+        블록 안에서 오디오 길이를 알게 되면 yield 된 딕셔너리의 "audio_sec" 에 넣는다.
+        """
+        extra = {"audio_sec": audio_sec}
+        thread = threading.current_thread().name
+        active = [name, thread, set()]
+        with self._lock:
+            for other in self._active:
+                if other[1] != thread:
+                    other[2].add(name)
+                    active[2].add(other[0])
+            self._active.append(active)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield extra
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            audio_sec = extra["audio_sec"]
+            record = {
+                "name": name,
+                "start_sec": round(wall_start - self._origin, 4),
+                "wall_sec": round(wall, 4),
+                "cpu_sec": round(cpu, 4),
+                "peak_rss_mb": _mb(peak_rss_bytes()),
+                "audio_sec": audio_sec,
+                "rtf": _rtf(wall, audio_sec),
+                "thread": thread,
+            }
+            with self._lock:
+                self._active.remove(active)
+                record["concurrent"] = sorted(active[2])
+                self.spans.append(record)
+
+    def add(self, name, wall_sec, cpu_sec=0.0, audio_sec=None):
+        """다른 작업 사이에 나뉘어 실행된 단계의 합계를 하나의 span 으로 기록 (예: 스트리밍 저장)"""
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "start_sec": round(time.perf_counter() - self._origin - wall_sec, 4),
+                "wall_sec": round(wall_sec, 4),
+                "cpu_sec": round(cpu_sec, 4),
+                "peak_rss_mb": _mb(peak_rss_bytes()),
+                "audio_sec": audio_sec,
+                "rtf": _rtf(wall_sec, audio_sec),
+                "thread": threading.current_thread().name,
+                "concurrent": [],
+            })
+
+    def stages(self):
+        """단계 이름별 합계 (처음 기록된 순서)"""
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = totals.setdefault(span["name"], {
+                "name": span["name"], "count": 0, "wall_sec": 0.0, "cpu_sec": 0.0,
+                "peak_rss_mb": None, "audio_sec": None, "concurrent": set(),
+            })
+            stage["count"] += 1
+            stage["concurrent"].update(span.get("concurrent", ()))
+            stage["wall_sec"] += span["wall_sec"]
+            stage["cpu_sec"] += span["cpu_sec"]
+            if span["peak_rss_mb"] is not None:
+                stage["peak_rss_mb"] = max(stage["peak_rss_mb"] or 0.0, span["peak_rss_mb"])
+            if span["audio_sec"] is not None:
+                stage["audio_sec"] = (stage["audio_sec"] or 0.0) + span["audio_sec"]
+        for stage in totals.values():
+            stage["wall_sec"] = round(stage["wall_sec"], 4)
+            stage["cpu_sec"] = round(stage["cpu_sec"], 4)
+            stage["rtf"] = _rtf(stage["wall_sec"], stage["audio_sec"])
+            stage["concurrent"] = sorted(stage["concurrent"])
+        return list(totals.values())
+
+    def report(self):
+        """JSON 으로 저장할 수 있는 보고서 딕셔너리"""
+        with self._lock:
+            spans = [dict(span) for span in self.spans]
+        wall = max((s["start_sec"] + s["wall_sec"] for s in spans), default=0.0)
+        return {
+            "version": PROFILE_VERSION,
+            "meta": dict(self.meta),
+            "audio_sec": self.audio_sec,
+            "wall_sec": round(wall, 4),
+            "rtf": _rtf(wall, self.audio_sec),
+            "peak_rss_mb": _mb(peak_rss_bytes()),
+            "stages": self.stages(),
+            "spans": spans,
+        }
+
+
+def profile_span(profiler, name, audio_sec=None):
+    """profiler 가 없으면 아무것도 기록하지 않는 span"""
+    if profiler is None:
+        return nullcontext({})
+    return profiler.span(name, audio_sec)
+
+
+def save_profile(report, audio_file, output_dir):
+    """전사 결과 옆에 transcript_<이름>.profile.json 으로 저장"""
+    path = output_path(output_dir, audio_file, PROFILE_FORMAT)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
@@ -0,0 +1,165 @@
+"""
+결과 캐시 (디스크)
+- 오디오 내용 해시 + 모델/장치/옵션을 키로 Whisper 세그먼트와 화자 분리 턴을 따로 저장
+- 화자 분리 옵션만 바꿔 다시 실행하면 캐시된 전사를 재사용하고 빠진 단계만 실행
+- 전체 크기 제한을 넘으면 오래 사용하지 않은 항목부터 삭제
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from pathlib import Path
+
+DEFAULT_CACHE_MB = int(os.environ.get("AUDIO_TRANSCRIBER_CACHE_MB", "1024"))
+
+# 캐시에 저장할 Whisper 세그먼트 필드 (토큰 목록 등 큰 필드는 제외)
+ASR_SEGMENT_FIELDS = ("start", "end", "text", "words", "avg_logprob", "no_speech_prob",
+                      "compression_ratio", "temperature")
+
+
+def default_cache_dir():
+    """플랫폼별 사용자 캐시 폴더"""
+    if os.environ.get("AUDIO_TRANSCRIBER_CACHE_DIR"):
+        return Path(os.environ["AUDIO_TRANSCRIBER_CACHE_DIR"])
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        return Path(os.environ["LOCALAPPDATA"]) / "audio_transcriber" / "cache"
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "audio_transcriber"
+
+
+def hash_audio_file(file_path, block_size=1 << 20):
+    """오디오 파일 내용 해시 (파일 이름/위치와 무관)"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compact_asr_segments(segments):
+    """캐시 저장용으로 Whisper 세그먼트에서 필요한 필드만 남김"""
+    return [{k: seg[k] for k in ASR_SEGMENT_FIELDS if k in seg} for seg in segments]
+
+
+class ResultCache:
+    """내용 주소 기반 전사/화자 분리 결과 캐시"""
+
+    def __init__(self, cache_dir=None, max_mb=DEFAULT_CACHE_MB):
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(kind, audio_hash, **settings):
+        """단계 종류 + 오디오 해시 + 설정으로 항목 키 생성"""
+        payload = json.dumps({"kind": kind, "audio": audio_hash, **settings}, sort_keys=True)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+    def asr_key(self, audio_hash, model_size, device, word_timestamps=False, backend="whisper", vad=False,
+                cascade_model=None, mode="whole"):
+        """mode: 전사 방식 ("whole": 파일 전체, "chunked:<청크 초>": 스트리밍 청크, "parallel": 작업 풀 분할)
+
+        방식마다 청크 경계와 이전 문맥 전달이 달라 결과 문장이 다르므로 따로 저장한다.
+        """
+        settings = {"model": model_size, "device": device, "word_timestamps": bool(word_timestamps),
+                    "backend": backend, "vad": bool(vad), "mode": mode}
+        if cascade_model:
+            # 단계적 전사 결과는 큰 모델만으로 전사한 결과와 다르므로 따로 저장
+            settings["cascade_model"] = cascade_model
+        return self.make_key("asr", audio_hash, **settings)
+
+    @staticmethod
+    def _diarization_settings(model_name, device, vad, window_sec):
+        settings = {"model": model_name, "device": device, "vad": bool(vad)}
+        if window_sec:
+            # 창 단위 결과는 파일 전체 결과와 화자 경계가 다를 수 있으므로 따로 저장
+            settings["window_sec"] = window_sec
+        return settings
+
+    def diarization_key(self, audio_hash, model_name, device, vad=False, window_sec=None):
+        return self.make_key("diarization", audio_hash,
+                             **self._diarization_settings(model_name, device, vad, window_sec))
+
+    def speakers_key(self, audio_hash, model_name, device, vad=False, window_sec=None):
+        """화자 분리 결과의 화자별 임베딩 (diarization_key 와 같은 설정)"""
+        return self.make_key("speakers", audio_hash,
+                             **self._diarization_settings(model_name, device, vad, window_sec))
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def get(self, key):
+        """캐시된 값 반환 (없으면 None), 읽을 때마다 사용 시각 갱신"""
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        # 다른 프로세스가 읽는 중에도 안전하도록 원자적으로 교체
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """(경로, 크기, 마지막 사용 시각) 목록"""
+        result = []
+        if not self.cache_dir.exists():
+            return result
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            result.append((path, stat.st_size, stat.st_mtime))
+        return result
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """크기 제한을 넘으면 오래 사용하지 않은 항목부터 삭제"""
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+            for path, size, _ in sorted(entries, key=lambda e: e[2]):
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self.entries():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    """프로세스 전역 결과 캐시"""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
@@ -0,0 +1,228 @@
+"""
+열 단위 세그먼트 저장소
+- 시작/끝(float64), 화자 번호(int32), 텍스트 번호(int32)를 NumPy 배열로 보관하고
+  화자 이름과 텍스트는 중복 없이 한 번만 저장 (문자열 표)
+- 세그먼트마다 딕셔너리를 두지 않으므로 긴 결과도 메모리를 적게 쓰고, 프로세스 간 전달(pickle)도 빠름
+- 정수 인덱스/반복은 기존 형식의 딕셔너리를 그때그때 만들어 돌려주므로 exporters 등 기존 코드가 그대로 동작
+- 연속 구간 슬라이스는 배열을 복사하지 않는 뷰
+- 타임스탬프 문자열 변환을 배열 연산으로 제공 (SRT/VTT 로 한 번에 저장할 때 사용,
+  세그먼트와 화자 턴의 겹침 계산은 alignment.assign_turns_array)
+"""
+
+import numpy as np
+
+# 세그먼트 딕셔너리의 기본 키 (이 순서로 만들어 JSON 출력이 기존과 같음)
+SEGMENT_KEYS = ("speaker", "start", "end", "text")
+
+
+class SegmentStore:
+    """병합된 세그먼트 목록 (list 처럼 len, 인덱스, 반복, append 지원)"""
+
+    def __init__(self, capacity=0):
+        self._start = np.empty(capacity, dtype=np.float64)
+        self._end = np.empty(capacity, dtype=np.float64)
+        self._speaker = np.empty(capacity, dtype=np.int32)
+        self._text = np.empty(capacity, dtype=np.int32)
+        self._size = 0
+        self._tables = {"speaker": ([], {}), "text": ([], {})}
+        # 단어 목록 등 기본 키 밖의 값 (행 번호 -> 딕셔너리, 있는 행만)
+        self._extra = {}
+        self._offset = 0
+        self._view = False
+
+    # --- 만들기 ---
+
+    @classmethod
+    def from_segments(cls, segments):
+        store = cls(len(segments) if hasattr(segments, "__len__") else 0)
+        store.extend(segments)
+        return store
+
+    @classmethod
+    def from_columns(cls, starts, ends, speakers, texts, extras=None):
+        """열 단위로 한 번에 만들기 (speakers, texts: 문자열 목록, extras: {행 번호: 딕셔너리})"""
+        store = cls()
+        store._start = np.asarray(starts, dtype=np.float64).copy()
+        store._end = np.asarray(ends, dtype=np.float64).copy()
+        store._size = len(store._start)
+        store._speaker = np.fromiter((store._intern("speaker", s) for s in speakers), dtype=np.int32,
+                                     count=store._size)
+        store._text = np.fromiter((store._intern("text", t) for t in texts), dtype=np.int32, count=store._size)
+        store._extra = dict(extras or {})
+        return store
+
+    def _intern(self, table, value):
+        values, ids = self._tables[table]
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def _grow(self, needed):
+        capacity = len(self._start)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 64)
+        for name in ("_start", "_end", "_speaker", "_text"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def append(self, seg):
+        if self._view:
+            raise TypeError("슬라이스 뷰에는 세그먼트를 추가할 수 없습니다.")
+        self._grow(self._size + 1)
+        i = self._size
+        self._start[i] = seg["start"]
+        self._end[i] = seg["end"]
+        self._speaker[i] = self._intern("speaker", seg["speaker"])
+        self._text[i] = self._intern("text", seg["text"])
+        extra = {key: value for key, value in seg.items() if key not in SEGMENT_KEYS}
+        if extra:
+            self._extra[i] = extra
+        self._size += 1
+
+    def extend(self, segments):
+        for seg in segments:
+            self.append(seg)
+
+    # --- 열 ---
+
+    @property
+    def starts(self):
+        return self._start[:self._size]
+
+    @property
+    def ends(self):
+        return self._end[:self._size]
+
+    @property
+    def speaker_ids(self):
+        return self._speaker[:self._size]
+
+    @property
+    def speaker_names(self):
+        """화자 번호 -> 이름 (등장 순서)"""
+        return self._tables["speaker"][0]
+
+    def speaker(self, i):
+        return self.speaker_names[self._speaker[self._index(i)]]
+
+    def text(self, i):
+        return self._tables["text"][0][self._text[self._index(i)]]
+
+    # --- 시퀀스 ---
+
+    def __len__(self):
+        return self._size
+
+    def _index(self, i):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("세그먼트 인덱스가 범위를 벗어났습니다.")
+        return i
+
+    def _row(self, i):
+        seg = {
+            "speaker": self.speaker_names[self._speaker[i]],
+            "start": float(self._start[i]),
+            "end": float(self._end[i]),
+            "text": self._tables["text"][0][self._text[i]],
+        }
+        extra = self._extra.get(self._offset + i)
+        if extra:
+            seg.update(extra)
+        return seg
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._size)
+            if step != 1:
+                return self.take(np.arange(start, stop, step))
+            return self._slice(start, max(start, stop))
+        return self._row(self._index(key))
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self._row(i)
+
+    def _slice(self, start, stop):
+        """배열을 복사하지 않는 [start, stop) 뷰 (문자열 표와 추가 값도 공유)"""
+        view = SegmentStore.__new__(SegmentStore)
+        view._start = self._start[start:stop]
+        view._end = self._end[start:stop]
+        view._speaker = self._speaker[start:stop]
+        view._text = self._text[start:stop]
+        view._size = stop - start
+        view._tables = self._tables
+        view._extra = self._extra
+        view._offset = self._offset + start
+        view._view = True
+        return view
+
+    def take(self, indices):
+        """지정한 행만 모은 새 저장소 (배열 복사)"""
+        indices = np.asarray(indices, dtype=np.intp)
+        store = SegmentStore.__new__(SegmentStore)
+        store._start = self.starts[indices]
+        store._end = self.ends[indices]
+        store._speaker = self.speaker_ids[indices]
+        store._text = self._text[:self._size][indices]
+        store._size = len(indices)
+        store._tables = self._tables
+        store._extra = {new: self._extra[self._offset + old] for new, old in enumerate(indices.tolist())
+                        if self._offset + old in self._extra}
+        store._offset = 0
+        store._view = True
+        return store
+
+    def to_list(self):
+        return list(self)
+
+    def __repr__(self):
+        return f"SegmentStore({self._size}개 세그먼트, 화자 {len(self.speaker_names)}명)"
+
+    def __getstate__(self):
+        # 여유 공간과 다른 뷰가 쓰는 행은 빼고 저장
+        extra = {i - self._offset: value for i, value in self._extra.items()
+                 if 0 <= i - self._offset < self._size}
+        return {"start": self.starts.copy(), "end": self.ends.copy(), "speaker": self.speaker_ids.copy(),
+                "text": self._text[:self._size].copy(), "speakers": self.speaker_names,
+                "texts": self._tables["text"][0], "extra": extra}
+
+    def __setstate__(self, state):
+        self._start = state["start"]
+        self._end = state["end"]
+        self._speaker = state["speaker"]
+        self._text = state["text"]
+        self._size = len(self._start)
+        self._tables = {name: (list(values), {value: i for i, value in enumerate(values)})
+                        for name, values in (("speaker", state["speakers"]), ("text", state["texts"]))}
+        self._extra = state["extra"]
+        self._offset = 0
+        self._view = False
+
+    # --- 배열 연산 ---
+
+    def format_times(self, separator=","):
+        """(시작, 끝) 타임스탬프 문자열 배열 (HH:MM:SS,mmm, VTT 는 separator=".")"""
+        return format_timestamps(self.starts, separator), format_timestamps(self.ends, separator)
+
+
+def format_timestamps(seconds, separator=","):
+    """초 배열을 HH:MM:SS{separator}mmm 문자열 배열로 변환 (exporters 의 SRT/VTT 시간과 같음)"""
+    seconds = np.asarray(seconds, dtype=np.float64)
+    if seconds.size == 0:
+        # np.char.zfill 은 빈 배열에서 오류
+        return np.array([], dtype=str)
+    millis = np.maximum(0, np.rint(seconds * 1000)).astype(np.int64)
+    hours, millis = np.divmod(millis, 3600 * 1000)
+    minutes, millis = np.divmod(millis, 60 * 1000)
+    secs, millis = np.divmod(millis, 1000)
+    text = np.char.add(np.char.zfill(hours.astype(str), 2), ":")
+    text = np.char.add(text, np.char.zfill(minutes.astype(str), 2))
+    text = np.char.add(np.char.add(text, ":"), np.char.zfill(secs.astype(str), 2))
+    return np.char.add(np.char.add(text, separator), np.char.zfill(millis.astype(str), 3))
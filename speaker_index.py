@@ -0,0 +1,304 @@
+"""
+화자 이름 색인 (파일 간 화자 식별)
+- 등록된 화자의 음성 임베딩(중심)을 SQLite 에 저장하고 메모리의 정규화 행렬로 코사인 검색
+- 화자 분리 단계가 파일의 화자(군집)마다 넘겨 준 임베딩을 등록된 화자와 비교해
+  SPEAKER_00 같은 임시 이름 대신 등록된 이름을 붙임
+- 파일별로 등장한 화자(임베딩, 발화 길이)를 기록하여 사람 이름으로 녹음 검색, 한 번만 이름을
+  붙이면(label) 이후 모든 녹음에서 같은 이름 사용
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from result_cache import default_cache_dir
+
+SPEAKER_INDEX_ENV = "AUDIO_TRANSCRIBER_SPEAKER_DB"
+# 녹음 환경이 다른 파일끼리 비교하므로 파일 안 군집(windowed_diarization)보다 엄격한 기준
+SPEAKER_MATCH_THRESHOLD = 0.5
+# 등록 임베딩으로 쓰기에 너무 짧은 발화 (초)
+MIN_ENROLL_SEC = 2.0
+
+
+def default_index_path():
+    if os.environ.get(SPEAKER_INDEX_ENV):
+        return Path(os.environ[SPEAKER_INDEX_ENV])
+    return default_cache_dir() / "speakers.sqlite3"
+
+
+def _normalized(embedding):
+    """정규화한 float32 벡터 (NaN 이거나 0 벡터면 None)"""
+    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vector)
+    if not np.all(np.isfinite(vector)) or norm == 0:
+        return None
+    return vector / norm
+
+
+class SpeakerIndex:
+    """등록된 화자 임베딩 색인 (여러 스레드/프로세스에서 같은 파일 사용 가능)"""
+
+    def __init__(self, path=None, threshold=SPEAKER_MATCH_THRESHOLD):
+        self.path = Path(path or default_index_path())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS speakers (
+                name TEXT PRIMARY KEY,
+                embedding BLOB NOT NULL,   -- 발화 길이로 가중한 정규화 임베딩의 합 (float32)
+                weight REAL NOT NULL,      -- 등록에 쓴 발화 길이 합 (초)
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS appearances (
+                audio_hash TEXT NOT NULL,
+                label TEXT NOT NULL,       -- 파일 안의 화자 이름 (SPEAKER_00 등)
+                file TEXT NOT NULL,
+                name TEXT,                 -- 식별된 등록 화자 (없으면 NULL)
+                similarity REAL,
+                embedding BLOB NOT NULL,
+                duration REAL NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (audio_hash, label)
+            );
+            CREATE INDEX IF NOT EXISTS appearances_name ON appearances (name);
+        """)
+        self.conn.commit()
+        self._version = None
+        self._names = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # 검색
+
+    def _refresh(self):
+        """다른 연결(프로세스)이 바꾼 경우에만 등록 화자 행렬을 다시 읽음"""
+        version = (self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes)
+        if version == self._version:
+            return
+        names, vectors = [], []
+        for name, blob in self.conn.execute("SELECT name, embedding FROM speakers ORDER BY name"):
+            vector = _normalized(np.frombuffer(blob, dtype=np.float32))
+            if vector is not None:
+                names.append(name)
+                vectors.append(vector)
+        self._names = names
+        self._matrix = np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        self._version = version
+
+    def search(self, embedding, k=1):
+        """[(등록 이름, 코사인 유사도)] 를 유사도 높은 순으로 최대 k 개"""
+        vector = _normalized(embedding)
+        with self._lock:
+            self._refresh()
+            if vector is None or not self._names or self._matrix.shape[1] != len(vector):
+                return []
+            similarities = self._matrix @ vector
+        order = np.argsort(-similarities)[:k]
+        return [(self._names[i], float(similarities[i])) for i in order]
+
+    def identify(self, speakers, exclude=()):
+        """파일 화자 {이름: {"embedding", "duration"}} → {이름: (등록 이름, 유사도)}
+
+        한 파일에서 서로 다른 화자는 서로 다른 등록 화자로 연결하며 (유사도 높은 쌍부터),
+        기준 미만이거나 exclude 에 있는 등록 화자와는 연결하지 않는다.
+        """
+        pairs = []
+        for label, speaker in speakers.items():
+            for name, similarity in self.search(speaker["embedding"], k=len(speakers) + len(exclude)):
+                if similarity >= self.threshold:
+                    pairs.append((similarity, label, name))
+        result = {}
+        used = set(exclude)
+        for similarity, label, name in sorted(pairs, reverse=True):
+            if label not in result and name not in used:
+                result[label] = (name, similarity)
+                used.add(name)
+        return result
+
+    # ------------------------------------------------------------------
+    # 등록 / 관리
+
+    def enroll(self, name, embedding, duration=MIN_ENROLL_SEC):
+        """화자 등록 (이미 있으면 발화 길이로 가중해 중심에 더함)"""
+        vector = _normalized(embedding)
+        if vector is None:
+            raise ValueError("사용할 수 없는 화자 임베딩입니다.")
+        weight = max(float(duration), 1e-3)
+        with self._lock:
+            row = self.conn.execute("SELECT embedding, weight FROM speakers WHERE name = ?", (name,)).fetchone()
+            total = vector * weight
+            if row is not None and len(np.frombuffer(row[0], dtype=np.float32)) == len(vector):
+                total = total + np.frombuffer(row[0], dtype=np.float32)
+                weight += row[1]
+            self.conn.execute("INSERT OR REPLACE INTO speakers (name, embedding, weight, updated_at) "
+                              "VALUES (?, ?, ?, ?)",
+                              (name, total.astype(np.float32).tobytes(), weight, time.time()))
+            self.conn.commit()
+
+    def label(self, audio_hash, label, name):
+        """파일의 화자(label)에 이름을 붙여 등록하고 (이름, 기록된 발화 길이) 반환"""
+        with self._lock:
+            row = self.conn.execute("SELECT embedding, duration FROM appearances WHERE audio_hash = ? AND label = ?",
+                                    (audio_hash, label)).fetchone()
+        if row is None:
+            raise KeyError(f"기록된 화자가 없습니다: {label}")
+        self.enroll(name, np.frombuffer(row[0], dtype=np.float32), row[1])
+        with self._lock:
+            self.conn.execute("UPDATE appearances SET name = ?, similarity = NULL WHERE audio_hash = ? AND label = ?",
+                              (name, audio_hash, label))
+            self.conn.commit()
+        return name, row[1]
+
+    def rename(self, old, new):
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM speakers WHERE name = ?", (new,)).fetchone():
+                raise ValueError(f"이미 등록된 이름입니다: {new}")
+            changed = self.conn.execute("UPDATE speakers SET name = ? WHERE name = ?", (new, old)).rowcount
+            self.conn.execute("UPDATE appearances SET name = ? WHERE name = ?", (new, old))
+            self.conn.commit()
+        if not changed:
+            raise KeyError(f"등록되지 않은 화자입니다: {old}")
+
+    def remove(self, name):
+        with self._lock:
+            changed = self.conn.execute("DELETE FROM speakers WHERE name = ?", (name,)).rowcount
+            self.conn.execute("UPDATE appearances SET name = NULL, similarity = NULL WHERE name = ?", (name,))
+            self.conn.commit()
+        if not changed:
+            raise KeyError(f"등록되지 않은 화자입니다: {name}")
+
+    def speakers(self):
+        """[(이름, 등록 발화 길이, 등장한 파일 수)]"""
+        with self._lock:
+            return self.conn.execute("""
+                SELECT s.name, s.weight, COUNT(DISTINCT a.audio_hash)
+                FROM speakers s LEFT JOIN appearances a ON a.name = s.name
+                GROUP BY s.name ORDER BY s.name""").fetchall()
+
+    # ------------------------------------------------------------------
+    # 파일별 등장 기록
+
+    def record(self, audio_hash, audio_file, speakers, names):
+        """파일의 화자 임베딩과 식별 결과 기록 (같은 파일을 다시 처리하면 덮어씀)
+
+        names: {파일 화자 이름: (등록 이름, 유사도)} (identify 결과)
+        """
+        rows = []
+        now = time.time()
+        for label, speaker in speakers.items():
+            vector = _normalized(speaker["embedding"])
+            if vector is None:
+                continue
+            name, similarity = names.get(label, (None, None))
+            rows.append((audio_hash, label, str(audio_file), name, similarity, vector.tobytes(),
+                         float(speaker["duration"]), now))
+        with self._lock:
+            self.conn.execute("DELETE FROM appearances WHERE audio_hash = ?", (audio_hash,))
+            self.conn.executemany("INSERT INTO appearances VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def appearances(self, name=None, audio_hash=None):
+        """[(파일, 파일 화자 이름, 등록 이름, 유사도, 발화 길이)] (최근 순)"""
+        query = "SELECT file, label, name, similarity, duration FROM appearances"
+        conditions, params = [], []
+        if name is not None:
+            conditions.append("name = ?")
+            params.append(name)
+        if audio_hash is not None:
+            conditions.append("audio_hash = ?")
+            params.append(audio_hash)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return self.conn.execute(query + " ORDER BY seen_at DESC, label", params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SpeakerNamer:
+    """한 파일을 처리하는 동안 파일 화자 → 등록 이름 연결을 유지
+
+    창 단위 화자 분리처럼 화자가 차례로 나타나도, 한 번 정한 이름은 파일이 끝날 때까지 바꾸지 않는다.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.names = {}  # 파일 화자 이름 -> (등록 이름, 유사도) 또는 None (식별 실패)
+
+    def resolve(self, speakers):
+        """새로 나타난 화자만 식별 (이미 쓰인 등록 이름은 다른 화자에게 주지 않음)"""
+        new = {label: speaker for label, speaker in speakers.items() if label not in self.names}
+        if not new:
+            return
+        used = {match[0] for match in self.names.values() if match}
+        matches = self.index.identify(new, exclude=used)
+        for label in new:
+            self.names[label] = matches.get(label)
+
+    def rename_turns(self, turns, speakers):
+        """turns 의 speaker 를 등록 이름으로 바꾼 복사본 (식별되지 않은 화자는 그대로)"""
+        self.resolve(speakers)
+        mapping = {label: match[0] for label, match in self.names.items() if match}
+        if not mapping:
+            return turns
+        return [dict(turn, speaker=mapping.get(turn["speaker"], turn["speaker"])) for turn in turns]
+
+    def record(self, audio_hash, audio_file, speakers):
+        self.resolve(speakers)
+        self.index.record(audio_hash, audio_file, speakers,
+                          {label: match for label, match in self.names.items() if match})
+
+
+def speakers_from_turns(turns, embeddings, labels):
+    """pyannote 결과로 {화자 이름: {"embedding", "duration"}} 생성 (임베딩이 없는 화자는 제외)"""
+    speakers = {}
+    for i, label in enumerate(labels):
+        if embeddings is None or i >= len(embeddings):
+            continue
+        if _normalized(embeddings[i]) is None:
+            continue
+        duration = sum(turn["end"] - turn["start"] for turn in turns if turn["speaker"] == label)
+        speakers[label] = {"embedding": np.asarray(embeddings[i], dtype=np.float32).tolist(),
+                           "duration": duration}
+    return speakers
+
+
+def embed_audio(audio_file, hf_token, device="cpu", start=None, end=None):
+    """음성 파일(구간)의 화자 임베딩 (등록용, 화자 분리와 같은 임베딩 모델)"""
+    import torch
+    from audio_io import decode_audio
+    from model_cache import load_speaker_embedding_model
+
+    inference = load_speaker_embedding_model(hf_token, device)
+    with decode_audio(audio_file) as audio:
+        sr = audio.sample_rate
+        first = int((start or 0) * sr)
+        last = len(audio.samples) if end is None else int(end * sr)
+        samples = np.ascontiguousarray(audio.samples[first:last], dtype=np.float32)
+    if len(samples) < MIN_ENROLL_SEC * sr:
+        raise ValueError(f"등록하려면 {MIN_ENROLL_SEC:.0f}초 이상의 음성이 필요합니다.")
+    waveform = torch.from_numpy(samples).unsqueeze(0)
+    embedding = np.asarray(inference({"waveform": waveform, "sample_rate": sr})).reshape(-1)
+    return embedding, len(samples) / sr
+
+
+_speaker_index = None
+_speaker_index_lock = threading.Lock()
+
+
+def get_speaker_index():
+    """프로세스 전역 화자 색인"""
+    global _speaker_index
+    with _speaker_index_lock:
+        if _speaker_index is None:
+            _speaker_index = SpeakerIndex()
+        return _speaker_index
@@ -0,0 +1,100 @@
+"""
+전사-화자 정렬 동등성 검사
+- assign_turns (스윕), assign_turns_array (배열 연산) 가 O(N·M) 기준 구현과 같은 턴을 고르는지 확인
+- 정수 격자 시간으로 경계가 맞닿는 경우(겹침 0)와 겹침이 같은 경우를 자주 만듦
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+import alignment
+from alignment import (UNKNOWN_SPEAKER, assign_turns, assign_turns_array, merge_transcription_and_diarization,
+                       merge_transcription_and_diarization_reference)
+
+
+def _intervals(rng, count, horizon, max_len):
+    out = []
+    for _ in range(count):
+        start = rng.randint(0, horizon)
+        out.append((float(start), float(start + rng.randint(0, max_len))))
+    return out
+
+
+def _case(seed, long_turn=False):
+    rng = random.Random(seed)
+    horizon = rng.choice((20, 60, 200))
+    segments = [{"start": s, "end": e, "text": f" t{i}"}
+                for i, (s, e) in enumerate(_intervals(rng, rng.randint(0, 60), horizon, 6))]
+    turns = _intervals(rng, rng.randint(0, 40), horizon, 8)
+    if long_turn:
+        turns.insert(rng.randint(0, len(turns)), (0.0, float(horizon + 10)))
+    # 턴마다 다른 화자 이름을 붙여 어느 턴을 골랐는지 화자로 구분
+    diar = [{"start": s, "end": e, "speaker": f"SPEAKER_{i:02d}"} for i, (s, e) in enumerate(turns)]
+    return segments, diar
+
+
+def _reference_turns(segments, diar):
+    names = {d["speaker"]: i for i, d in enumerate(diar)}
+    return [names.get(seg["speaker"]) for seg in merge_transcription_and_diarization_reference(segments, diar)]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_assign_turns_matches_reference(seed):
+    segments, diar = _case(seed)
+    expected = _reference_turns(segments, diar)
+    intervals = [(seg["start"], seg["end"]) for seg in segments]
+    assert assign_turns(intervals, diar) == expected
+    array = assign_turns_array([s for s, _ in intervals], [e for _, e in intervals], diar)
+    assert [None if t < 0 else t for t in array.tolist()] == expected
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_long_turn_uses_sweep_fallback(seed, monkeypatch):
+    segments, diar = _case(seed, long_turn=True)
+    segments += [{"start": float(i), "end": float(i + 1), "text": " x"} for i in range(0, 20, 2)]
+    calls = []
+
+    def sweep(intervals, diar_segments):
+        calls.append(len(intervals))
+        return assign_turns(intervals, diar_segments)
+
+    monkeypatch.setattr(alignment, "assign_turns", sweep)
+    monkeypatch.setattr(alignment, "MAX_CANDIDATE_FACTOR", 0)
+    array = alignment.assign_turns_array([seg["start"] for seg in segments], [seg["end"] for seg in segments], diar)
+    assert calls == [len(segments)]
+    assert [None if t < 0 else t for t in array.tolist()] == _reference_turns(segments, diar)
+
+
+def test_very_long_turn_exceeds_candidate_limit(monkeypatch):
+    diar = [{"start": 0.0, "end": 10000.0, "speaker": "SPEAKER_00"}]
+    diar += [{"start": float(i), "end": float(i + 1), "speaker": f"SPEAKER_{i + 1:02d}"} for i in range(200)]
+    segments = [{"start": float(i), "end": float(i + 1), "text": " x"} for i in range(200)]
+    calls = []
+    sweep = alignment.assign_turns
+    monkeypatch.setattr(alignment, "assign_turns", lambda *args: calls.append(1) or sweep(*args))
+    array = alignment.assign_turns_array([seg["start"] for seg in segments], [seg["end"] for seg in segments], diar)
+    assert calls, "긴 턴이 있는데 스윕으로 넘어가지 않음"
+    assert [None if t < 0 else t for t in array.tolist()] == _reference_turns(segments, diar)
+
+
+def test_touching_and_tied_overlaps():
+    diar = [{"start": 0.0, "end": 2.0, "speaker": "A"}, {"start": 2.0, "end": 4.0, "speaker": "B"},
+            {"start": 5.0, "end": 6.0, "speaker": "C"}, {"start": 5.0, "end": 6.0, "speaker": "D"}]
+    segments = [{"start": 4.0, "end": 5.0, "text": " 맞닿음"},      # B, C 와 겹침 0 → 먼저 나온 B
+                {"start": 1.0, "end": 3.0, "text": " 같은 겹침"},   # A, B 가 1초씩 → A
+                {"start": 5.0, "end": 6.0, "text": " 같은 턴"},     # C, D 동일 → C
+                {"start": 7.0, "end": 8.0, "text": " 없음"}]
+    expected = ["B", "A", "C", UNKNOWN_SPEAKER]
+    assert [seg["speaker"] for seg in merge_transcription_and_diarization_reference(segments, diar)] == expected
+    assert [seg["speaker"] for seg in merge_transcription_and_diarization(segments, diar)] == expected
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_merge_matches_reference(seed):
+    segments, diar = _case(seed, long_turn=seed % 2 == 1)
+    merged = merge_transcription_and_diarization(segments, diar)
+    reference = merge_transcription_and_diarization_reference(segments, diar)
+    assert [{key: seg[key] for key in ("speaker", "start", "end", "text")} for seg in merged] == reference
+    assert np.array_equal(merged.starts, [seg["start"] for seg in reference])
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""
+음성파일 전사 프로그램 (헤드리스 CLI)
+- GUI 없이 폴더 단위 일괄 전사
+- 모델은 실행 전체에서 한 번만 로드, 긴 파일부터 처리하여 작업 균형 유지
+- GUI 저장 버튼과 같은 결과 형식 (txt, csv, json, jsonl, srt, vtt, seg) 을 한 번에 스트리밍 저장
+
+사용 예:
+    python transcriber_cli.py batch ./recordings --model small --workers 4 --formats txt,csv,json
+    python transcriber_cli.py live --source mic --model base --formats txt,srt
+    python transcriber_cli.py serve --model small --port 8765
+    python transcriber_cli.py speakers label meeting.mp3 SPEAKER_01 홍길동
+    python transcriber_cli.py archive search "예산 회의" --speaker 홍길동 --since 2026-07-01 --until 2026-09-30
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from contextlib import closing
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import as_completed
+
+# torch/Whisper 를 불러오는 모듈(batched_asr, live, worker_pool)은 쓰는 명령에서만 import
+# (archive, speakers 조회가 ML 스택 로딩을 기다리지 않도록)
+from asr_backends import BACKENDS, DEFAULT_BACKEND
+from audio_io import probe_duration
+from cascade import CASCADE_DRAFT_MODELS, describe_cascade
+from job_server import DEFAULT_HOST, DEFAULT_PORT, serve
+from exporters import EXPORT_FORMATS, StreamingExporter, output_path, save_all
+from profiling import PROFILE_FORMAT, Profiler, profile_span, save_profile
+from result_cache import hash_audio_file
+from speaker_index import embed_audio, get_speaker_index
+from transcript_archive import DEFAULT_SEARCH_LIMIT, get_archive
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".flac", ".m4a", ".ogg", ".aac"}
+
+
+def find_audio_files(directory, recursive=False):
+    """폴더에서 지원하는 음성 파일 목록 수집"""
+    pattern = "**/*" if recursive else "*"
+    return sorted(p for p in Path(directory).glob(pattern)
+                  if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS)
+
+
+def schedule_longest_first(files):
+    """긴 파일부터 처리하도록 정렬 (길이를 모르면 파일 크기로 대체)"""
+    keyed = []
+    for path in files:
+        duration = probe_duration(str(path))
+        keyed.append((duration is not None, duration or 0.0, path.stat().st_size, path))
+    keyed.sort(key=lambda item: item[:3], reverse=True)
+    return [item[3] for item in keyed]
+
+
+def parse_formats(value):
+    formats = [f.strip().lower() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"지원하지 않는 형식: {', '.join(unknown)}")
+    return formats
+
+
+def transcribe_file(audio_file, output_dir, options):
+    """한 파일을 같은 프로세스에서 전사하며 선택한 형식으로 바로 저장 ((결과 파일 경로 목록, 성능 보고서) 반환)
+
+    세그먼트가 청크마다 나오는 즉시 모든 형식에 덧붙이고 청크 경계에서 fsync 하므로
+    긴 녹음도 전체 결과를 메모리에 두지 않는다.
+    """
+    from worker_pool import build_pipeline
+    pipeline = build_pipeline(options)
+    with StreamingExporter(audio_file, output_dir, options["formats"]) as exporter:
+        pipeline.chunk_callback = exporter.sync
+        with closing(pipeline.iter_segments(str(audio_file))) as segments:
+            for seg in segments:
+                exporter.write(seg)
+    pipeline.profiler.add("export", exporter.elapsed_sec)
+    profile = pipeline.profiler.report()
+    if options.get("profile", True):
+        save_profile(profile, audio_file, output_dir)
+    return exporter.paths, profile
+
+
+def save_outputs(segments, audio_file, output_dir, formats, profile=None):
+    """선택한 형식을 한 번에 저장하고, 성능 보고서가 있으면 저장 단계를 추가해 옆에 기록"""
+    profiler = Profiler.from_report(profile) if profile is not None else None
+    with profile_span(profiler, "export"):
+        outputs = save_all(segments, audio_file, output_dir, formats)
+    if profiler is not None:
+        save_profile(profiler.report(), audio_file, output_dir)
+    return outputs
+
+
+def _job_output_dir(audio_file, input_dir, output_dir, recursive):
+    # 하위 폴더까지 처리할 때는 같은 이름의 파일이 겹치지 않도록 폴더 구조 유지
+    if recursive:
+        return output_dir / audio_file.parent.relative_to(input_dir)
+    return output_dir
+
+
+def run_batch(args):
+    import torch
+    from worker_pool import WorkerPool, auto_worker_count, warm_models
+
+    input_dir = Path(args.directory)
+    if not input_dir.is_dir():
+        print(f"폴더를 찾을 수 없습니다: {input_dir}", file=sys.stderr)
+        return 2
+
+    files = find_audio_files(input_dir, args.recursive)
+    if not files:
+        print("전사할 음성 파일이 없습니다.", file=sys.stderr)
+        return 1
+
+    hf_token = None if args.no_diarization else (args.hf_token or os.environ.get("HF_TOKEN"))
+    if not args.no_diarization and not hf_token:
+        print("HF 토큰이 없어 화자 분리 없이 전사합니다.", file=sys.stderr)
+
+    options = {
+        "model": args.model,
+        "backend": args.backend,
+        "device": args.device,
+        "hf_token": hf_token,
+        "formats": args.formats,
+        "word_timestamps": args.word_timestamps,
+        "num_threads": args.threads,
+        "use_cache": not args.no_cache,
+        "checkpoint": args.checkpoint,
+        "vad": args.vad,
+        "diarization_window_sec": args.diarization_window or None,
+        "speaker_index": args.speaker_index,
+        "cascade_model": args.cascade,
+        "archive": not args.no_archive,
+        "profile": not args.no_profile,
+    }
+    # 0 이면 코어 수와 모델 메모리로 자동 결정
+    workers = args.workers or auto_worker_count(args.model, hf_token is not None, args.device)
+    if args.split:
+        # 파일은 하나씩, 각 파일을 청크로 나눠 워커들이 동시에 전사 (화자 분리는 이 프로세스에서)
+        workers = args.workers or auto_worker_count(args.model, False, args.device)
+    output_dir = Path(args.output_dir)
+
+    files = schedule_longest_first(files)
+    if args.skip_existing:
+        files = [f for f in files if not all(
+            output_path(_job_output_dir(f, input_dir, output_dir, args.recursive), f, fmt).exists()
+            for fmt in args.formats)]
+    cascade = f", 초안 모델: {args.cascade}" if args.cascade else ""
+    print(f"{len(files)}개 파일 전사 시작 (모델: {args.model}{cascade}, 엔진: {args.backend}, 워커: {workers})")
+
+    failed = 0
+    started = time.perf_counter()
+    jobs = [(f, _job_output_dir(f, input_dir, output_dir, args.recursive)) for f in files]
+
+    def _report(index, audio_file, elapsed, outputs=None, error=None, profile=None):
+        nonlocal failed
+        if error:
+            failed += 1
+            print(f"[{index}/{len(jobs)}] ✗ {audio_file.name}: {error}", file=sys.stderr)
+            return
+        print(f"[{index}/{len(jobs)}] ✓ {audio_file.name} ({elapsed:.1f}s) → "
+              f"{', '.join(p.name for p in outputs)}")
+        cascade_report = (profile or {}).get("meta", {}).get("cascade")
+        if cascade_report:
+            print(f"    {describe_cascade(cascade_report)}")
+
+    if args.batch_size > 1:
+        # 여러 파일의 창을 묶어 배치 추론 (같은 프로세스, 모든 코어 사용)
+        from batched_asr import BatchedTranscriber
+        if args.word_timestamps or args.checkpoint or args.cascade:
+            print("배치 추론에서는 단어 단위 타임스탬프/체크포인트/단계적 전사를 지원하지 않아 무시합니다.",
+                  file=sys.stderr)
+        transcriber = BatchedTranscriber(args.model, args.device, args.batch_size, hf_token,
+                                         args.threads, args.backend, vad=args.vad,
+                                         diarization_window_sec=args.diarization_window or None,
+                                         speaker_index=get_speaker_index() if args.speaker_index else None,
+                                         archive=get_archive() if options["archive"] else None)
+        job_dirs = dict(jobs)
+        job_started = time.perf_counter()
+        for index, (audio_file, result) in enumerate(transcriber.transcribe_files(list(job_dirs)), 1):
+            elapsed = time.perf_counter() - job_started
+            job_started = time.perf_counter()
+            if isinstance(result, Exception):
+                _report(index, audio_file, elapsed, error=str(result))
+                continue
+            try:
+                outputs = save_outputs(result, audio_file, job_dirs[audio_file], options["formats"])
+                _report(index, audio_file, elapsed, outputs)
+            except Exception as e:
+                _report(index, audio_file, elapsed, error=str(e))
+        print(f"배치 추론: 창 {transcriber.total_windows}개 중 {transcriber.fallback_windows}개 기준 경로로 재전사")
+    elif args.split:
+        asr_options = {key: options[key] for key in ("model", "backend", "device", "num_threads", "cascade_model")}
+        with WorkerPool(asr_options, workers) as pool:
+            for index, (audio_file, job_dir) in enumerate(jobs, 1):
+                job_started = time.perf_counter()
+                try:
+                    outputs, profile = transcribe_file(audio_file, job_dir, dict(options, asr_pool=pool))
+                    _report(index, audio_file, time.perf_counter() - job_started, outputs, profile=profile)
+                except Exception as e:
+                    _report(index, audio_file, time.perf_counter() - job_started, error=str(e))
+    elif workers == 1:
+        # 같은 프로세스에서 순서대로 처리 (모델 캐시로 한 번만 로드)
+        if options["num_threads"]:
+            torch.set_num_threads(options["num_threads"])
+        warm_models(options)
+        for index, (audio_file, job_dir) in enumerate(jobs, 1):
+            job_started = time.perf_counter()
+            try:
+                outputs, profile = transcribe_file(audio_file, job_dir, options)
+                _report(index, audio_file, time.perf_counter() - job_started, outputs, profile=profile)
+            except Exception as e:
+                _report(index, audio_file, time.perf_counter() - job_started, error=str(e))
+    else:
+        # 워커 프로세스마다 코어 묶음을 고정하고 모델을 한 번만 로드
+        with WorkerPool(options, workers) as pool:
+            futures = {pool.submit(i, audio_file): (audio_file, job_dir)
+                       for i, (audio_file, job_dir) in enumerate(jobs)}
+            for index, future in enumerate(as_completed(futures), 1):
+                audio_file, job_dir = futures[future]
+                try:
+                    segments, profile = future.result()
+                    # 제출 시각부터 재면 대기열에서 기다린 시간이 포함되므로 워커가 측정한 작업 시간 사용
+                    save_started = time.perf_counter()
+                    outputs = save_outputs(segments, audio_file, job_dir, options["formats"],
+                                           profile if options["profile"] else None)
+                    elapsed = profile["wall_sec"] + time.perf_counter() - save_started
+                    _report(index, audio_file, elapsed, outputs, profile=profile)
+                except Exception as e:
+                    _report(index, audio_file, 0.0, error=str(e))
+
+    total = time.perf_counter() - started
+    print(f"완료: {len(jobs) - failed}개 성공, {failed}개 실패 ({total:.1f}s, "
+          f"{len(jobs) / total if total else 0.0:.2f} clips/sec)")
+    return 1 if failed else 0
+
+
+def run_throughput(args):
+    """파일별 경로와 배치 경로의 clips/sec 비교 (ASR 만)"""
+    import torch
+    from batched_asr import compare_throughput
+
+    files = find_audio_files(args.directory, args.recursive)
+    if args.limit:
+        files = files[:args.limit]
+    if not files:
+        print("전사할 음성 파일이 없습니다.", file=sys.stderr)
+        return 1
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    result = compare_throughput(files, args.model, args.device, args.batch_size, args.backend)
+    print(f"파일 {result['clips']}개, 배치 크기 {args.batch_size}")
+    print(f"  파일별 경로: {result['per_file_clips_per_sec']:.2f} clips/sec")
+    print(f"  배치 경로:   {result['batched_clips_per_sec']:.2f} clips/sec "
+          f"(재전사 창 {result['fallback_windows']}/{result['total_windows']})")
+    print(f"  속도 향상:   {result['speedup']:.2f}x")
+    return 0
+
+
+def _latency_line(name, stats):
+    if not stats["count"]:
+        return f"  {name}: 없음"
+    return (f"  {name}: {stats['count']}회, 평균 {stats['mean']:.2f}s, p50 {stats['p50']:.2f}s, "
+            f"p95 {stats['p95']:.2f}s, 최대 {stats['max']:.2f}s")
+
+
+def run_live(args):
+    """마이크/스트림 실시간 전사 (Ctrl+C 로 종료)"""
+    import torch
+    from live import LiveTranscriber, open_source
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    hf_token = args.hf_token or os.environ.get("HF_TOKEN")
+    source = open_source(args.source, args.pcm_format, realtime=not args.fast)
+    # 출력 파일 이름은 시작 시각 (transcript_live_<날짜_시각>.<형식>)
+    name = f"live_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    exporter = StreamingExporter(name, args.output_dir, args.formats) if args.formats else None
+
+    def _partial(event):
+        if not args.quiet:
+            print(f"\r\033[K… {event['text'][-100:]}", end="", flush=True)
+
+    def _final(event):
+        print(f"\r\033[K[{event['speaker']}] {event['text']}  ({event['latency_sec']:.2f}s)", flush=True)
+        if exporter:
+            exporter.write({"speaker": event["speaker"], "start": event["start"],
+                            "end": event["end"], "text": event["text"]})
+            exporter.sync()
+
+    live = LiveTranscriber(args.model, args.device, args.backend, hf_token=hf_token,
+                           step_sec=args.step, max_speakers=args.max_speakers,
+                           on_partial=_partial, on_final=_final)
+    try:
+        live.run(source)
+    except KeyboardInterrupt:
+        live.stop()
+    finally:
+        if exporter:
+            exporter.close()
+    print("\n지연 시간 (캡처 → 결과):")
+    print(_latency_line("임시 결과", live.latency["partial"].summary()))
+    print(_latency_line("확정 결과", live.latency["final"].summary()))
+    if exporter:
+        for path in exporter.paths:
+            print(f"저장: {path}")
+    return 0
+
+
+def run_serve(args):
+    """작업 서버 실행 (Ctrl+C 로 종료)"""
+    hf_token = None if args.no_diarization else (args.hf_token or os.environ.get("HF_TOKEN"))
+    options = {
+        "model": args.model,
+        "backend": args.backend,
+        "device": args.device,
+        "hf_token": hf_token,
+        "num_threads": args.threads,
+        "checkpoint": True,
+        "cascade_model": args.cascade,
+        "archive": not args.no_archive,
+    }
+    serve(args.data_dir, options, args.workers or None, args.host, args.port)
+    return 0
+
+
+def run_speakers(args):
+    """등록된 화자 관리 (목록, 등록, 이름 붙이기, 검색)"""
+    index = get_speaker_index()
+    try:
+        if args.action == "list":
+            rows = index.speakers()
+            if not rows:
+                print("등록된 화자가 없습니다.")
+            for name, weight, files in rows:
+                print(f"{name}\t등록 음성 {weight:.0f}초\t파일 {files}개")
+        elif args.action == "enroll":
+            hf_token = args.hf_token or os.environ.get("HF_TOKEN")
+            if not hf_token:
+                print("화자 임베딩 모델을 쓰려면 HF 토큰이 필요합니다.", file=sys.stderr)
+                return 2
+            embedding, duration = embed_audio(args.audio, hf_token, args.device, args.start, args.end)
+            index.enroll(args.name, embedding, duration)
+            print(f"등록: {args.name} ({duration:.0f}초)")
+        elif args.action == "label":
+            name, duration = index.label(hash_audio_file(args.audio), args.speaker, args.name)
+            print(f"등록: {args.speaker} → {name} ({duration:.0f}초)")
+        elif args.action == "show":
+            rows = index.appearances(audio_hash=hash_audio_file(args.audio))
+            if not rows:
+                print("화자 색인을 켜고 전사한 기록이 없습니다.")
+            for _, label, name, similarity, duration in rows:
+                match = f"{name} (유사도 {similarity:.2f})" if similarity is not None else (name or "미등록")
+                print(f"{label}\t{duration:.0f}초\t{match}")
+        elif args.action == "find":
+            rows = index.appearances(name=args.name)
+            if not rows:
+                print(f"{args.name} 이(가) 나온 녹음이 없습니다.")
+            for file, label, _, _, duration in rows:
+                print(f"{file}\t{label}\t{duration:.0f}초")
+        elif args.action == "rename":
+            index.rename(args.old, args.new)
+        elif args.action == "remove":
+            index.remove(args.name)
+    except (KeyError, ValueError) as e:
+        print(e.args[0] if e.args else e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"날짜 형식이 올바르지 않습니다 (YYYY-MM-DD): {value}")
+
+
+def _load_result(path):
+    """저장된 json / jsonl 결과 파일의 세그먼트 목록"""
+    with open(path, encoding="utf-8") as f:
+        if Path(path).suffix.lower() == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def run_archive(args):
+    """검색 보관함 조회와 관리 (검색, 목록, 기존 결과 추가, 삭제)"""
+    archive = get_archive()
+    try:
+        if args.action == "search":
+            started = time.perf_counter()
+            hits = archive.search(
+                " ".join(args.query), args.speaker,
+                args.since.timestamp() if args.since else None,
+                # --until 날짜까지 포함
+                (args.until + timedelta(days=1)).timestamp() if args.until else None,
+                args.start, args.end, hash_audio_file(args.audio) if args.audio else None,
+                args.limit, args.fts)
+            elapsed = time.perf_counter() - started
+            if args.json:
+                print(json.dumps(hits, ensure_ascii=False, indent=2))
+            else:
+                for hit in hits:
+                    date = datetime.fromtimestamp(hit["recorded_at"]).strftime("%Y-%m-%d")
+                    print(f"{date}  {hit['file']}  [{timedelta(seconds=int(hit['start']))}] "
+                          f"{hit['speaker']}: {hit['text']}")
+            more = f", 최대 {args.limit}건까지 표시" if len(hits) >= args.limit else ""
+            print(f"{len(hits)}건 ({elapsed * 1000:.1f}ms{more})", file=sys.stderr)
+        elif args.action == "list":
+            rows = archive.recordings(args.limit)
+            if not rows:
+                print("보관된 녹음이 없습니다.")
+            for _, file, model, segments, duration, recorded_at in rows:
+                date = datetime.fromtimestamp(recorded_at).strftime("%Y-%m-%d")
+                length = f"{duration / 60:.0f}분" if duration is not None else "-"
+                print(f"{date}\t{file}\t{model}\t{length}\t세그먼트 {segments}개")
+        elif args.action == "add":
+            segments = _load_result(args.result)
+            model = args.model
+            if model is None:
+                # 결과 옆의 성능 보고서에 전사 모델이 기록되어 있음
+                profile = output_path(Path(args.result).parent, args.audio, PROFILE_FORMAT)
+                if profile.exists():
+                    with open(profile, encoding="utf-8") as f:
+                        model = json.load(f).get("meta", {}).get("model")
+            archive.ingest(os.path.abspath(args.audio), segments, model or "unknown")
+            print(f"추가: {args.audio} ({len(segments)}개 세그먼트, 모델 {model or 'unknown'})")
+        elif args.action == "remove":
+            archive.remove(hash_audio_file(args.audio))
+    except (KeyError, ValueError) as e:
+        print(e.args[0] if e.args else e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="audio_transcriber", description="음성파일 전사 프로그램 (헤드리스)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="폴더 안의 음성 파일 일괄 전사")
+    batch.add_argument("directory", help="음성 파일 폴더")
+    batch.add_argument("--model", default="medium", choices=["tiny", "base", "small", "medium", "large"])
+    batch.add_argument("--backend", default=DEFAULT_BACKEND, choices=sorted(BACKENDS),
+                       help="ASR 엔진 (whisper: 기준, whisper-int8/faster-whisper: CPU 최적화)")
+    batch.add_argument("--device", default="cpu", help="처리 장치 (cpu, cuda)")
+    batch.add_argument("--workers", type=int, default=0,
+                       help="동시에 처리할 파일 수 (프로세스, 0: 코어 수와 모델 메모리로 자동)")
+    batch.add_argument("--threads", type=int, default=None, help="워커당 torch 스레드 수 (기본: 코어 묶음 크기)")
+    batch.add_argument("--formats", type=parse_formats, default=["txt"], help=f"저장 형식, 쉼표 구분 ({','.join(EXPORT_FORMATS)})")
+    batch.add_argument("--output-dir", default=str(Path.cwd()), help="출력 폴더")
+    batch.add_argument("--hf-token", default=None, help="HuggingFace 토큰 (기본: HF_TOKEN 환경 변수)")
+    batch.add_argument("--no-diarization", action="store_true", help="화자 분리 사용 안 함")
+    batch.add_argument("--word-timestamps", action="store_true", help="단어 단위 화자 지정")
+    batch.add_argument("--vad", action="store_true",
+                       help="무음 구간을 건너뛰고 음성 구간만 전사/화자 분리")
+    batch.add_argument("--diarization-window", type=float, default=0, metavar="SEC",
+                       help="이 길이(초)보다 긴 파일은 겹치는 창 단위로 화자 분리하여 메모리 제한 "
+                            "(0: 항상 파일 전체, 긴 녹음은 600 권장)")
+    batch.add_argument("--speaker-index", action="store_true",
+                       help="등록된 화자와 일치하는 화자를 등록 이름으로 표시하고 파일별 화자를 색인에 기록")
+    batch.add_argument("--no-profile", action="store_true",
+                       help="단계별 성능 보고서(transcript_<이름>.profile.json)를 저장하지 않음")
+    batch.add_argument("--no-archive", action="store_true",
+                       help="완료된 결과를 검색 보관함(archive search)에 기록하지 않음")
+    batch.add_argument("--split", action="store_true",
+                       help="파일을 하나씩 처리하되 무음 경계 청크로 나눠 워커(--workers)들이 동시에 전사 "
+                            "(긴 파일 하나를 빠르게)")
+    batch.add_argument("--cascade", default=None, choices=CASCADE_DRAFT_MODELS, metavar="DRAFT_MODEL",
+                       help="이 작은 모델(tiny, base)로 먼저 전사하고 신뢰도가 낮은 구간만 --model 로 다시 전사")
+    batch.add_argument("--batch-size", type=int, default=1,
+                       help="2 이상이면 여러 파일의 창을 묶어 배치 추론 (짧은 파일이 많을 때 유리)")
+    batch.add_argument("--no-cache", action="store_true", help="결과 캐시 사용 안 함")
+    batch.add_argument("--checkpoint", action="store_true",
+                       help="청크마다 체크포인트를 기록하고 중단된 파일은 이어서 진행")
+    batch.add_argument("--recursive", action="store_true", help="하위 폴더 포함")
+    batch.add_argument("--skip-existing", action="store_true", help="결과 파일이 이미 있으면 건너뜀")
+    batch.set_defaults(handler=run_batch)
+
+    throughput = subparsers.add_parser("throughput", help="파일별 경로와 배치 추론 경로의 처리량 비교")
+    throughput.add_argument("directory", help="음성 파일 폴더")
+    throughput.add_argument("--model", default="base", choices=["tiny", "base", "small", "medium", "large"])
+    throughput.add_argument("--backend", default=DEFAULT_BACKEND, choices=["whisper", "whisper-int8"])
+    throughput.add_argument("--device", default="cpu")
+    throughput.add_argument("--batch-size", type=int, default=8)
+    throughput.add_argument("--threads", type=int, default=None)
+    throughput.add_argument("--limit", type=int, default=0, help="비교할 최대 파일 수")
+    throughput.add_argument("--recursive", action="store_true")
+    throughput.set_defaults(handler=run_throughput)
+
+    live = subparsers.add_parser("live", help="마이크/스트림 실시간 전사")
+    live.add_argument("--source", default="mic",
+                      help="입력 (mic, mic:<장치>, - (표준 입력 PCM), tcp://호스트:포트, *.pcm/FIFO, "
+                           "그 밖의 음성 파일은 실제 속도로 재생)")
+    live.add_argument("--pcm-format", default="s16le", choices=["s16le", "f32le"],
+                      help="원시 PCM 입력 형식 (16kHz 모노)")
+    live.add_argument("--fast", action="store_true", help="음성 파일 입력을 실제 속도가 아닌 최대 속도로 재생")
+    live.add_argument("--model", default="base", choices=["tiny", "base", "small", "medium", "large"])
+    live.add_argument("--backend", default=DEFAULT_BACKEND, choices=sorted(BACKENDS))
+    live.add_argument("--device", default="cpu")
+    live.add_argument("--threads", type=int, default=None)
+    live.add_argument("--step", type=float, default=1.0, help="추론 간격 (초)")
+    live.add_argument("--hf-token", default=None,
+                      help="HuggingFace 토큰 (있으면 pyannote 화자 임베딩 사용, 기본: HF_TOKEN 환경 변수)")
+    live.add_argument("--max-speakers", type=int, default=None)
+    live.add_argument("--formats", type=parse_formats, default=[], help="확정 결과 저장 형식, 쉼표 구분")
+    live.add_argument("--output-dir", default=str(Path.cwd()), help="출력 폴더")
+    live.add_argument("--quiet", action="store_true", help="임시 결과를 출력하지 않음")
+    live.set_defaults(handler=run_live)
+
+    server = subparsers.add_parser("serve", help="HTTP 작업 서버 (대기열, 진행 상황 SSE, 결과 조회)")
+    server.add_argument("--host", default=DEFAULT_HOST, help="수신 주소 (외부 접속을 허용하려면 0.0.0.0)")
+    server.add_argument("--port", type=int, default=DEFAULT_PORT)
+    server.add_argument("--model", default="medium", choices=["tiny", "base", "small", "medium", "large"])
+    server.add_argument("--backend", default=DEFAULT_BACKEND, choices=sorted(BACKENDS))
+    server.add_argument("--device", default="cpu")
+    server.add_argument("--workers", type=int, default=0,
+                        help="동시에 처리할 작업 수 (프로세스, 0: 코어 수와 모델 메모리로 자동)")
+    server.add_argument("--threads", type=int, default=None, help="워커당 torch 스레드 수 (기본: 코어 묶음 크기)")
+    server.add_argument("--hf-token", default=None, help="HuggingFace 토큰 (기본: HF_TOKEN 환경 변수)")
+    server.add_argument("--no-diarization", action="store_true", help="화자 분리 사용 안 함")
+    server.add_argument("--cascade", default=None, choices=CASCADE_DRAFT_MODELS, metavar="DRAFT_MODEL",
+                        help="이 작은 모델로 먼저 전사하고 신뢰도가 낮은 구간만 --model 로 다시 전사")
+    server.add_argument("--no-archive", action="store_true",
+                        help="완료된 작업 결과를 검색 보관함에 기록하지 않음 (작업별 archive 옵션으로 바꿀 수 있음)")
+    server.add_argument("--data-dir", default=str(Path.cwd() / "transcriber_jobs"),
+                        help="작업 대기열(SQLite), 업로드 파일, 결과를 저장할 폴더")
+    server.set_defaults(handler=run_serve)
+
+    speakers = subparsers.add_parser("speakers", help="등록된 화자 관리 (파일 간 화자 식별)")
+    speaker_actions = speakers.add_subparsers(dest="action", required=True)
+    speaker_actions.add_parser("list", help="등록된 화자 목록")
+    enroll = speaker_actions.add_parser("enroll", help="한 사람만 말하는 음성(구간)으로 화자 등록")
+    enroll.add_argument("name")
+    enroll.add_argument("audio")
+    enroll.add_argument("--start", type=float, default=None, help="구간 시작 (초)")
+    enroll.add_argument("--end", type=float, default=None, help="구간 끝 (초)")
+    enroll.add_argument("--device", default="cpu")
+    enroll.add_argument("--hf-token", default=None, help="HuggingFace 토큰 (기본: HF_TOKEN 환경 변수)")
+    label = speaker_actions.add_parser("label", help="전사한 파일의 화자에 이름을 붙여 등록")
+    label.add_argument("audio")
+    label.add_argument("speaker", help="결과의 화자 이름 (예: SPEAKER_01)")
+    label.add_argument("name")
+    show = speaker_actions.add_parser("show", help="파일에 나온 화자와 식별 결과")
+    show.add_argument("audio")
+    find = speaker_actions.add_parser("find", help="등록된 화자가 나온 녹음 검색")
+    find.add_argument("name")
+    rename = speaker_actions.add_parser("rename", help="등록 이름 변경")
+    rename.add_argument("old")
+    rename.add_argument("new")
+    remove = speaker_actions.add_parser("remove", help="등록 삭제")
+    remove.add_argument("name")
+    speakers.set_defaults(handler=run_speakers)
+
+    archive = subparsers.add_parser("archive", help="전사 결과 검색 보관함 (전문 검색, 화자/기간 필터)")
+    archive_actions = archive.add_subparsers(dest="action", required=True)
+    search = archive_actions.add_parser("search", help="보관된 세그먼트 검색 (최근 녹음부터)")
+    search.add_argument("query", nargs="*", help="검색할 구절 (단어마다 앞부분 일치, 비우면 다른 조건만 사용)")
+    search.add_argument("--speaker", default=None, help="이 화자의 세그먼트만")
+    search.add_argument("--since", type=_parse_date, default=None, metavar="YYYY-MM-DD", help="녹음 날짜 시작")
+    search.add_argument("--until", type=_parse_date, default=None, metavar="YYYY-MM-DD",
+                        help="녹음 날짜 끝 (이 날 포함)")
+    search.add_argument("--start", type=float, default=None, metavar="SEC", help="녹음 안의 위치 시작 (초)")
+    search.add_argument("--end", type=float, default=None, metavar="SEC", help="녹음 안의 위치 끝 (초)")
+    search.add_argument("--audio", default=None, help="이 음성 파일의 결과에서만 검색")
+    search.add_argument("--limit", type=int, default=DEFAULT_SEARCH_LIMIT)
+    search.add_argument("--fts", action="store_true", help="검색어를 FTS5 질의 문법 그대로 사용 (AND, OR, NEAR 등)")
+    search.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    archive_list = archive_actions.add_parser("list", help="보관된 녹음 목록 (최근 순)")
+    archive_list.add_argument("--limit", type=int, default=None)
+    add = archive_actions.add_parser("add", help="이미 저장한 json/jsonl 결과를 보관함에 추가")
+    add.add_argument("audio", help="원본 음성 파일 (해시 계산용)")
+    add.add_argument("result", help="transcript_<이름>.json 또는 .jsonl")
+    add.add_argument("--model", default=None, help="전사 모델 (기본: 옆의 성능 보고서에 기록된 모델)")
+    archive_remove = archive_actions.add_parser("remove", help="녹음을 보관함에서 삭제")
+    archive_remove.add_argument("audio")
+    archive.set_defaults(handler=run_archive)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+전사 결과 검색 보관함
+- 완료된 작업의 병합 세그먼트를 화자, 시간, 원본 파일 해시, 모델과 함께 SQLite 에 보관
+  (같은 파일을 다시 전사하면 이전 기록을 바꿔 씀)
+- 텍스트는 FTS5 전문 색인으로 검색: 입력한 단어를 순서대로 잇는 구절 검색이며 단어마다 접두어로
+  찾으므로 조사가 붙은 한국어 단어도 찾음 ("예산 회의" → "예산을 회의에서")
+- 화자, 녹음 날짜, 녹음 안의 위치(초)로 거르기
+- 결과는 최근 보관한 녹음부터 limit 개까지만 읽으므로 세그먼트가 수백만 개여도 밀리초 단위로 응답
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+from result_cache import default_cache_dir, hash_audio_file
+from segment_store import SegmentStore
+
+ARCHIVE_ENV = "AUDIO_TRANSCRIBER_ARCHIVE_DB"
+DEFAULT_SEARCH_LIMIT = 100
+# 날짜/파일 조건으로 고른 녹음의 세그먼트 ID 구간이 이보다 많이 흩어져 있으면 전문 색인 전체를 훑음
+MAX_SEARCH_RANGES = 32
+
+# unicode61 토크나이저와 같은 기준으로 검색어를 단어로 나눔 (문자/숫자 외에는 구분자, 밑줄 포함)
+_QUERY_TOKEN = re.compile(r"[^\W_]+")
+
+
+def default_archive_path():
+    if os.environ.get(ARCHIVE_ENV):
+        return Path(os.environ[ARCHIVE_ENV])
+    return default_cache_dir() / "archive.sqlite3"
+
+
+def phrase_query(text):
+    """검색어를 FTS5 구절 질의로 변환 (단어마다 접두어 검색, 단어가 없으면 None)
+
+    '"예산"* + "회의"*' 는 '예산…' 바로 뒤에 '회의…' 가 오는 세그먼트와 일치한다.
+    """
+    tokens = _QUERY_TOKEN.findall(text)
+    if not tokens:
+        return None
+    return " + ".join(f'"{token}"*' for token in tokens)
+
+
+class TranscriptArchive:
+    """녹음별 전사 결과 보관함 (여러 스레드/프로세스에서 같은 파일 사용 가능)"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or default_archive_path())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS recordings (
+                id INTEGER PRIMARY KEY,
+                audio_hash TEXT NOT NULL UNIQUE,
+                file TEXT NOT NULL,
+                model TEXT NOT NULL,
+                backend TEXT,
+                duration REAL,             -- 오디오 길이 (초, 모르면 NULL)
+                segments INTEGER NOT NULL,
+                recorded_at REAL NOT NULL, -- 원본 파일 수정 시각 (녹음 날짜 검색 기준)
+                archived_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS recordings_recorded ON recordings (recorded_at);
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,    -- 녹음 안에서는 시작 시간 순으로 증가
+                recording INTEGER NOT NULL,
+                start REAL NOT NULL,
+                end REAL NOT NULL,
+                speaker TEXT NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS segments_recording ON segments (recording, start);
+            CREATE TABLE IF NOT EXISTS recording_speakers (
+                recording INTEGER NOT NULL,
+                speaker TEXT NOT NULL,
+                segments INTEGER NOT NULL,
+                duration REAL NOT NULL,    -- 발화 시간 합계 (초)
+                PRIMARY KEY (speaker, recording)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                text, content='segments', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='1 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+                INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+                INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+        """)
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # 기록
+
+    def ingest(self, audio_file, segments, model, backend=None, audio_hash=None, duration=None,
+               recorded_at=None):
+        """완료된 결과(병합 세그먼트) 보관 (같은 파일이 있으면 바꿔 씀, 녹음 ID 반환)"""
+        if audio_hash is None:
+            audio_hash = hash_audio_file(audio_file)
+        if recorded_at is None:
+            try:
+                recorded_at = os.path.getmtime(audio_file)
+            except OSError:
+                recorded_at = time.time()
+        rows = []
+        speakers = {}
+        for seg in segments:
+            text = seg["text"].strip()
+            if not text:
+                continue
+            speaker = seg.get("speaker") or ""
+            start, end = float(seg["start"]), float(seg["end"])
+            rows.append((start, end, speaker, text))
+            count, total = speakers.get(speaker, (0, 0.0))
+            speakers[speaker] = (count + 1, total + max(0.0, end - start))
+        rows.sort(key=lambda row: row[0])
+
+        with self._lock, self.conn:
+            self._delete(audio_hash)
+            recording = self.conn.execute(
+                "INSERT INTO recordings (audio_hash, file, model, backend, duration, segments, recorded_at, "
+                "archived_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (audio_hash, str(audio_file), model, backend, duration, len(rows), recorded_at,
+                 time.time())).lastrowid
+            self.conn.executemany("INSERT INTO segments (recording, start, end, speaker, text) VALUES (?, ?, ?, ?, ?)",
+                                  ((recording, *row) for row in rows))
+            self.conn.executemany("INSERT INTO recording_speakers VALUES (?, ?, ?, ?)",
+                                  ((recording, speaker, count, total)
+                                   for speaker, (count, total) in speakers.items()))
+        return recording
+
+    def _delete(self, audio_hash):
+        row = self.conn.execute("SELECT id FROM recordings WHERE audio_hash = ?", (audio_hash,)).fetchone()
+        if row is None:
+            return False
+        self.conn.execute("DELETE FROM segments WHERE recording = ?", row)
+        self.conn.execute("DELETE FROM recording_speakers WHERE recording = ?", row)
+        self.conn.execute("DELETE FROM recordings WHERE id = ?", row)
+        return True
+
+    def remove(self, audio_hash):
+        with self._lock, self.conn:
+            removed = self._delete(audio_hash)
+        if not removed:
+            raise KeyError("보관함에 없는 녹음입니다.")
+
+    # ------------------------------------------------------------------
+    # 검색
+
+    def search(self, text="", speaker=None, since=None, until=None, start_sec=None, end_sec=None,
+               audio_hash=None, limit=DEFAULT_SEARCH_LIMIT, raw=False):
+        """조건에 맞는 세그먼트 목록 (최근 보관한 녹음부터, 녹음 안에서는 시간 순, 최대 limit 개)
+
+        text: 검색어 (구절 검색, raw=True 이면 FTS5 질의 문법 그대로), 비우면 다른 조건만 사용
+        since/until: 녹음 날짜 범위 (유닉스 시각, until 은 포함하지 않음)
+        start_sec/end_sec: 녹음 안의 위치 (초, 이 구간과 겹치는 세그먼트)
+        결과: [{"recording", "file", "audio_hash", "model", "recorded_at", "speaker", "start", "end", "text"}]
+        """
+        match = (text.strip() or None) if raw else phrase_query(text)
+        recording_conditions, recording_params = [], []
+        for condition, value in (("r.recorded_at >= ?", since), ("r.recorded_at < ?", until),
+                                 ("r.audio_hash = ?", audio_hash)):
+            if value is not None:
+                recording_conditions.append(condition)
+                recording_params.append(value)
+        conditions, params = [], []
+        for condition, value in (("s.speaker = ?", speaker), ("s.end >= ?", start_sec), ("s.start <= ?", end_sec)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        columns = ("SELECT s.recording, r.file, r.audio_hash, r.model, r.recorded_at, s.speaker, s.start, s.end, "
+                   "s.text FROM segments s JOIN recordings r ON r.id = s.recording")
+
+        with self._lock:
+            recordings = None
+            if recording_conditions or (speaker is not None and match is None):
+                query = "SELECT r.id FROM recordings r"
+                if speaker is not None:
+                    query += " JOIN recording_speakers rs ON rs.recording = r.id AND rs.speaker = ?"
+                if recording_conditions:
+                    query += " WHERE " + " AND ".join(recording_conditions)
+                recordings = [row[0] for row in self.conn.execute(
+                    query + " ORDER BY r.id DESC", ([speaker] if speaker is not None else []) + recording_params)]
+
+            if match is not None:
+                ranges = self._segment_ranges(recordings) if recording_conditions else None
+                if ranges is None:
+                    # 전문 색인을 세그먼트 ID(보관 순서) 역순으로 읽으며 조건에 맞는 것만 limit 개 (정렬하지 않음)
+                    query = columns + " JOIN segments_fts f ON f.rowid = s.id WHERE segments_fts MATCH ?"
+                    for condition in recording_conditions + conditions:
+                        query += " AND " + condition
+                    rows = self._match(query + " ORDER BY f.rowid DESC LIMIT ?",
+                                       (match, *recording_params, *params, limit))
+                else:
+                    # 흔한 검색어라도 고른 녹음들의 세그먼트 ID 구간만 색인에서 읽음 (최근 구간부터)
+                    query = (columns + " JOIN segments_fts f ON f.rowid = s.id WHERE segments_fts MATCH ? "
+                             "AND f.rowid BETWEEN ? AND ?")
+                    for condition in conditions:
+                        query += " AND " + condition
+                    query += " ORDER BY f.rowid DESC LIMIT ?"
+                    rows = []
+                    for first, last in ranges:
+                        if len(rows) >= limit:
+                            break
+                        rows.extend(self._match(query, (match, first, last, *params, limit - len(rows))))
+            else:
+                # 조건에 맞는 녹음마다 (recording, start) 색인 구간만 읽고 limit 개가 차면 중단
+                if recordings is None:
+                    recordings = [row[0] for row in self.conn.execute("SELECT id FROM recordings ORDER BY id DESC")]
+                query = columns + " WHERE s.recording = ?"
+                for condition in conditions:
+                    query += " AND " + condition
+                query += " ORDER BY s.start LIMIT ?"
+                rows = []
+                for recording in recordings:
+                    if len(rows) >= limit:
+                        break
+                    rows.extend(self.conn.execute(query, (recording, *params, limit - len(rows))))
+
+        keys = ("recording", "file", "audio_hash", "model", "recorded_at", "speaker", "start", "end", "text")
+        hits = [dict(zip(keys, row)) for row in rows]
+        # 최근 녹음부터, 녹음 안에서는 시간 순으로 표시
+        hits.sort(key=lambda hit: (-hit["recording"], hit["start"]))
+        return hits
+
+    def _segment_ranges(self, recordings):
+        """녹음 ID 목록(역순)을 세그먼트 ID 구간 [(first, last)] 로 (너무 흩어져 있으면 None)
+
+        한 녹음의 세그먼트는 한 트랜잭션에서 시간 순으로 넣으므로 ID가 연속이고,
+        ID가 이어지는 녹음끼리는 구간 하나로 합침
+        """
+        groups = []
+        for recording in recordings:
+            if groups and groups[-1][0] == recording + 1:
+                groups[-1][0] = recording
+            else:
+                if len(groups) == MAX_SEARCH_RANGES:
+                    return None
+                groups.append([recording, recording])
+        ranges = []
+        for oldest, newest in groups:
+            first = self.conn.execute("SELECT id FROM segments WHERE recording >= ? AND recording <= ? "
+                                      "ORDER BY recording, start LIMIT 1", (oldest, newest)).fetchone()
+            if first is None:
+                continue
+            last = self.conn.execute("SELECT id FROM segments WHERE recording >= ? AND recording <= ? "
+                                     "ORDER BY recording DESC, start DESC LIMIT 1", (oldest, newest)).fetchone()
+            ranges.append((first[0], last[0]))
+        return ranges
+
+    def _match(self, query, params):
+        try:
+            return self.conn.execute(query, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"검색어를 해석할 수 없습니다: {e}") from None
+
+    def transcript(self, recording):
+        """보관한 녹음 하나의 전체 결과 (SegmentStore, 시간 순)"""
+        with self._lock:
+            rows = self.conn.execute("SELECT start, end, speaker, text FROM segments WHERE recording = ? "
+                                     "ORDER BY start", (recording,)).fetchall()
+        starts, ends, speakers, texts = zip(*rows) if rows else ((), (), (), ())
+        return SegmentStore.from_columns(starts, ends, speakers, texts)
+
+    def recordings(self, limit=None):
+        """[(녹음 ID, 파일, 모델, 세그먼트 수, 오디오 길이, 녹음 날짜)] (최근 보관 순)"""
+        query = "SELECT id, file, model, segments, duration, recorded_at FROM recordings ORDER BY id DESC"
+        with self._lock:
+            if limit:
+                return self.conn.execute(query + " LIMIT ?", (limit,)).fetchall()
+            return self.conn.execute(query).fetchall()
+
+    def speakers(self):
+        """[(화자, 세그먼트 수, 발화 시간 합계, 녹음 수)] (이름 순)"""
+        with self._lock:
+            return self.conn.execute("""
+                SELECT speaker, SUM(segments), SUM(duration), COUNT(*)
+                FROM recording_speakers GROUP BY speaker ORDER BY speaker""").fetchall()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """프로세스 전역 보관함"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = TranscriptArchive()
+        return _archive
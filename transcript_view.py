@@ -0,0 +1,316 @@
+"""
+전사 결과 표 (모델/뷰)
+- 세그먼트 목록(SegmentStore 또는 딕셔너리 목록)을 복사하지 않고 그대로 참조하는 QAbstractTableModel,
+  화면에 보이는 행만 그림
+- 스트리밍 중 들어오는 세그먼트는 모아 두었다가 일정 간격으로 한 번에 행 추가
+- 화자별 보기 (QSortFilterProxyModel, 필터를 쓸 때만 연결)
+- 행을 클릭하면 원본 오디오의 해당 위치부터 재생 (QtMultimedia 가 있을 때)
+- 지정한 시간의 세그먼트로 이동 (검색 결과 열기)
+"""
+
+import bisect
+
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, QTimer, QUrl, Signal
+from PySide6.QtWidgets import (QAbstractItemView, QComboBox, QHBoxLayout, QHeaderView, QLabel, QPushButton,
+                               QTableView, QVBoxLayout, QWidget)
+
+from segment_store import SegmentStore
+
+try:
+    from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
+except ImportError:
+    QMediaPlayer = None
+
+# 스트리밍 세그먼트를 모아 행으로 추가하는 간격 (밀리초)
+FLUSH_INTERVAL_MS = 100
+
+
+def format_time(seconds):
+    """표에 표시할 시간 (M:SS.s 또는 H:MM:SS.s)"""
+    tenths = max(0, int(round(seconds * 10)))
+    minutes, tenths = divmod(tenths, 600)
+    hours, minutes = divmod(minutes, 60)
+    secs = f"{tenths / 10:04.1f}"
+    return f"{hours}:{minutes:02d}:{secs}" if hours else f"{minutes}:{secs}"
+
+
+class TranscriptModel(QAbstractTableModel):
+    """병합된 세그먼트 목록을 보여 주는 표 모델
+
+    set_segments 로 받은 목록을 복사하지 않고 참조하며, append 는 그 목록에 바로 추가한 뒤
+    뷰에 알리는 것만 모아서 한다 (rowCount 는 뷰에 알린 행 수).
+    """
+    COLUMNS = ("시작", "끝", "화자", "내용")
+    START, END, SPEAKER, TEXT = range(4)
+
+    speakers_changed = Signal(list)
+
+    def __init__(self, parent=None, flush_interval_ms=FLUSH_INTERVAL_MS):
+        super().__init__(parent)
+        self._segments = []
+        self._rows = 0
+        self._speakers = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def segments(self):
+        return self._segments
+
+    def set_segments(self, segments):
+        """표시할 세그먼트 목록 교체 (목록은 복사하지 않음)"""
+        self._flush_timer.stop()
+        self.beginResetModel()
+        self._segments = segments
+        self._rows = len(segments)
+        self._speakers = {}
+        self._add_speakers(0, self._rows)
+        self.endResetModel()
+        self.speakers_changed.emit(list(self._speakers))
+
+    def append(self, seg):
+        """세그먼트 추가 (행은 flush 에서 모아서 추가)"""
+        self._segments.append(seg)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """아직 뷰에 알리지 않은 세그먼트를 한 번에 행으로 추가"""
+        self._flush_timer.stop()
+        count = len(self._segments)
+        if count <= self._rows:
+            return
+        self.beginInsertRows(QModelIndex(), self._rows, count - 1)
+        first, self._rows = self._rows, count
+        new_speakers = self._add_speakers(first, count)
+        self.endInsertRows()
+        if new_speakers:
+            self.speakers_changed.emit(list(self._speakers))
+
+    def _add_speakers(self, first, last):
+        """[first, last) 행의 화자를 등장 순서대로 기록하고 새 화자가 있으면 True"""
+        if isinstance(self._segments, SegmentStore):
+            # 화자 표가 이미 등장 순서대로 정리되어 있음
+            names = self._segments.speaker_names
+            if len(names) == len(self._speakers):
+                return False
+            self._speakers = dict.fromkeys(names)
+            return True
+        added = False
+        for seg in self._segments[first:last]:
+            speaker = seg.get("speaker", "")
+            if speaker not in self._speakers:
+                self._speakers[speaker] = None
+                added = True
+        return added
+
+    def segment(self, row):
+        return self._segments[row]
+
+    def speaker(self, row):
+        if isinstance(self._segments, SegmentStore):
+            return self._segments.speaker(row)
+        return self._segments[row].get("speaker", "")
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        seg = self._segments[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == self.START:
+                return format_time(seg["start"])
+            if column == self.END:
+                return format_time(seg["end"])
+            if column == self.SPEAKER:
+                return seg.get("speaker", "")
+            return seg["text"].strip()
+        if role == Qt.ToolTipRole and column == self.TEXT:
+            return seg["text"].strip()
+        if role == Qt.UserRole:
+            return seg
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+
+class SpeakerFilterProxy(QSortFilterProxyModel):
+    """한 화자의 세그먼트만 보이는 프록시 (원본 목록은 복사하지 않음)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._speaker = None
+
+    def set_speaker(self, speaker):
+        self._speaker = speaker
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._speaker is None or self.sourceModel().speaker(source_row) == self._speaker
+
+
+class TranscriptView(QWidget):
+    """화자 필터, 재생 버튼, 전사 결과 표"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = TranscriptModel(self)
+        self.proxy = SpeakerFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.audio_file = None
+        self.player = None
+        self._follow = True
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("화자:"))
+        self.speaker_combo = QComboBox()
+        self.speaker_combo.addItem("전체", None)
+        self.speaker_combo.currentIndexChanged.connect(self._filter_changed)
+        controls.addWidget(self.speaker_combo)
+        self.play_btn = QPushButton("⏯ 재생/일시정지")
+        self.play_btn.clicked.connect(self.toggle_playback)
+        self.play_btn.setEnabled(False)
+        controls.addWidget(self.play_btn)
+        self.hint_label = QLabel("행을 클릭하면 그 위치부터 재생합니다." if QMediaPlayer is not None
+                                 else "재생하려면 QtMultimedia 가 필요합니다.")
+        controls.addWidget(self.hint_label)
+        controls.addStretch()
+        self.count_label = QLabel("")
+        controls.addWidget(self.count_label)
+        layout.addLayout(controls)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setWordWrap(False)
+        self.table.setTextElideMode(Qt.ElideRight)
+        # 행 높이를 고정해야 보이는 행만 그림 (내용에 맞춘 크기 조정은 모든 행을 읽음)
+        vertical = self.table.verticalHeader()
+        vertical.setVisible(False)
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(self.table.fontMetrics().height() + 6)
+        horizontal = self.table.horizontalHeader()
+        horizontal.setSectionResizeMode(QHeaderView.Interactive)
+        horizontal.setStretchLastSection(True)
+        for column, width in ((TranscriptModel.START, 80), (TranscriptModel.END, 80),
+                              (TranscriptModel.SPEAKER, 120)):
+            self.table.setColumnWidth(column, width)
+        self.table.clicked.connect(self._seek_to)
+        layout.addWidget(self.table)
+
+        self.model.speakers_changed.connect(self._update_speakers)
+        self.model.rowsAboutToBeInserted.connect(self._remember_scroll)
+        self.model.rowsInserted.connect(self._rows_inserted)
+        self.model.modelReset.connect(self._update_count)
+
+    def set_audio_file(self, audio_file):
+        """재생할 원본 오디오 (바뀌면 재생 중지)"""
+        if audio_file != self.audio_file and self.player is not None:
+            self.player.stop()
+            self.player.setSource(QUrl())
+        self.audio_file = audio_file
+        self.play_btn.setEnabled(bool(audio_file) and QMediaPlayer is not None)
+
+    def set_segments(self, segments):
+        self.model.set_segments(segments)
+
+    def append_segment(self, seg):
+        self.model.append(seg)
+
+    def flush(self):
+        self.model.flush()
+
+    def show_time(self, seconds):
+        """seconds 에 시작한 (없으면 그 직전에 시작한) 세그먼트를 선택하고 가운데에 표시 (화자 필터 해제)"""
+        self.flush()
+        self.speaker_combo.setCurrentIndex(0)
+        segments = self.model.segments()
+        if isinstance(segments, SegmentStore):
+            row = int(np.searchsorted(segments.starts, seconds, side="right")) - 1
+        else:
+            row = bisect.bisect_right([seg["start"] for seg in segments], seconds) - 1
+        row = max(row, 0)
+        if row >= self.model.rowCount():
+            return
+        index = self.model.index(row, TranscriptModel.TEXT)
+        self.table.selectRow(row)
+        self.table.scrollTo(index, QAbstractItemView.PositionAtCenter)
+
+    def _filter_changed(self):
+        speaker = self.speaker_combo.currentData()
+        self.proxy.set_speaker(speaker)
+        # 필터가 없으면 프록시를 거치지 않음 (행마다 필터 함수를 부르지 않도록)
+        self.table.setModel(self.model if speaker is None else self.proxy)
+        self._update_count()
+
+    def _update_speakers(self, speakers):
+        current = self.speaker_combo.currentData()
+        self.speaker_combo.blockSignals(True)
+        self.speaker_combo.clear()
+        self.speaker_combo.addItem("전체", None)
+        for speaker in speakers:
+            self.speaker_combo.addItem(speaker, speaker)
+        index = self.speaker_combo.findData(current) if current is not None else 0
+        self.speaker_combo.setCurrentIndex(max(0, index))
+        self.speaker_combo.blockSignals(False)
+        if index < 0:
+            self._filter_changed()
+
+    def _remember_scroll(self, *_):
+        scroll_bar = self.table.verticalScrollBar()
+        self._follow = scroll_bar.value() >= scroll_bar.maximum()
+
+    def _rows_inserted(self, *_):
+        # 맨 아래를 보고 있었으면 새로 들어온 행을 따라감
+        if self._follow:
+            self.table.scrollToBottom()
+        self._update_count()
+
+    def _update_count(self):
+        shown = self.table.model().rowCount()
+        total = self.model.rowCount()
+        self.count_label.setText(f"{total}개 세그먼트" if shown == total else f"{shown} / {total}개 세그먼트")
+
+    def _ensure_player(self):
+        if self.player is None and QMediaPlayer is not None:
+            self.player = QMediaPlayer(self)
+            self.audio_output = QAudioOutput(self)
+            self.player.setAudioOutput(self.audio_output)
+        return self.player
+
+    def _seek_to(self, index):
+        if not self.audio_file or self._ensure_player() is None:
+            return
+        seg = index.data(Qt.UserRole)
+        source = QUrl.fromLocalFile(str(self.audio_file))
+        if self.player.source() != source:
+            self.player.setSource(source)
+        self.player.setPosition(int(seg["start"] * 1000))
+        self.player.play()
+
+    def toggle_playback(self):
+        if self._ensure_player() is None or not self.audio_file:
+            return
+        if self.player.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
+            self.player.pause()
+            return
+        source = QUrl.fromLocalFile(str(self.audio_file))
+        if self.player.source() != source:
+            self.player.setSource(source)
+        self.player.play()
@@ -0,0 +1,198 @@
+"""
+음성 구간 검출 (에너지 기반 VAD)
+- 프레임 단위 에너지(dB) 계산 (긴 오디오도 블록 단위로 처리하여 메모리 일정)
+- 목표 길이 근처의 가장 조용한 지점에서 오디오를 청크로 분할
+- 무음 건너뛰기: 음성 구간만 이어 붙여 전사/화자 분리하고 타임스탬프를 원본 시간축으로 복원
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+from audio_io import allocate_audio
+
+FRAME_SEC = 0.03
+
+# 한 번에 처리할 프레임 수 (에너지 계산 시 임시 메모리 제한)
+_BLOCK_FRAMES = 8192
+
+
+def frame_energy_db(samples, sample_rate, frame_sec=FRAME_SEC):
+    """프레임별 RMS 에너지 (dBFS)"""
+    frame = max(1, int(sample_rate * frame_sec))
+    n_frames = len(samples) // frame
+    energy = np.empty(n_frames, dtype=np.float32)
+    for first in range(0, n_frames, _BLOCK_FRAMES):
+        last = min(n_frames, first + _BLOCK_FRAMES)
+        block = np.asarray(samples[first * frame:last * frame], dtype=np.float32).reshape(-1, frame)
+        power = np.mean(np.square(block), axis=1)
+        energy[first:last] = 10.0 * np.log10(power + 1e-10)
+    return energy
+
+
+def chunk_boundaries(samples, sample_rate, chunk_sec=30.0, search_sec=5.0, frame_sec=FRAME_SEC):
+    """오디오를 약 chunk_sec 길이의 청크 (시작, 끝) 샘플 구간으로 분할
+
+    각 경계는 목표 지점 ±search_sec 안에서 에너지가 가장 낮은 프레임(무음)에 둔다.
+    """
+    total = len(samples)
+    chunk = int(chunk_sec * sample_rate)
+    if total <= chunk + int(search_sec * sample_rate):
+        return [(0, total)] if total else []
+
+    frame = max(1, int(sample_rate * frame_sec))
+    energy = frame_energy_db(samples, sample_rate, frame_sec)
+    search = max(1, int(search_sec / frame_sec))
+
+    boundaries = []
+    start = 0
+    while total - start > chunk + search * frame:
+        target = (start + chunk) // frame
+        lo = max(start // frame + 1, target - search)
+        hi = min(len(energy), target + search + 1)
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * frame
+        boundaries.append((start, cut))
+        start = cut
+    boundaries.append((start, total))
+    return boundaries
+
+
+# 음성 구간 검출 기준
+VAD_MARGIN_DB = 12.0     # 잡음 바닥보다 이만큼 크면 음성 후보
+VAD_HEADROOM_DB = 30.0   # 큰 소리 구간보다 이만큼 작으면 항상 음성 후보 (조용한 화자 보호)
+VAD_FLOOR_DB = -55.0     # 이보다 작은 프레임은 항상 무음
+MIN_SPEECH_SEC = 0.25
+MIN_SILENCE_SEC = 0.8
+SPEECH_PAD_SEC = 0.2
+
+
+def _runs(mask):
+    """불리언 배열에서 True 가 이어지는 (시작, 끝) 프레임 구간 목록"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def speech_regions(samples, sample_rate, threshold_db=None, min_speech_sec=MIN_SPEECH_SEC,
+                   min_silence_sec=MIN_SILENCE_SEC, pad_sec=SPEECH_PAD_SEC, frame_sec=FRAME_SEC):
+    """음성이 있는 (시작, 끝) 샘플 구간 목록
+
+    threshold_db 가 없으면 파일의 잡음 바닥(하위 10% 에너지)과 큰 소리 구간(상위 5%)으로
+    기준을 정한다. min_silence_sec 보다 짧은 무음은 음성에 포함하고, 각 구간 앞뒤에
+    pad_sec 만큼 여유를 둔다.
+    """
+    total = len(samples)
+    energy = frame_energy_db(samples, sample_rate, frame_sec)
+    if len(energy) == 0:
+        return []
+    if threshold_db is None:
+        noise_db, loud_db = np.percentile(energy, [10, 95])
+        threshold_db = max(VAD_FLOOR_DB, min(noise_db + VAD_MARGIN_DB, loud_db - VAD_HEADROOM_DB))
+
+    frame = max(1, int(sample_rate * frame_sec))
+    active = energy > threshold_db
+    # 짧은 무음(단어 사이 쉼)은 음성으로 메움
+    min_silence = int(min_silence_sec / frame_sec)
+    for start, end in _runs(~active):
+        if end - start < min_silence and start > 0 and end < len(active):
+            active[start:end] = True
+    # 너무 짧은 소리(클릭, 잡음)는 버림
+    min_speech = max(1, int(min_speech_sec / frame_sec))
+    pad = int(pad_sec * sample_rate)
+
+    regions = []
+    for start, end in _runs(active):
+        if end - start < min_speech:
+            continue
+        start = max(0, start * frame - pad)
+        end = total if end == len(active) else min(total, end * frame + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+class SpeechTimeline:
+    """음성 구간만 이어 붙인 압축 시간축과 원본 시간축 사이의 변환"""
+
+    def __init__(self, regions, sample_rate, total_samples):
+        self.regions = list(regions)
+        self.sample_rate = sample_rate
+        self.total_samples = total_samples
+        # 각 구간의 압축 시간축 시작 위치(초)와 원본 시작 위치(초), 길이(초)
+        self.packed_starts = []
+        self.original_starts = []
+        self.lengths = []
+        position = 0
+        for start, end in self.regions:
+            self.packed_starts.append(position / sample_rate)
+            self.original_starts.append(start / sample_rate)
+            self.lengths.append((end - start) / sample_rate)
+            position += end - start
+        self.speech_samples = position
+
+    @property
+    def total_sec(self):
+        return self.total_samples / self.sample_rate
+
+    @property
+    def speech_sec(self):
+        return self.speech_samples / self.sample_rate
+
+    @property
+    def skipped_sec(self):
+        return self.total_sec - self.speech_sec
+
+    def stats(self):
+        return {"total_sec": self.total_sec, "speech_sec": self.speech_sec, "skipped_sec": self.skipped_sec}
+
+    def _region_at(self, t, is_end=False):
+        index = bisect_right(self.packed_starts, t) - 1
+        if is_end and index > 0 and t <= self.packed_starts[index]:
+            # 구간 경계에 정확히 끝나는 값은 다음 구간 시작이 아니라 이전 구간 끝으로 봄
+            index -= 1
+        return max(0, index)
+
+    def to_original(self, t, is_end=False):
+        """압축 시간축의 시각(초)을 원본 시각(초)으로 변환"""
+        if not self.regions:
+            return t
+        index = self._region_at(t, is_end)
+        offset = min(max(0.0, t - self.packed_starts[index]), self.lengths[index])
+        return self.original_starts[index] + offset
+
+    def remap_segment(self, seg):
+        """Whisper 세그먼트(및 단어)의 타임스탬프를 원본 시간축으로 변환"""
+        seg["start"] = self.to_original(seg["start"])
+        seg["end"] = max(seg["start"], self.to_original(seg["end"], is_end=True))
+        for word in seg.get("words") or ():
+            word["start"] = self.to_original(word["start"])
+            word["end"] = max(word["start"], self.to_original(word["end"], is_end=True))
+        return seg
+
+    def remap_turns(self, turns):
+        """화자 분리 턴을 원본 시간축으로 변환 (건너뛴 무음에 걸친 턴은 구간별로 나눔)"""
+        remapped = []
+        for turn in turns:
+            first = self._region_at(turn["start"])
+            last = self._region_at(turn["end"], is_end=True)
+            for index in range(first, last + 1):
+                start = max(turn["start"], self.packed_starts[index])
+                end = min(turn["end"], self.packed_starts[index] + self.lengths[index])
+                if end <= start:
+                    continue
+                offset = self.original_starts[index] - self.packed_starts[index]
+                remapped.append(dict(turn, start=start + offset, end=end + offset))
+        return remapped
+
+
+def pack_speech(audio, regions):
+    """음성 구간만 이어 붙인 새 DecodedAudio 와 SpeechTimeline 반환"""
+    timeline = SpeechTimeline(regions, audio.sample_rate, len(audio.samples))
+    packed = allocate_audio(timeline.speech_samples, audio.sample_rate, audio.path, audio.is_memmap)
+    position = 0
+    for start, end in regions:
+        packed.samples[position:position + end - start] = audio.samples[start:end]
+        position += end - start
+    return packed, timeline
@@ -0,0 +1,171 @@
+"""
+창 단위 화자 분리 (긴 오디오)
+- 파일 전체 대신 겹치는 창(기본 10분, 30초 겹침)마다 pyannote 파이프라인 실행
+  → 최대 메모리는 파일 길이가 아닌 창 크기에 비례
+- 창마다 화자별 임베딩(중심)을 받아 전체 화자 중심과 비교해 같은 화자 이름 유지
+- 각 창은 겹침의 가운데까지만 결과를 확정하므로 창 경계의 턴이 중복되지 않음
+- 창이 끝날 때마다 확정된 턴을 바로 내보내 병합 단계가 먼저 사용
+- 전체 화자별 중심은 파일 간 화자 식별(speaker_index)에도 사용
+"""
+
+import numpy as np
+
+from profiling import profile_span
+
+DIARIZATION_WINDOW_SEC = 600.0
+DIARIZATION_OVERLAP_SEC = 30.0
+# 같은 화자로 볼 최소 코사인 유사도 (pyannote 3.1 기본 군집 임계값, 코사인 거리 약 0.70 과 같은 기준)
+SPEAKER_SIMILARITY_THRESHOLD = 0.3
+
+
+def window_bounds(total_samples, sample_rate, window_sec=DIARIZATION_WINDOW_SEC,
+                  overlap_sec=DIARIZATION_OVERLAP_SEC):
+    """(창 시작, 창 끝, 확정 구간 시작, 확정 구간 끝) 샘플 위치 목록
+
+    확정 구간은 이웃한 창과의 겹침 가운데에서 나뉘어 파일 전체를 빈틈없이 덮는다.
+    """
+    window = int(window_sec * sample_rate)
+    overlap = min(int(overlap_sec * sample_rate), window // 2)
+    step = window - overlap
+    bounds = []
+    start = 0
+    while True:
+        end = min(total_samples, start + window)
+        last = end >= total_samples
+        owned_start = 0 if not bounds else start + overlap // 2
+        owned_end = total_samples if last else end - overlap // 2
+        bounds.append((start, end, owned_start, owned_end))
+        if last:
+            return bounds
+        start += step
+
+
+def _clip_turns(turns, start, end):
+    clipped = []
+    for turn in turns:
+        turn_start = max(turn["start"], start)
+        turn_end = min(turn["end"], end)
+        if turn_end > turn_start:
+            clipped.append(dict(turn, start=turn_start, end=turn_end))
+    return clipped
+
+
+def _overlap_sec(turns, other, speaker, other_speaker):
+    total = 0.0
+    for a in turns:
+        if a["speaker"] != speaker:
+            continue
+        for b in other:
+            if b["speaker"] == other_speaker:
+                total += max(0.0, min(a["end"], b["end"]) - max(a["start"], b["start"]))
+    return total
+
+
+class GlobalSpeakerClusters:
+    """창별 화자 임베딩을 전체 화자 중심에 연결 (온라인 군집)
+
+    중심은 발화 길이로 가중한 정규화 임베딩의 합이며 화자 수만큼만 보관한다.
+    """
+
+    def __init__(self, threshold=SPEAKER_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.count = 0
+        self.centroids = {}  # 전체 화자 번호 -> 중심 (임베딩이 없던 화자는 없음)
+        self.durations = {}  # 전체 화자 번호 -> 중심에 더한 발화 길이 합 (초)
+
+    def label(self, index):
+        return f"SPEAKER_{index:02d}"
+
+    def new_speaker(self):
+        self.count += 1
+        return self.count - 1
+
+    def assign(self, embeddings, durations):
+        """창 안 화자별 임베딩 → 전체 화자 번호 목록 (임베딩이 없으면 None)
+
+        한 창에서 pyannote 가 구분한 화자는 서로 다른 전체 화자로 연결하며,
+        유사도가 높은 쌍부터 차례로 연결하고 남은 화자는 새 화자로 추가한다.
+        """
+        assigned = [None] * len(embeddings)
+        vectors = {}
+        for i, embedding in enumerate(embeddings):
+            embedding = np.asarray(embedding, dtype=np.float64)
+            norm = np.linalg.norm(embedding)
+            # 발화가 너무 짧은 화자는 pyannote 가 NaN 임베딩을 반환
+            if np.all(np.isfinite(embedding)) and norm > 0:
+                vectors[i] = embedding / norm
+
+        pairs = []
+        for i, vector in vectors.items():
+            for g, centroid in self.centroids.items():
+                similarity = float(centroid @ vector) / (np.linalg.norm(centroid) + 1e-10)
+                if similarity >= self.threshold:
+                    pairs.append((similarity, i, g))
+        used = set()
+        for _, i, g in sorted(pairs, reverse=True):
+            if assigned[i] is None and g not in used:
+                assigned[i] = g
+                used.add(g)
+
+        for i, vector in vectors.items():
+            if assigned[i] is None:
+                assigned[i] = self.new_speaker()
+            weighted = vector * max(durations[i], 1e-3)
+            self.centroids[assigned[i]] = self.centroids.get(assigned[i], 0.0) + weighted
+            self.durations[assigned[i]] = self.durations.get(assigned[i], 0.0) + durations[i]
+        return assigned
+
+    def speakers(self):
+        """{전체 화자 이름: {"embedding": 정규화한 중심, "duration": 발화 길이}}"""
+        return {self.label(g): {"embedding": (centroid / (np.linalg.norm(centroid) + 1e-10)).tolist(),
+                                "duration": self.durations[g]}
+                for g, centroid in self.centroids.items()}
+
+
+def iter_windowed_turns(diarization_pipeline, samples, sample_rate, window_sec=DIARIZATION_WINDOW_SEC,
+                        overlap_sec=DIARIZATION_OVERLAP_SEC, profiler=None, cancel_event=None,
+                        threshold=SPEAKER_SIMILARITY_THRESHOLD):
+    """창 단위로 화자 분리하며 (확정된 구간 끝(초), 전체 화자 이름의 턴 목록, 지금까지의 화자별 중심) 생성
+
+    samples 는 memmap 이어도 되며 한 번에 창 하나만 메모리에 복사한다.
+    """
+    import torch
+
+    clusters = GlobalSpeakerClusters(threshold)
+    previous = []  # 이전 창의 턴 (전체 화자 이름, 겹침 구간에서 임베딩이 없는 화자 연결용)
+    for start, end, owned_start, owned_end in window_bounds(len(samples), sample_rate, window_sec, overlap_sec):
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        offset = start / sample_rate
+        window = np.ascontiguousarray(samples[start:end], dtype=np.float32)
+        waveform = torch.from_numpy(window).unsqueeze(0)
+        with profile_span(profiler, "diarization", (end - start) / sample_rate):
+            diarization, embeddings = diarization_pipeline(
+                {"waveform": waveform, "sample_rate": sample_rate}, return_embeddings=True)
+        del window, waveform
+
+        local = [{"start": turn.start + offset, "end": turn.end + offset, "speaker": speaker}
+                 for turn, _, speaker in diarization.itertracks(yield_label=True)]
+        labels = diarization.labels()
+        durations = [sum(t["end"] - t["start"] for t in local if t["speaker"] == label) for label in labels]
+        embeddings = [embeddings[i] if embeddings is not None and i < len(embeddings) else None
+                      for i in range(len(labels))]
+        assigned = clusters.assign(embeddings, durations)
+
+        names = {}
+        for label, index in zip(labels, assigned):
+            if index is None:
+                # 임베딩이 없으면 겹침 구간에서 가장 많이 겹치는 이전 창의 화자로 연결
+                candidates = {turn["speaker"] for turn in previous}
+                best = max(candidates, key=lambda name: _overlap_sec(local, previous, label, name), default=None)
+                if best is not None and _overlap_sec(local, previous, label, best) > 0:
+                    names[label] = best
+                    continue
+                index = clusters.new_speaker()
+            names[label] = clusters.label(index)
+
+        turns = [dict(turn, speaker=names[turn["speaker"]]) for turn in local]
+        # 다음 창과 겹치는 구간의 턴만 보관
+        previous = _clip_turns(turns, (end - overlap_sec * sample_rate) / sample_rate, end / sample_rate)
+        yield (owned_end / sample_rate, _clip_turns(turns, owned_start / sample_rate, owned_end / sample_rate),
+               clusters.speakers())
@@ -0,0 +1,247 @@
+"""
+멀티 프로세스 작업 풀
+- K개의 파일을 동시에 처리하고 각 워커를 CPU 코어 묶음에 고정 (torch.set_num_threads 포함)
+- 워커 프로세스마다 모델을 한 번 로드해 계속 재사용
+- 코어 수와 모델 메모리 크기로 K 자동 결정
+- 파일 하나를 청크로 나눠 여러 워커가 동시에 전사 (submit_span, parallel_asr)
+"""
+
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+
+from asr_backends import DEFAULT_BACKEND, get_backend
+from cascade import CascadeStats, cascade_transcribe
+from model_cache import load_diarization_pipeline
+from parallel_asr import read_span, trim_to_span
+from pipeline import TranscriptionPipeline, transcribe_chunk
+from result_cache import get_result_cache
+from speaker_index import get_speaker_index
+from transcript_archive import get_archive
+
+# 모델별 대략적인 작업 메모리 (MB, 추론 중 활성화 포함)
+MODEL_MEMORY_MB = {"tiny": 1024, "base": 1024, "small": 2048, "medium": 5120, "large": 10240}
+DIARIZATION_MEMORY_MB = 1024
+
+# 워커 하나가 최소로 가져갈 코어 수 (Whisper 는 코어 수에 비례해 빨라지지 않음)
+MIN_THREADS_PER_WORKER = 4
+
+
+def available_cpus():
+    """현재 프로세스가 사용할 수 있는 CPU 번호 목록"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def available_memory_bytes():
+    """사용 가능한 물리 메모리 (알 수 없으면 None)"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def auto_worker_count(model_size, use_diarization=False, device="cpu", cpus=None, memory_bytes=None):
+    """코어 수와 모델 메모리 크기로 동시 작업 수 결정"""
+    if str(device).startswith("cuda"):
+        # GPU 는 한 프로세스가 점유하는 편이 빠름
+        return 1
+    cpus = len(available_cpus()) if cpus is None else cpus
+    by_cpu = max(1, cpus // MIN_THREADS_PER_WORKER)
+
+    memory_bytes = available_memory_bytes() if memory_bytes is None else memory_bytes
+    if not memory_bytes:
+        return by_cpu
+    footprint_mb = MODEL_MEMORY_MB.get(model_size, MODEL_MEMORY_MB["medium"])
+    if use_diarization:
+        footprint_mb += DIARIZATION_MEMORY_MB
+    # 여유 메모리의 80%만 사용
+    by_memory = max(1, int(memory_bytes * 0.8) // (footprint_mb * 1024 * 1024))
+    return min(by_cpu, by_memory)
+
+
+def core_slices(workers, cpus=None):
+    """CPU 목록을 워커 수만큼 연속된 묶음으로 나눔"""
+    cpus = list(cpus or available_cpus())
+    workers = max(1, min(workers, len(cpus)))
+    base, extra = divmod(len(cpus), workers)
+    slices = []
+    index = 0
+    for w in range(workers):
+        size = base + (1 if w < extra else 0)
+        slices.append(cpus[index:index + size])
+        index += size
+    return slices
+
+
+def warm_models(options):
+    """작업 옵션에 필요한 모델을 미리 로드"""
+    engine = get_backend(options.get("backend", DEFAULT_BACKEND))
+    engine.load(options["model"], options["device"])
+    if options.get("cascade_model"):
+        engine.load(options["cascade_model"], options["device"])
+    if options.get("hf_token"):
+        try:
+            load_diarization_pipeline(options["hf_token"], options["device"])
+        except Exception as e:
+            print(f"화자 분리 모델 로딩 실패: {e}")
+
+
+def build_pipeline(options, progress_callback=None):
+    """작업 옵션 딕셔너리로 TranscriptionPipeline 생성"""
+    return TranscriptionPipeline(
+        options["model"],
+        options["device"],
+        options.get("hf_token"),
+        options.get("hf_token") is not None,
+        num_threads=options.get("num_threads"),
+        word_timestamps=options.get("word_timestamps", False),
+        progress_callback=progress_callback,
+        result_cache=get_result_cache() if options.get("use_cache", True) else None,
+        checkpointing=options.get("checkpoint", False),
+        backend=options.get("backend", DEFAULT_BACKEND),
+        vad=options.get("vad", False),
+        diarization_window_sec=options.get("diarization_window_sec"),
+        speaker_index=get_speaker_index() if options.get("speaker_index") else None,
+        asr_pool=options.get("asr_pool"),
+        cascade_model=options.get("cascade_model"),
+        archive=get_archive() if options.get("archive") else None,
+    )
+
+
+# 워커 프로세스 전역 상태 (initializer 에서 설정)
+_worker_options = None
+_progress_queue = None
+
+
+def _init_worker(options, slice_queue, progress_queue):
+    """워커 시작 시 코어 묶음 고정, 스레드 수 설정, 모델 로드"""
+    global _worker_options, _progress_queue
+    _progress_queue = progress_queue
+    try:
+        cores = slice_queue.get(timeout=5)
+    except queue.Empty:
+        cores = None
+
+    num_threads = options.get("num_threads")
+    if cores:
+        if hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, cores)
+            except OSError:
+                pass
+        num_threads = num_threads or len(cores)
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    _worker_options = dict(options, num_threads=num_threads)
+    warm_models(_worker_options)
+
+
+def _run_job(job_id, audio_file, overrides=None):
+    def _progress(value, message):
+        _progress_queue.put((job_id, value, message))
+
+    # 모델/장치는 워커에 로드된 것을 그대로 쓰고 작업별 옵션만 덮어씀
+    pipeline = build_pipeline(dict(_worker_options, **(overrides or {})), _progress)
+    segments = pipeline.run(audio_file)
+    return segments, pipeline.profiler.report()
+
+
+def _transcribe_span(source, first, last, sample_rate, owned, word_timestamps):
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    engine = get_backend(_worker_options.get("backend", DEFAULT_BACKEND))
+    model = engine.load(_worker_options["model"], _worker_options["device"])
+    samples = read_span(source, first, last)
+    # 경계 단어를 골라내기 위해 항상 단어 타임스탬프로 전사
+    cascade_model = _worker_options.get("cascade_model")
+    stats = None
+    if cascade_model:
+        stats = CascadeStats(cascade_model, _worker_options["model"])
+        segments = cascade_transcribe(engine, engine.load(cascade_model, _worker_options["device"]), model,
+                                      samples, sample_rate, first / sample_rate, True, stats=stats)
+    else:
+        segments = transcribe_chunk(engine, model, samples, first / sample_rate, True)
+    segments = trim_to_span(segments, *owned, keep_words=word_timestamps)
+    return segments, time.perf_counter() - started, time.process_time() - cpu_started, stats
+
+
+class WorkerPool:
+    """파일 단위 전사 작업을 여러 프로세스에 분배하는 스케줄러"""
+
+    def __init__(self, options, workers=None, progress_callback=None):
+        """options: model, backend, device, hf_token, word_timestamps, use_cache, checkpoint, vad, speaker_index,
+        cascade_model, num_threads(선택)
+        progress_callback(job_id, value, message): 워커의 진행 상황 (별도 스레드에서 호출)
+        """
+        self.options = dict(options)
+        workers = workers or auto_worker_count(
+            self.options["model"], bool(self.options.get("hf_token")), self.options["device"])
+        # 코어보다 워커가 많으면 묶음을 받지 못한 워커가 고정 없이 기본 스레드 수로 돌아 CPU 를 초과 사용하므로
+        # 워커 수를 코어 묶음 수로 제한
+        slices = core_slices(workers)
+        self.workers = len(slices)
+        self.progress_callback = progress_callback
+
+        context = multiprocessing.get_context("spawn")
+        slice_queue = context.Queue()
+        for cores in slices:
+            slice_queue.put(cores)
+        self._progress_queue = context.Queue()
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.options, slice_queue, self._progress_queue),
+        )
+        self._progress_thread = threading.Thread(target=self._drain_progress, daemon=True)
+        self._progress_thread.start()
+
+    def _drain_progress(self):
+        while True:
+            event = self._progress_queue.get()
+            if event is None:
+                break
+            if self.progress_callback:
+                self.progress_callback(*event)
+
+    def submit(self, job_id, audio_file, overrides=None):
+        """작업 제출 (Future 결과: (병합된 세그먼트 SegmentStore, 단계별 성능 보고서))
+
+        overrides: 이 작업에만 적용할 옵션 (예: word_timestamps, vad)
+        """
+        return self._executor.submit(_run_job, job_id, str(audio_file), overrides)
+
+    def submit_span(self, source, first, last, sample_rate, owned, word_timestamps=False):
+        """파일 일부 [first, last) 샘플 전사 (Future 결과: (세그먼트 목록, 벽시계 시간, CPU 시간, 단계적 전사 통계))
+
+        source: parallel_asr.span_source 결과, owned: 이 청크가 결과를 내보낼 (시작, 끝) 초 구간
+        단계적 전사 통계는 풀 옵션에 cascade_model 이 있을 때만 CascadeStats, 아니면 None
+        """
+        return self._executor.submit(_transcribe_span, source, first, last, sample_rate, owned,
+                                     word_timestamps)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+        self._progress_queue.put(None)
+        if wait:
+            self._progress_thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()